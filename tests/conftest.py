@@ -1,4 +1,5 @@
 import os
+import pytest
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 root_dir_content = os.listdir(BASE_DIR)
@@ -37,3 +38,11 @@ pytest_plugins = [
     'tests.fixtures.fixture_user',
     'tests.fixtures.fixture_data',
 ]
+
+
+@pytest.fixture(autouse=True, scope='session')
+def test_environment():
+    from core.hashers import fast_password_hashing
+    from core.testing import isolated_cache
+    with isolated_cache(), fast_password_hashing():
+        yield
@@ -0,0 +1,32 @@
+import logging
+
+from core import mail as background
+from django.core import mail
+
+
+def wait_for_mail():
+    # В пуле один поток, поэтому пустая задача выполнится после писем.
+    background.executor.submit(int).result()
+
+
+class TestBackgroundEmail:
+
+    def test_messages_are_delivered_in_background(self, settings):
+        settings.EMAIL_BACKEND = 'core.mail.BackgroundEmailBackend'
+        settings.EMAIL_DELIVERY_BACKEND = (
+            'django.core.mail.backends.locmem.EmailBackend')
+        sent = mail.send_mail('Сброс пароля', 'Ссылка', 'from@yatube.ru',
+                              ['to@yatube.ru'])
+        assert sent == 1
+        wait_for_mail()
+        assert [message.subject for message in mail.outbox] == [
+            'Сброс пароля']
+
+    def test_delivery_errors_are_logged(self, settings, caplog):
+        settings.EMAIL_BACKEND = 'core.mail.BackgroundEmailBackend'
+        settings.EMAIL_DELIVERY_BACKEND = 'core.missing.EmailBackend'
+        with caplog.at_level(logging.ERROR, logger='core.mail'):
+            mail.send_mail('Сброс пароля', 'Ссылка', 'from@yatube.ru',
+                           ['to@yatube.ru'])
+            wait_for_mail()
+        assert 'Сброс пароля' in caplog.text
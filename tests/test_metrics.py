@@ -0,0 +1,95 @@
+import logging
+from contextlib import contextmanager
+
+import pytest
+from core import metrics
+from django.core.cache import cache
+from django.db import connections
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def enabled(settings):
+    settings.METRICS_ENABLED = True
+    settings.METRICS_TOKEN = 'secret'
+    settings.METRICS_SLOW_SAMPLE_RATE = 0
+    cache.clear()
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def sample(text, name, view):
+    prefix = f'{name}{{view="{view}"}} '
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return float(line[len(prefix):])
+    return None
+
+
+class TestMetrics:
+
+    def test_disabled_records_nothing(self, client, settings):
+        settings.METRICS_ENABLED = False
+        metrics.reset()
+        client.get('/')
+        assert 'view="posts:index"' not in metrics.expose(), (
+            'Выключенные метрики не должны ничего собирать'
+        )
+
+    def test_view_metrics(self, enabled, client, post):
+        client.get('/')
+        client.get('/')
+        text = metrics.expose()
+        assert sample(text, 'yatube_request_duration_seconds_count',
+                      'posts:index') == 2, (
+            'Время ответа должно учитываться по имени view'
+        )
+        assert sample(text, 'yatube_db_queries_sum', 'posts:index') > 0
+        assert sample(text, 'yatube_template_render_seconds_sum',
+                      'posts:index') > 0
+        assert sample(text, 'yatube_cache_misses_total', 'posts:index') > 0
+        assert sample(text, 'yatube_cache_hits_total', 'posts:index') > 0, (
+            'Повторный запрос должен попадать в кеш фрагментов'
+        )
+
+    def test_endpoint_is_protected(self, enabled, client, user_client):
+        assert client.get('/metrics/').status_code == 403
+        assert user_client.get('/metrics/').status_code == 403
+        response = client.get('/metrics/',
+                              HTTP_AUTHORIZATION='Bearer secret')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+
+    def test_slow_request_logged_with_sql(self, enabled, settings, client,
+                                          caplog):
+        settings.METRICS_SLOW_SAMPLE_RATE = 1
+        settings.METRICS_SLOW_REQUEST_MS = 0
+        with caplog.at_level(logging.WARNING, logger='yatube.slow_requests'):
+            client.get('/')
+        assert 'posts:index' in caplog.text
+        assert 'SELECT' in caplog.text, (
+            'В лог медленных запросов должен попадать их SQL'
+        )
+
+    def test_queries_counted_on_every_database(self, enabled, client,
+                                               monkeypatch):
+        wrapped = []
+
+        class Replica:
+            @contextmanager
+            def execute_wrapper(self, wrapper):
+                wrapped.append(wrapper)
+                yield
+
+        class Connections:
+            def all(self):
+                return connections.all() + [Replica()]
+
+        monkeypatch.setattr('core.middleware.connections', Connections())
+        client.get('/')
+        assert len(wrapped) == 1, (
+            'Метрики должны считать запросы ко всем базам, включая реплики'
+        )
+        assert isinstance(wrapped[0], metrics.RequestMetrics)
@@ -0,0 +1,77 @@
+import pytest
+from django.conf import settings as django_settings
+from django.contrib.auth.hashers import (Argon2PasswordHasher, check_password,
+                                         identify_hasher, make_password)
+from django.core.exceptions import ImproperlyConfigured
+
+from core.hashers import TunedArgon2PasswordHasher, check_profile
+
+# Хеш argon2: без библиотеки его проверка не должна дойти до декодирования
+ARGON2_HASH = ('argon2$argon2id$v=19$m=65536,t=2,p=1$c29tZXNhbHQ'
+               '$bQk8UB/VmZZF4Oo79iDXuL5/0ttZwg2f/5U52iv1cDc')
+
+pytestmark = [pytest.mark.django_db]
+
+PASSWORD = 'Пароль-для-входа'
+
+
+class TestPasswordHashing:
+
+    def test_tests_use_fast_profile(self):
+        assert identify_hasher(make_password(PASSWORD)).algorithm == 'md5', (
+            'Тесты должны хешировать пароли быстрым профилем'
+        )
+
+    @pytest.mark.parametrize('profile',
+                             django_settings.PASSWORD_HASHER_PROFILES)
+    def test_every_profile_verifies_stored_passwords(self, profile):
+        hashers = django_settings.PASSWORD_HASHER_PROFILES[profile]
+        for name in django_settings.PASSWORD_VERIFIERS:
+            assert name in hashers, (
+                f'Профиль {profile} должен проверять пароли хешера {name}'
+            )
+
+    def test_password_is_rehashed_on_login(self, settings, client,
+                                           django_user_model):
+        settings.PASSWORD_HASHERS = settings.PASSWORD_HASHER_PROFILES[
+            'pbkdf2']
+        user = django_user_model.objects.create(
+            username='OldHash',
+            password=make_password(PASSWORD, hasher='pbkdf2_sha1'))
+        response = client.post('/auth/login/', {
+            'username': 'OldHash', 'password': PASSWORD})
+        assert response.status_code == 302
+        user.refresh_from_db()
+        assert identify_hasher(user.password).algorithm == 'pbkdf2_sha256', (
+            'При входе пароль должен перехешироваться основным хешером '
+            'профиля'
+        )
+        assert user.check_password(PASSWORD)
+
+    def test_missing_library_stops_startup(self, settings, monkeypatch):
+        monkeypatch.setattr(TunedArgon2PasswordHasher, 'library',
+                            'no_such_argon2')
+        settings.PASSWORD_HASHING = 'argon2'
+        settings.PASSWORD_HASHERS = settings.PASSWORD_HASHER_PROFILES[
+            'argon2']
+        with pytest.raises(ImproperlyConfigured):
+            check_profile()
+
+    def test_default_profile_passes_startup_check(self):
+        check_profile()
+
+    def test_argon2_hash_without_library_is_rejected(self, monkeypatch):
+        monkeypatch.setattr(TunedArgon2PasswordHasher, 'library',
+                            'no_such_argon2')
+        assert not check_password(PASSWORD, ARGON2_HASH), (
+            'Без библиотеки хеш argon2 должен не проходить проверку, '
+            'а не вызывать ошибку'
+        )
+
+    def test_weak_argon2_hashes_are_upgraded(self):
+        pytest.importorskip('argon2')
+        weak = Argon2PasswordHasher().encode(PASSWORD, 'saltsaltsalt')
+        tuned = TunedArgon2PasswordHasher()
+        assert tuned.verify(PASSWORD, weak)
+        assert tuned.must_update(weak)
+        assert not tuned.must_update(tuned.encode(PASSWORD, 'saltsaltsalt'))
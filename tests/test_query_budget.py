@@ -0,0 +1,85 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from posts.models import Comment, Follow, Post
+
+pytestmark = [pytest.mark.django_db]
+
+# Число запросов на страницу не зависит от числа постов и комментариев
+# на ней. Сессия и пользователь дают по запросу на каждый ответ.
+QUERY_BUDGET = {
+    'index': 3,
+    'group': 4,
+    'profile': 5,
+    'post_detail': 4,
+    'follow_index': 5,
+    'post_create': 3,
+    'post_edit': 5,
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture(params=[1, 15], ids=['one_row', 'full_page'])
+def content(request, user, another_user, group):
+    Follow.objects.create(user=user, author=another_user)
+    posts = [
+        Post.objects.create(text=f'Пост {num}', author=another_user,
+                            group=group)
+        for num in range(request.param)
+    ]
+    for _ in posts:
+        Comment.objects.create(text='Коммент', post=posts[0], author=user)
+    return posts[0]
+
+
+def urls(post):
+    return {
+        'index': '/',
+        'group': f'/group/{post.group.slug}/',
+        'profile': f'/profile/{post.author.username}/',
+        'post_detail': f'/posts/{post.pk}/',
+        'follow_index': '/follow/',
+        'post_create': '/create/',
+        'post_edit': f'/posts/{post.pk}/edit/',
+    }
+
+
+class TestQueryBudget:
+
+    @pytest.mark.parametrize('name', QUERY_BUDGET)
+    def test_view_query_budget(self, name, content, user_client,
+                               django_assert_num_queries):
+        url = urls(content)[name]
+        if name == 'post_edit':
+            user_client.force_login(content.author)
+        with django_assert_num_queries(QUERY_BUDGET[name]):
+            response = user_client.get(url)
+        assert response.status_code == 200, (
+            f'Страница `{url}` должна открываться для авторизованного '
+            'пользователя'
+        )
+
+    @pytest.mark.parametrize('name',
+                             ['index', 'group', 'profile', 'follow_index'])
+    def test_lists_do_not_count_rows_on_repeat(self, name, content,
+                                               user_client):
+        url = urls(content)[name]
+        user_client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = user_client.get(url, {'page': 1})
+        assert response.status_code == 200
+        assert not [query for query in queries.captured_queries
+                    if 'COUNT(' in query['sql']], (
+            f'Страница `{url}` не должна делать COUNT(*) на каждый запрос'
+        )
+
+    def test_add_comment_query_budget(self, content, user_client,
+                                      django_assert_max_num_queries):
+        with django_assert_max_num_queries(8):
+            user_client.post(f'/posts/{content.pk}/comment/',
+                             {'text': 'Новый коммент'})
@@ -0,0 +1,72 @@
+import pytest
+from core import routers
+from django.core.cache import cache
+from posts import counters
+from posts.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def replicas(settings, monkeypatch):
+    settings.DATABASE_REPLICAS = ['replica_1', 'replica_2']
+    state = {'replica_1': True, 'replica_2': True}
+    monkeypatch.setattr(routers, 'check', lambda alias: state[alias])
+    monkeypatch.setattr(routers, '_health', {})
+    cache.clear()
+    return state
+
+
+@pytest.fixture
+def reads(replicas, monkeypatch):
+    """Запоминает обращения к репликам, но читает основную базу."""
+    calls = []
+    monkeypatch.setattr(routers, 'choose_replica',
+                        lambda: calls.append(True))
+    return calls
+
+
+class TestReplicaRouter:
+
+    def test_round_robin_skips_unhealthy(self, replicas, settings):
+        chosen = {routers.choose_replica() for _ in range(4)}
+        assert chosen == {'replica_1', 'replica_2'}
+        replicas['replica_1'] = False
+        settings.REPLICA_HEALTH_INTERVAL = 0
+        assert {routers.choose_replica() for _ in range(4)} == {'replica_2'}
+        replicas['replica_2'] = False
+        assert routers.choose_replica() is None
+
+    def test_reads_use_replicas_only_inside_marked_views(self, replicas):
+        router = routers.ReplicaRouter()
+        assert router.db_for_read(Post) is None
+        token = routers.current.set(routers.choose_replica())
+        try:
+            assert router.db_for_read(Post) in replicas
+            assert router.db_for_write(Post) == 'default'
+        finally:
+            routers.current.reset(token)
+        assert not router.allow_migrate('replica_1', 'posts')
+
+    def test_total_posts_are_counted_on_primary(self, replicas, post):
+        token = routers.current.set('replica_1')
+        try:
+            assert counters.count_total_posts() == 1, (
+                'Число постов для кеша должно считаться по основной базе'
+            )
+        finally:
+            routers.current.reset(token)
+
+    def test_read_views_use_replicas(self, reads, user_client):
+        user_client.get('/')
+        assert reads, 'Главная страница должна читать с реплик'
+
+    def test_writes_pin_to_primary(self, reads, user_client, another_user):
+        response = user_client.get(
+            f'/profile/{another_user.username}/follow/')
+        assert routers.PIN_COOKIE in response.cookies
+        reads.clear()
+        user_client.get('/follow/')
+        assert not reads, (
+            'После записи пользователь должен читать основную базу'
+        )
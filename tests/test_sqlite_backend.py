@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+from core.transaction import atomic
+from django.db import connections, transaction
+
+
+@pytest.fixture
+def database(tmp_path, django_db_blocker):
+    alias = 'tuned_sqlite'
+    connections.databases[alias] = {
+        'ENGINE': 'core.backends.sqlite3',
+        'NAME': str(tmp_path / 'tuned.sqlite3'),
+        'OPTIONS': {'PRAGMAS': {'busy_timeout': 20000}},
+    }
+    with django_db_blocker.unblock():
+        yield alias
+        connections[alias].close()
+    del connections[alias]
+    del connections.databases[alias]
+
+
+class TestTunedSqlite:
+
+    def test_pragmas_applied_on_connect(self, database):
+        with connections[database].cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            assert cursor.fetchone()[0] == 'wal'
+            cursor.execute('PRAGMA synchronous')
+            assert cursor.fetchone()[0] == 1, 'Ожидается synchronous=NORMAL'
+            cursor.execute('PRAGMA busy_timeout')
+            assert cursor.fetchone()[0] == 20000
+
+    def test_concurrent_transactions_do_not_fail(self, database):
+        with connections[database].cursor() as cursor:
+            cursor.execute('CREATE TABLE item (id INTEGER PRIMARY KEY, '
+                           'owner INTEGER)')
+        errors = []
+
+        def worker(num):
+            try:
+                for _ in range(20):
+                    with atomic(using=database, immediate=True):
+                        with connections[database].cursor() as cursor:
+                            cursor.execute('SELECT COUNT(*) FROM item '
+                                           'WHERE owner = %s', [num])
+                            cursor.execute('INSERT INTO item (owner) '
+                                           'VALUES (%s)', [num])
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connections[database].close()
+
+        threads = [threading.Thread(target=worker, args=(num,))
+                   for num in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+        with connections[database].cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM item')
+            assert cursor.fetchone()[0] == 80
+
+    def test_only_immediate_blocks_take_write_lock(self, database):
+        connection = connections[database]
+        with transaction.atomic(using=database):
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            assert not connection.holds_write_lock, (
+                'Читающий блок atomic не должен вставать в очередь на запись'
+            )
+        with atomic(using=database, immediate=True):
+            assert connection.holds_write_lock
+        assert not connection.holds_write_lock
@@ -0,0 +1,79 @@
+import threading
+import time
+
+import pytest
+from core import stampede
+from django.core.cache import cache
+from django.template import Context, Template
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+class Counter:
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return f'value {self.calls}'
+
+
+class TestStampede:
+
+    def test_thundering_herd_rebuilds_once(self):
+        compute = Counter(delay=0.3)
+        start = threading.Barrier(20)
+        results = []
+
+        def request():
+            start.wait()
+            results.append(stampede.get_or_set('herd', compute, 60))
+
+        threads = [threading.Thread(target=request) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert compute.calls == 1, (
+            'Значение при одновременных промахах должен считать один запрос'
+        )
+        assert results == ['value 1'] * 20
+
+    def test_stale_value_served_while_refreshing(self):
+        cache.set('key', stampede.Entry('old', time.time() - 1, 0), 60)
+        cache.add(stampede.lock_key('key'), 1)
+        compute = Counter()
+        assert stampede.get_or_set('key', compute, 60) == 'old'
+        assert compute.calls == 0
+        cache.delete(stampede.lock_key('key'))
+        assert stampede.get_or_set('key', compute, 60) == 'value 1'
+
+    def test_early_expiration(self, monkeypatch):
+        entry = stampede.Entry('old', time.time() + 5, 2)
+        monkeypatch.setattr(stampede.random, 'random', lambda: 0.0)
+        assert not stampede.needs_refresh(entry)
+        # -log(0.01) * 2 секунды пересчёта больше оставшихся 5 секунд.
+        monkeypatch.setattr(stampede.random, 'random', lambda: 0.99)
+        assert stampede.needs_refresh(entry)
+
+    def test_template_tag_is_cache_compatible(self):
+        compute = Counter()
+        template = Template(
+            '{% load stampede_cache %}'
+            '{% cache 60 fragment name using="default" %}'
+            '{{ compute }}{% endcache %}'
+        )
+        first = template.render(Context({'compute': compute, 'name': 'a'}))
+        second = template.render(Context({'compute': compute, 'name': 'a'}))
+        other = template.render(Context({'compute': compute, 'name': 'b'}))
+        assert first == second == 'value 1'
+        assert other == 'value 2'
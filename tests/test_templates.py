@@ -0,0 +1,43 @@
+import pytest
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+from django.test import RequestFactory
+
+from core.templates import template_names, uses_cached_loader, warm
+from posts.benchmark import template_context
+
+
+def cached_engine():
+    """Движок с настройками проекта, как на сервере без DEBUG."""
+    params = dict(settings.TEMPLATES[0], NAME='cached')
+    del params['BACKEND']
+    params['OPTIONS'] = dict(params['OPTIONS'], debug=False)
+    return DjangoTemplates(params)
+
+
+class TestTemplateWarmup:
+
+    def test_all_project_templates_are_found(self):
+        names = template_names()
+        assert 'base.html' in names
+        assert 'posts/includes/comment_list.html' in names
+        assert all(name.endswith('.html') for name in names)
+
+    def test_warm_fills_cached_loader(self):
+        engine = cached_engine()
+        assert uses_cached_loader(engine)
+        timings = warm(engine=engine)
+        assert set(timings) == set(template_names(engine))
+        loader = engine.engine.template_loaders[0]
+        assert len(loader.get_template_cache) >= len(timings)
+
+    @pytest.mark.django_db
+    def test_every_template_renders_with_benchmark_context(self):
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        context = template_context(request)
+        engine = engines['django']
+        for name in template_names():
+            engine.get_template(name).render(context, request)
@@ -0,0 +1,96 @@
+import pytest
+from core.cache import TwoTierCache
+from core.testing import clear_isolated_cache, isolated_cache
+from django.core.cache import cache as default_cache
+from django.core.cache import caches
+
+
+@pytest.fixture
+def tiers():
+    shared = caches['shared']
+    shared.clear()
+    cache = TwoTierCache('shared', {
+        'OPTIONS': {'LOCAL_TIMEOUT': 60, 'LOCAL_MAX_ENTRIES': 2},
+    })
+    cache.clear_local()
+    yield cache, shared
+    cache.clear()
+
+
+class TestTwoTierCache:
+
+    def test_local_tier_serves_hits(self, tiers, monkeypatch):
+        cache, shared = tiers
+        cache.set('key', {'value': 1})
+        monkeypatch.setattr(type(shared), 'get', lambda *args, **kw: None)
+        assert cache.get('key') == {'value': 1}, (
+            'Повторное чтение должно обходиться без общего кеша'
+        )
+
+    def test_returned_values_are_copies(self, tiers):
+        cache, _ = tiers
+        cache.set('key', [1])
+        cache.get('key').append(2)
+        assert cache.get('key') == [1]
+
+    def test_lru_eviction(self, tiers):
+        cache, _ = tiers
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        assert list(cache._local) == [cache.make_key('a'),
+                                      cache.make_key('c')], (
+            'Вытесняться должен давно не читанный ключ'
+        )
+
+    def test_other_worker_sees_shared_changes(self, tiers):
+        cache, shared = tiers
+        cache.set('key', 'old')
+        shared.set('key', 'new')
+        cache.clear_local()
+        assert cache.get('key') == 'new', (
+            'После истечения локальной копии значение берётся из общего '
+            'кеша'
+        )
+
+    def test_delete_reaches_shared_tier(self, tiers):
+        cache, shared = tiers
+        cache.set('key', 'value')
+        cache.delete('key')
+        assert shared.get('key') is None
+        assert cache.get('key') is None
+
+    def test_local_ttl(self, tiers, monkeypatch):
+        cache, shared = tiers
+        cache.set('key', 'value', timeout=1)
+        shared.delete('key')
+        monkeypatch.setattr('core.cache.time.monotonic', lambda: 10 ** 9)
+        assert cache.get('key') is None
+
+    def test_versions_bypass_local_tier(self):
+        from posts import caching, page_cache
+        version = caching.list_version()
+        page_cache.tag_versions({'index'})
+        # Другой воркер меняет версии в общем кеше.
+        caches['shared'].set(caching.LIST_VERSION_KEY, version + 1, None)
+        caches['shared'].set(page_cache.tag_key('index'), 42, None)
+        assert caching.list_version() == version + 1, (
+            'Смена версии списков должна сразу быть видна всем воркерам'
+        )
+        assert page_cache.tag_versions({'index'}) == {'index': 42}
+
+    def test_isolated_cache_keeps_outer_cache(self):
+        default_cache.set('outer', 1)
+        with isolated_cache():
+            assert default_cache.get('outer') is None
+            default_cache.set('outer', 2)
+            default_cache.clear()
+        assert default_cache.get('outer') == 1, (
+            'Замеры и тесты не должны трогать кеш вне isolated_cache'
+        )
+
+    def test_clear_refuses_live_cache(self, monkeypatch):
+        monkeypatch.setattr('core.testing._isolated', 0)
+        with pytest.raises(RuntimeError):
+            clear_isolated_cache()
@@ -0,0 +1,106 @@
+"""SQLite с настройками для работы под нагрузкой.
+
+При подключении включаются WAL (читатели не ждут писателя),
+``synchronous=NORMAL``, mmap, кеш страниц и ожидание блокировки вместо
+немедленной ошибки ``database is locked``. Значения задаются в
+``OPTIONS['PRAGMAS']`` поверх ``DEFAULT_PRAGMAS``.
+
+Транзакции ``core.transaction.atomic(immediate=True)`` начинаются с
+``BEGIN IMMEDIATE``: блокировка на запись берётся сразу, а не при первом
+INSERT, когда SQLite уже не может подождать и сразу отвечает ошибкой.
+Вдобавок потоки одного процесса встают в очередь за внутренней
+блокировкой (``SERIALIZE_WRITES``) и не крутятся в цикле ожидания
+SQLite. Обычный ``atomic`` начинается с отложенного ``BEGIN`` без
+очереди, чтобы читающие блоки не ждали друг друга.
+
+    DATABASES = {'default': {
+        'ENGINE': 'core.backends.sqlite3',
+        'NAME': 'db.sqlite3',
+        'CONN_MAX_AGE': 60,
+        'OPTIONS': {'PRAGMAS': {'mmap_size': 0}, 'SERIALIZE_WRITES': True},
+    }}
+"""
+import threading
+
+from django.db.backends.sqlite3 import base
+from django.db.backends.sqlite3.base import Database
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение - размер в КиБ, а не в страницах.
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'memory',
+}
+
+_write_locks = {}
+_write_locks_lock = threading.Lock()
+
+
+def write_lock(name):
+    with _write_locks_lock:
+        return _write_locks.setdefault(name, threading.Lock())
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    holds_write_lock = False
+    # Ставит core.transaction.atomic(immediate=True) перед началом блока.
+    begin_immediate = False
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        # Свои ключи OPTIONS не передаются в sqlite3.connect().
+        self.pragmas = {**DEFAULT_PRAGMAS, **kwargs.pop('PRAGMAS', {})}
+        # Тестовая база в памяти живёт внутри транзакции TestCase, и
+        # очередь на запись заперла бы другие потоки теста.
+        self.serialize_writes = (kwargs.pop('SERIALIZE_WRITES', True)
+                                 and not self.is_in_memory_db())
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        if not self.begin_immediate:
+            super()._start_transaction_under_autocommit()
+            return
+        if self.serialize_writes:
+            timeout = int(self.pragmas['busy_timeout']) / 1000
+            lock = write_lock(self.settings_dict['NAME'])
+            if not lock.acquire(timeout=timeout):
+                with self.wrap_database_errors:
+                    raise Database.OperationalError('database is locked')
+            self.holds_write_lock = True
+        try:
+            self.cursor().execute('BEGIN IMMEDIATE')
+        except Exception:
+            self.release_write_lock()
+            raise
+
+    def release_write_lock(self):
+        if self.holds_write_lock:
+            self.holds_write_lock = False
+            write_lock(self.settings_dict['NAME']).release()
+
+    def _commit(self):
+        try:
+            return super()._commit()
+        finally:
+            self.release_write_lock()
+
+    def _rollback(self):
+        try:
+            return super()._rollback()
+        finally:
+            self.release_write_lock()
+
+    def _close(self):
+        try:
+            return super()._close()
+        finally:
+            self.release_write_lock()
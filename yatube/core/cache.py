@@ -0,0 +1,143 @@
+"""Двухуровневый кеш: LRU в памяти процесса поверх общего кеша.
+
+Общий уровень (файловый кеш, Redis и т. п.) задаётся отдельным
+псевдонимом в CACHES и виден всем воркерам, поэтому сброс ключа в одном
+воркере доходит до остальных. Локальный уровень избавляет от обращения
+к общему кешу на горячих ключах; его записи живут не дольше
+``LOCAL_TIMEOUT`` секунд, и на это время другие воркеры могут видеть
+старое значение. Ключи, устаревание которых недопустимо (версии,
+метки сброса), читаются и пишутся через ``shared_cache()`` в обход
+локального уровня.
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache.TwoTierCache',
+            'LOCATION': 'shared',
+            'OPTIONS': {'LOCAL_TIMEOUT': 5, 'LOCAL_MAX_ENTRIES': 1000},
+        },
+        'shared': {...},
+    }
+"""
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+# Экземпляры бэкендов в Django свои у каждого потока, а локальный
+# уровень должен быть общим для процесса, как у LocMemCache.
+_tiers = {}
+_locks = {}
+_MISSING = object()
+
+
+class TwoTierCache(BaseCache):
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.shared_alias = location
+        self.local_timeout = options.get('LOCAL_TIMEOUT', 5)
+        self.local_max_entries = options.get('LOCAL_MAX_ENTRIES', 1000)
+        self._local = _tiers.setdefault(location, OrderedDict())
+        self._lock = _locks.setdefault(location, threading.Lock())
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def _local_get(self, key):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return _MISSING
+            pickled, expires = entry
+            if expires <= time.monotonic():
+                del self._local[key]
+                return _MISSING
+            self._local.move_to_end(key)
+        return pickle.loads(pickled)
+
+    def _local_set(self, key, value, timeout):
+        if timeout is DEFAULT_TIMEOUT or timeout is None:
+            timeout = self.local_timeout
+        timeout = min(timeout, self.local_timeout)
+        if timeout <= 0:
+            self._local_delete(key)
+            return
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._local[key] = (pickled, time.monotonic() + timeout)
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_max_entries:
+                self._local.popitem(last=False)
+
+    def _local_delete(self, key):
+        with self._lock:
+            self._local.pop(key, None)
+
+    def local_key(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def get(self, key, default=None, version=None):
+        local_key = self.local_key(key, version)
+        value = self._local_get(local_key)
+        if value is not _MISSING:
+            return value
+        value = self.shared.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            return default
+        self._local_set(local_key, value, self.local_timeout)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout, version=version)
+        self._local_set(self.local_key(key, version), value, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, timeout, version=version)
+        if added:
+            self._local_set(self.local_key(key, version), value, timeout)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        self._local_delete(self.local_key(key, version))
+        self.shared.delete(key, version=version)
+
+    def has_key(self, key, version=None):
+        if self._local_get(self.local_key(key, version)) is not _MISSING:
+            return True
+        return self.shared.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        self._local_delete(self.local_key(key, version))
+        return self.shared.incr(key, delta, version=version)
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+        self.shared.clear()
+
+    def clear_local(self):
+        """Очищает только локальный уровень, например в тестах."""
+        with self._lock:
+            self._local.clear()
+
+
+def shared_cache(alias='default'):
+    """Общий уровень кеша ``alias`` без локального LRU.
+
+    Для версий и меток сброса: их смена должна сразу дойти до всех
+    воркеров, а не через ``LOCAL_TIMEOUT`` секунд.
+    """
+    cache = caches[alias]
+    if isinstance(cache, TwoTierCache):
+        return cache.shared
+    return cache
@@ -0,0 +1,81 @@
+"""Хешеры паролей с параметрами для рабочего сервера.
+
+Профиль хеширования выбирается в settings.PASSWORD_HASHING. Первый
+хешер профиля хеширует новые пароли, остальные только проверяют
+старые. Django перехеширует пароль при входе, если он записан другим
+алгоритмом или с другими параметрами, поэтому смена профиля или
+параметров применяется постепенно, без сброса паролей.
+
+Без библиотеки основного хешера сайт не запускается (``check_profile``),
+а хеши, записанные хешером без библиотеки, не проходят проверку, как
+неверный пароль, вместо ошибки 500 при входе.
+"""
+import logging
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+def library_available(hasher):
+    """Установлена ли библиотека хешера."""
+    if hasher.library is None:
+        return True
+    try:
+        hasher._load_library()
+    except ValueError:
+        return False
+    return True
+
+
+def check_profile():
+    """Проверяет, что основной хешер профиля может хешировать пароли."""
+    hasher = import_string(settings.PASSWORD_HASHERS[0])()
+    if not library_available(hasher):
+        raise ImproperlyConfigured(
+            f'Для профиля хеширования {settings.PASSWORD_HASHING!r} '
+            f'не установлена библиотека {hasher.library!r}.')
+
+
+class OptionalLibraryMixin:
+    """Проверка пароля без библиотеки хешера отвечает «неверно»."""
+
+    def verify(self, password, encoded):
+        if not library_available(self):
+            logger.error('Пароль записан хешером %s, но его библиотека '
+                         'не установлена', self.algorithm)
+            return False
+        return super().verify(password, encoded)
+
+
+class BCryptSHA256PasswordHasher(OptionalLibraryMixin,
+                                 hashers.BCryptSHA256PasswordHasher):
+    pass
+
+
+class TunedArgon2PasswordHasher(OptionalLibraryMixin,
+                                hashers.Argon2PasswordHasher):
+    """Argon2 с параметрами из рекомендаций OWASP.
+
+    У стандартного хешера Django 2.2 всего 512 КиБ памяти. Стойкость
+    Argon2 держится на памяти, а не на числе итераций, поэтому проверка
+    пароля нагружает процессор меньше, чем PBKDF2 со 150 000 итераций.
+    Время входа на ядро показывает manage.py bench_login.
+    """
+    time_cost = 2
+    memory_cost = 19 * 1024
+    parallelism = 1
+
+
+def fast_password_hashing():
+    """Быстрый профиль хеширования для тестов и наполнения базы.
+
+    Пароли хешируются быстрым хешером без защиты от перебора, поэтому
+    профиль годится только для временных баз.
+    """
+    return override_settings(
+        PASSWORD_HASHERS=settings.PASSWORD_HASHER_PROFILES['fast'])
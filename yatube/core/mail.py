@@ -0,0 +1,41 @@
+"""Отправка писем в фоне.
+
+Письмо о сбросе пароля и другие письма отправляются из пула потоков, и
+запрос не ждёт почтовый сервер. Настоящий бэкенд задаётся
+``EMAIL_DELIVERY_BACKEND``; ошибки отправки только пишутся в лог, как
+при ``fail_silently``.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+
+logger = logging.getLogger(__name__)
+
+# Один поток: письма уходят по очереди через одно соединение.
+executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='mail')
+
+
+def deliver(messages, options):
+    try:
+        connection = get_connection(settings.EMAIL_DELIVERY_BACKEND,
+                                    **options)
+        connection.send_messages(messages)
+    except Exception:
+        logger.exception('Не удалось отправить письма: %s',
+                         [message.subject for message in messages])
+
+
+class BackgroundEmailBackend(BaseEmailBackend):
+
+    def __init__(self, fail_silently=False, **kwargs):
+        super().__init__(fail_silently=fail_silently)
+        self.options = kwargs
+
+    def send_messages(self, email_messages):
+        messages = list(email_messages)
+        if messages:
+            executor.submit(deliver, messages, self.options)
+        return len(messages)
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections
+
+from core.transaction import atomic
+
+VARIANTS = {
+    'sqlite3': ('django.db.backends.sqlite3', {}),
+    'без очереди': ('core.backends.sqlite3', {'SERIALIZE_WRITES': False}),
+    'core.sqlite3': ('core.backends.sqlite3', {}),
+}
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает пропускную способность записи из нескольких '
+            'потоков для стандартного SQLite-бэкенда '
+            'и core.backends.sqlite3.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--writes', type=int, default=200,
+                            help='Транзакций на поток.')
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            for num, (name, (engine, db_options)) in enumerate(
+                    VARIANTS.items()):
+                alias = f'bench_{num}'
+                connections.databases[alias] = {
+                    'ENGINE': engine,
+                    'NAME': os.path.join(directory, f'{alias}.sqlite3'),
+                    'OPTIONS': db_options,
+                }
+                try:
+                    self.report(name, self.run(alias, options))
+                finally:
+                    connections[alias].close()
+                    del connections[alias]
+                    del connections.databases[alias]
+
+    def run(self, alias, options):
+        with connections[alias].cursor() as cursor:
+            cursor.execute('CREATE TABLE comment '
+                           '(id INTEGER PRIMARY KEY, post INTEGER, text TEXT)')
+        results = {'ok': 0, 'locked': 0}
+        lock = threading.Lock()
+        start = threading.Barrier(options['threads'])
+
+        def worker(num):
+            start.wait()
+            for write in range(options['writes']):
+                try:
+                    # Как add_comment: чтение и запись в одной транзакции.
+                    with atomic(using=alias, immediate=True):
+                        with connections[alias].cursor() as cursor:
+                            cursor.execute('SELECT COUNT(*) FROM comment '
+                                           'WHERE post = %s', [num])
+                            cursor.execute('INSERT INTO comment (post, text) '
+                                           'VALUES (%s, %s)', [num, 'текст'])
+                    outcome = 'ok'
+                except OperationalError:
+                    outcome = 'locked'
+                with lock:
+                    results[outcome] += 1
+            connections[alias].close()
+
+        threads = [threading.Thread(target=worker, args=(num,))
+                   for num in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        results['elapsed'] = time.perf_counter() - started
+        return results
+
+    def report(self, name, results):
+        self.stdout.write(
+            f'{name:<12} записей/с={results["ok"] / results["elapsed"]:.0f} '
+            f'успешно={results["ok"]} database is locked={results["locked"]} '
+            f'время={results["elapsed"]:.2f}s'
+        )
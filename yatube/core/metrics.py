@@ -0,0 +1,232 @@
+"""Гистограммы времени ответа и запросов к базе, кешу и шаблонам.
+
+Данные хранятся в памяти процесса: каждый воркер отдаёт свои значения,
+а суммирует их Prometheus. Перехват кеша и шаблонов подключается только
+при включённых метриках, без них код Django не меняется.
+"""
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from django.template.base import Template
+
+# Границы корзин в секундах и в штуках для числа запросов к базе.
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+# Замеры текущего запроса; None, если запрос не отслеживается.
+current = contextvars.ContextVar('request_metrics', default=None)
+
+
+class Histogram:
+    """Накопительная гистограмма Prometheus с разбивкой по view."""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.counts = defaultdict(lambda: [0] * (len(self.buckets) + 1))
+            self.sums = defaultdict(float)
+
+    def observe(self, view, value):
+        with self.lock:
+            self.counts[view][bisect_left(self.buckets, value)] += 1
+            self.sums[view] += value
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.help_text}',
+                 f'# TYPE {self.name} histogram']
+        with self.lock:
+            for view in sorted(self.counts):
+                label = f'view="{escape_label(view)}"'
+                total = 0
+                for bound, count in zip(self.buckets + ('+Inf',),
+                                        self.counts[view]):
+                    total += count
+                    lines.append(
+                        f'{self.name}_bucket{{{label},le="{bound}"}} {total}')
+                lines.append(f'{self.name}_sum{{{label}}} '
+                             f'{self.sums[view]:.6f}')
+                lines.append(f'{self.name}_count{{{label}}} {total}')
+        return lines
+
+
+class Counter:
+    """Счётчик Prometheus с разбивкой по view."""
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.values = defaultdict(int)
+
+    def inc(self, view, value=1):
+        with self.lock:
+            self.values[view] += value
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.help_text}',
+                 f'# TYPE {self.name} counter']
+        with self.lock:
+            for view in sorted(self.values):
+                lines.append(f'{self.name}{{view="{escape_label(view)}"}} '
+                             f'{self.values[view]}')
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    'yatube_request_duration_seconds', 'Время ответа.', TIME_BUCKETS)
+DB_QUERIES = Histogram(
+    'yatube_db_queries', 'Число запросов к базе за ответ.', COUNT_BUCKETS)
+DB_SECONDS = Histogram(
+    'yatube_db_duration_seconds', 'Время запросов к базе за ответ.',
+    TIME_BUCKETS)
+TEMPLATE_SECONDS = Histogram(
+    'yatube_template_render_seconds', 'Время отрисовки шаблонов за ответ.',
+    TIME_BUCKETS)
+CACHE_HITS = Counter('yatube_cache_hits_total', 'Попадания в кеш.')
+CACHE_MISSES = Counter('yatube_cache_misses_total', 'Промахи мимо кеша.')
+
+METRICS = (REQUEST_SECONDS, DB_QUERIES, DB_SECONDS, TEMPLATE_SECONDS,
+           CACHE_HITS, CACHE_MISSES)
+
+
+def escape_label(value):
+    return (value.replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+def expose():
+    """Все метрики в текстовом формате Prometheus."""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.expose())
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    for metric in METRICS:
+        metric.reset()
+
+
+class RequestMetrics:
+    """Замеры одного запроса."""
+
+    def __init__(self, keep_sql):
+        self.keep_sql = keep_sql
+        self.queries = []
+        self.db_count = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+        self.template_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Обёртка для connection.execute_wrapper."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.db_count += 1
+            self.db_seconds += duration
+            if self.keep_sql:
+                self.queries.append((duration, sql))
+
+    def record(self, view, duration):
+        REQUEST_SECONDS.observe(view, duration)
+        DB_QUERIES.observe(view, self.db_count)
+        DB_SECONDS.observe(view, self.db_seconds)
+        TEMPLATE_SECONDS.observe(view, self.template_seconds)
+        if self.cache_hits:
+            CACHE_HITS.inc(view, self.cache_hits)
+        if self.cache_misses:
+            CACHE_MISSES.inc(view, self.cache_misses)
+
+
+_MISSING = object()
+_installed = False
+_install_lock = threading.Lock()
+
+
+def _count_get(get):
+    @wraps(get)
+    def wrapper(self, key, default=None, version=None):
+        value = get(self, key, _MISSING, version)
+        metrics = current.get()
+        if metrics is not None:
+            if value is _MISSING:
+                metrics.cache_misses += 1
+            else:
+                metrics.cache_hits += 1
+        return default if value is _MISSING else value
+    return wrapper
+
+
+def _count_get_many(get_many):
+    @wraps(get_many)
+    def wrapper(self, keys, version=None):
+        keys = list(keys)
+        found = get_many(self, keys, version)
+        metrics = current.get()
+        if metrics is not None:
+            metrics.cache_hits += len(found)
+            metrics.cache_misses += len(keys) - len(found)
+        return found
+    return wrapper
+
+
+def _time_render(render):
+    @wraps(render)
+    def wrapper(self, context):
+        metrics = current.get()
+        if metrics is None:
+            return render(self, context)
+        # Вложенные шаблоны (include, extends) уже учтены во внешнем.
+        metrics.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            metrics.template_depth -= 1
+            if not metrics.template_depth:
+                metrics.template_seconds += time.perf_counter() - started
+    return wrapper
+
+
+def install():
+    """Подключает подсчёт попаданий в кеш и времени шаблонов."""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        # Общий уровень двухуровневого кеша вызывается через верхний,
+        # и его обращения не считаются второй раз.
+        tiers = {params.get('LOCATION')
+                 for params in settings.CACHES.values()
+                 if params['BACKEND'] == 'core.cache.TwoTierCache'}
+        backends = {type(caches[alias]) for alias in settings.CACHES
+                    if alias not in tiers}
+        for backend in backends:
+            backend.get = _count_get(backend.get)
+            # Базовый get_many вызывает get, и ключи уже посчитаны.
+            if backend.get_many is not BaseCache.get_many:
+                backend.get_many = _count_get_many(backend.get_many)
+        Template.render = _time_render(Template.render)
+        _installed = True
@@ -0,0 +1,64 @@
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import metrics
+
+slow_requests = logging.getLogger('yatube.slow_requests')
+
+UNRESOLVED = '<unresolved>'
+
+
+class MetricsMiddleware:
+    """Собирает метрики по каждому view.
+
+    При ``METRICS_ENABLED = False`` Django исключает middleware из цепочки,
+    и запросы обрабатываются без единой лишней инструкции.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_seconds = settings.METRICS_SLOW_REQUEST_MS / 1000
+        self.slow_sample_rate = settings.METRICS_SLOW_SAMPLE_RATE
+        metrics.install()
+
+    def __call__(self, request):
+        request_metrics = metrics.RequestMetrics(
+            keep_sql=random.random() < self.slow_sample_rate)
+        token = metrics.current.set(request_metrics)
+        started = time.perf_counter()
+        try:
+            # Считаем запросы ко всем базам, включая реплики для чтения.
+            with ExitStack() as stack:
+                for db in connections.all():
+                    stack.enter_context(db.execute_wrapper(request_metrics))
+                response = self.get_response(request)
+        finally:
+            metrics.current.reset(token)
+        duration = time.perf_counter() - started
+        match = request.resolver_match
+        view = match.view_name if match else UNRESOLVED
+        request_metrics.record(view, duration)
+        if request_metrics.keep_sql and duration >= self.slow_seconds:
+            self.log_slow(request, view, duration, request_metrics)
+        return response
+
+    def log_slow(self, request, view, duration, request_metrics):
+        queries = '\n'.join(
+            f'  {seconds * 1000:.1f} мс: {sql}'
+            for seconds, sql in request_metrics.queries
+        )
+        slow_requests.warning(
+            'Медленный запрос %s %s (%s): %.1f мс, %d запросов к базе '
+            '(%.1f мс), шаблоны %.1f мс\n%s',
+            request.method, request.get_full_path(), view, duration * 1000,
+            request_metrics.db_count, request_metrics.db_seconds * 1000,
+            request_metrics.template_seconds * 1000, queries,
+        )
@@ -0,0 +1,131 @@
+"""Чтение с реплик базы данных.
+
+Только view, помеченные ``read_replica``, читают с реплик из
+``DATABASE_REPLICAS``, и только в GET- и HEAD-запросах. Остальные
+запросы и все записи идут в основную базу. Реплика выбирается по кругу
+одна на весь запрос, чтобы страница не собиралась из реплик с разным
+отставанием; реплика, не ответившая на проверку, пропускается
+``REPLICA_HEALTH_INTERVAL`` секунд. Если живых реплик нет, чтение идёт
+в основную базу.
+
+Реплики отстают от основной базы, поэтому view с ``pin_primary``
+(запись поста, комментария, подписки) ставят cookie, и следующие
+``REPLICA_PIN_SECONDS`` секунд этот посетитель читает только из основной
+базы и видит то, что сам записал.
+
+    DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+    DATABASE_REPLICAS = ['replica_1', 'replica_2']
+"""
+import contextvars
+import itertools
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+PIN_COOKIE = 'pin_primary'
+
+# Реплика, с которой читает текущий запрос, или None.
+current = contextvars.ContextVar('replica', default=None)
+
+_health = {}
+_counter = itertools.count()
+_lock = threading.Lock()
+
+
+def check(alias):
+    """Отвечает ли реплика и есть ли в ней схема."""
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT 1 FROM django_migrations LIMIT 1')
+        return True
+    except DatabaseError:
+        return False
+
+
+def healthy(alias):
+    now = time.monotonic()
+    with _lock:
+        state = _health.get(alias)
+    interval = settings.REPLICA_HEALTH_INTERVAL
+    if state is not None and now - state[1] < interval:
+        return state[0]
+    ok = check(alias)
+    with _lock:
+        _health[alias] = (ok, now)
+    return ok
+
+
+def choose_replica():
+    replicas = settings.DATABASE_REPLICAS
+    if not replicas:
+        return None
+    start = next(_counter)
+    for shift in range(len(replicas)):
+        alias = replicas[(start + shift) % len(replicas)]
+        if healthy(alias):
+            return alias
+    return None
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        return current.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики - копии основной базы, объекты из них можно связывать.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+def replication_lag():
+    """Сколько секунд реплики могут отставать от основной базы."""
+    return settings.REPLICA_PIN_SECONDS if settings.DATABASE_REPLICAS else 0
+
+
+def is_pinned(request):
+    try:
+        until = float(request.COOKIES.get(PIN_COOKIE, 0))
+    except ValueError:
+        return False
+    return until > time.time()
+
+
+def read_replica(view):
+    """Разрешает view читать с реплик."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if (request.method not in ('GET', 'HEAD') or is_pinned(request)
+                or not settings.DATABASE_REPLICAS):
+            return view(request, *args, **kwargs)
+        # Сессия и пользователь читаются из основной базы: на реплике
+        # может ещё не быть только что созданной сессии.
+        request.user.is_authenticated
+        token = current.set(choose_replica())
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            current.reset(token)
+    return wrapper
+
+
+def pin_primary(view):
+    """После записи посетитель какое-то время читает основную базу."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if request.method == 'POST' or response.status_code == 302:
+            response.set_cookie(
+                PIN_COOKIE, str(time.time() + settings.REPLICA_PIN_SECONDS),
+                max_age=settings.REPLICA_PIN_SECONDS, httponly=True,
+                samesite='Lax')
+        return response
+    return wrapper
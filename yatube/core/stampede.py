@@ -0,0 +1,115 @@
+"""Защита от лавины пересчётов (cache stampede).
+
+Когда дорогое значение в кеше истекает, все одновременные запросы
+кидаются пересчитывать его и нагружают базу. ``get_or_set`` отдаёт
+пересчёт одному исполнителю (single flight):
+
+* исполнитель выбирается через ``cache.add`` на ключе блокировки, а
+  внутри процесса ещё и через ``threading.Lock``: файловый кеш не даёт
+  атомарного ``add``;
+* пока он считает, остальные получают устаревшее значение, которое
+  хранится ещё ``stale`` секунд после срока годности;
+* если старого значения нет, остальные ждут нового до ``wait`` секунд;
+* значение пересчитывается немного раньше срока с вероятностью, тем
+  большей, чем ближе срок и чем дольше шёл прошлый пересчёт
+  (алгоритм XFetch), поэтому до устаревания дело обычно не доходит.
+"""
+import math
+import random
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+from django.core.cache import cache as default_cache
+
+STALE_TIMEOUT = 60
+LOCK_TIMEOUT = 30
+WAIT_TIMEOUT = 5
+POLL_INTERVAL = 0.05
+
+# value - значение, expires - срок годности (time.time()),
+# delta - сколько секунд занял пересчёт.
+Entry = namedtuple('Entry', 'value expires delta')
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def lock_key(key):
+    return f'{key}:lock'
+
+
+@contextmanager
+def single_flight(key, timeout=LOCK_TIMEOUT, cache=default_cache):
+    """Отдаёт True только одному исполнителю среди процессов и потоков."""
+    with _flights_lock:
+        local = _flights.setdefault(key, threading.Lock())
+    if not local.acquire(blocking=False):
+        yield False
+        return
+    try:
+        acquired = cache.add(lock_key(key), 1, timeout)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                cache.delete(lock_key(key))
+    finally:
+        with _flights_lock:
+            _flights.pop(key, None)
+        local.release()
+
+
+def read(key, cache=default_cache):
+    entry = cache.get(key)
+    return entry if isinstance(entry, Entry) else None
+
+
+def needs_refresh(entry, beta=1.0):
+    """Истёк ли срок, с учётом досрочного пересчёта XFetch."""
+    # Случайный запас обычно мал и лишь изредка велик, поэтому досрочно
+    # пересчитывает один запрос, а не все сразу.
+    jitter = -entry.delta * beta * math.log(1 - random.random())
+    return time.time() + jitter >= entry.expires
+
+
+def refresh(key, compute, timeout, stale=STALE_TIMEOUT,
+            cache=default_cache):
+    started = time.time()
+    value = compute()
+    finished = time.time()
+    if timeout is None:
+        # Как и в кеше Django, None - хранить бессрочно.
+        entry, cache_timeout = Entry(value, math.inf, 0), None
+    else:
+        entry = Entry(value, finished + timeout, finished - started)
+        cache_timeout = timeout + stale
+    cache.set(key, entry, cache_timeout)
+    return value
+
+
+def get_or_set(key, compute, timeout, stale=STALE_TIMEOUT, beta=1.0,
+               wait=WAIT_TIMEOUT, cache=default_cache):
+    """Значение ``key`` из кеша; при промахе его считает ``compute()``."""
+    entry = read(key, cache)
+    if entry is not None and not needs_refresh(entry, beta):
+        return entry.value
+    with single_flight(key, cache=cache) as leader:
+        if leader:
+            # Значение мог только что обновить предыдущий исполнитель.
+            fresh = read(key, cache)
+            if fresh is not None and fresh.expires > time.time() and (
+                    entry is None or fresh.expires > entry.expires):
+                return fresh.value
+            return refresh(key, compute, timeout, stale, cache)
+    if entry is not None:
+        return entry.value
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = read(key, cache)
+        if entry is not None:
+            return entry.value
+    # Исполнитель не успел или упал: считаем сами.
+    return refresh(key, compute, timeout, stale, cache)
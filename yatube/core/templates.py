@@ -0,0 +1,43 @@
+"""Прогрев кеша шаблонов и замер времени их отрисовки.
+
+Без DEBUG шаблоны грузятся через cached.Loader: каждый файл читается и
+разбирается один раз на процесс. ``warm`` делает это для всех шаблонов
+заранее, при старте воркера (см. yatube/wsgi.py), чтобы первые запросы
+не платили за разбор.
+"""
+import os
+import time
+
+from django.template import engines
+from django.template.loaders.cached import Loader as CachedLoader
+
+
+def template_names(engine=None):
+    """Имена всех шаблонов из каталогов DIRS движка."""
+    engine = engine or engines['django']
+    names = []
+    for directory in engine.engine.dirs:
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                if filename.endswith('.html'):
+                    path = os.path.join(root, filename)
+                    names.append(os.path.relpath(path, directory).replace(
+                        os.sep, '/'))
+    return sorted(names)
+
+
+def warm(names=None, engine=None):
+    """Загружает шаблоны; возвращает время загрузки каждого в мс."""
+    engine = engine or engines['django']
+    timings = {}
+    for name in names or template_names(engine):
+        started = time.perf_counter()
+        engine.get_template(name)
+        timings[name] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+def uses_cached_loader(engine=None):
+    engine = engine or engines['django']
+    return any(isinstance(loader, CachedLoader)
+               for loader in engine.engine.template_loaders)
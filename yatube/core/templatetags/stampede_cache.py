@@ -0,0 +1,62 @@
+from core import stampede
+from django import template
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.cache.utils import make_template_fragment_key
+from django.templatetags.cache import CacheNode, do_cache
+
+register = template.Library()
+
+
+class StampedeCacheNode(CacheNode):
+    """Тот же {% cache %}, но фрагмент пересчитывает один запрос."""
+
+    def resolve(self, var, context):
+        try:
+            return var.resolve(context)
+        except template.VariableDoesNotExist:
+            raise template.TemplateSyntaxError(
+                f'"cache" tag got an unknown variable: {var.var!r}')
+
+    def get_cache(self, context):
+        if self.cache_name:
+            name = self.resolve(self.cache_name, context)
+            try:
+                return caches[name]
+            except InvalidCacheBackendError:
+                raise template.TemplateSyntaxError(
+                    f'Invalid cache name specified for cache tag: {name!r}')
+        try:
+            return caches['template_fragments']
+        except InvalidCacheBackendError:
+            return caches['default']
+
+    def render(self, context):
+        timeout = self.resolve(self.expire_time_var, context)
+        if timeout is not None:
+            try:
+                timeout = int(timeout)
+            except (ValueError, TypeError):
+                raise template.TemplateSyntaxError(
+                    f'"cache" tag got a non-integer timeout value: '
+                    f'{timeout!r}')
+        key = make_template_fragment_key(
+            self.fragment_name,
+            [var.resolve(context) for var in self.vary_on])
+        return stampede.get_or_set(
+            key, lambda: self.nodelist.render(context), timeout,
+            cache=self.get_cache(context))
+
+
+@register.tag('cache')
+def stampede_cache(parser, token):
+    """Замена встроенного тега с теми же аргументами::
+
+        {% load stampede_cache %}
+        {% cache 500 sidebar request.user.username using="default" %}
+            ...
+        {% endcache %}
+    """
+    node = do_cache(parser, token)
+    return StampedeCacheNode(node.nodelist, node.expire_time_var,
+                             node.fragment_name, node.vary_on,
+                             node.cache_name)
@@ -0,0 +1,71 @@
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+from .hashers import fast_password_hashing
+
+
+# Вложенность isolated_cache: очищать кеш можно только внутри неё.
+_isolated = 0
+
+
+def clear_local_cache():
+    clear_local = getattr(cache, 'clear_local', None)
+    if clear_local:
+        clear_local()
+
+
+@contextmanager
+def isolated_cache():
+    """Общий кеш тестов и замеров в отдельном временном каталоге.
+
+    Тесты и замеры очищают кеш и пишут в него данные временной базы, и с
+    общим каталогом они портили бы кеш запущенного рядом сервера.
+    Локальный уровень общий для процесса, поэтому он очищается при входе
+    и выходе.
+    """
+    global _isolated
+    location = tempfile.mkdtemp(prefix='yatube_test_cache_')
+    caches = {alias: dict(config)
+              for alias, config in settings.CACHES.items()}
+    caches['shared']['LOCATION'] = location
+    try:
+        with override_settings(CACHES=caches):
+            clear_local_cache()
+            _isolated += 1
+            try:
+                yield
+            finally:
+                _isolated -= 1
+                clear_local_cache()
+    finally:
+        shutil.rmtree(location, ignore_errors=True)
+
+
+def clear_isolated_cache():
+    """Очищает кеш, если он во временном каталоге isolated_cache."""
+    if not _isolated:
+        raise RuntimeError('Кеш не изолирован: очистка стёрла бы кеш '
+                           'рабочего сервера.')
+    cache.clear()
+
+
+class TestRunner(DiscoverRunner):
+    """Запускает тесты с отдельным кешем и быстрым хешированием паролей."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache = isolated_cache()
+        self.cache.__enter__()
+        self.hashing = fast_password_hashing()
+        self.hashing.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.hashing.disable()
+        self.cache.__exit__(None, None, None)
+        super().teardown_test_environment(**kwargs)
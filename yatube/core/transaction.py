@@ -0,0 +1,29 @@
+"""Транзакции, которые сразу берут блокировку на запись.
+
+В core.backends.sqlite3 обычный ``transaction.atomic`` начинается с
+отложенного ``BEGIN`` и не встаёт в очередь на запись, поэтому читающие
+блоки не ждут друг друга. Блок, который будет писать, открывается через
+``atomic(immediate=True)``: он начинается с ``BEGIN IMMEDIATE`` и
+очереди писателей. Иначе блок, который сначала читает, а потом пишет,
+при занятой базе сразу получает ``database is locked``.
+
+Флаг действует только на внешний блок: вложенный ``atomic`` продолжает
+уже начатую транзакцию. Другие бэкенды его не замечают.
+"""
+from contextlib import contextmanager
+
+from django.db import transaction
+
+
+@contextmanager
+def atomic(using=None, savepoint=True, immediate=False):
+    connection = transaction.get_connection(using)
+    outermost = immediate and not connection.in_atomic_block
+    if outermost:
+        connection.begin_immediate = True
+    try:
+        with transaction.atomic(using, savepoint):
+            yield
+    finally:
+        if outermost:
+            connection.begin_immediate = False
@@ -1,6 +1,12 @@
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
 from django.shortcuts import render
+from django.utils.crypto import constant_time_compare
 from http import HTTPStatus
 
+from . import metrics
+
 
 def page_not_found(request, exception):
     return render(request, 'core/404.html', {'path': request.path},
@@ -13,3 +19,15 @@ def permission_denied(request, exception):
 
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html')
+
+
+def metrics_view(request):
+    """Метрики для Prometheus: по токену или для сотрудников."""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    authorization = request.META.get('HTTP_AUTHORIZATION', '')
+    if not (request.user.is_staff
+            or token and constant_time_compare(authorization,
+                                               f'Bearer {token}')):
+        raise PermissionDenied
+    return HttpResponse(metrics.expose(),
+                        content_type='text/plain; version=0.0.4')
@@ -2,6 +2,7 @@ from django.contrib import admin
 
 from .models import Post
 from .models import Group
+from .models import Job
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -21,3 +22,13 @@ admin.site.register(Post, PostAdmin)
 
 
 admin.site.register(Group)
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'task', 'attempts', 'run_at', 'locked_until',
+                    'failed')
+    list_filter = ('failed', 'task')
+    readonly_fields = ('last_error',)
+
+
+admin.site.register(Job, JobAdmin)
@@ -0,0 +1,202 @@
+"""Вспомогательные функции для замеров производительности."""
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from core.hashers import fast_password_hashing
+from core.testing import isolated_cache
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils import timezone
+from faker import Faker
+
+from . import constants, counters, feed
+from .forms import PostForm
+from .models import Comment, Follow, Group, Post
+from .search import get_backend as get_search_backend
+from .utils import WindowPaginator, auto_now_disabled
+
+User = get_user_model()
+
+SEED_BATCH_SIZE = 5000
+SEED_PASSWORD = 'bench-password'
+
+
+@contextmanager
+def benchmark_database(verbosity=0):
+    """Создаёт временную базу, как при тестах, и удаляет её после замера.
+
+    Рабочая база и кеш при этом не затрагиваются: на время замера кеш
+    переезжает во временный каталог. Пароли во временной базе хешируются
+    быстрым профилем.
+    """
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(
+        verbosity=verbosity, autoclobber=True, serialize=False)
+    try:
+        with isolated_cache(), fast_password_hashing():
+            yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+
+
+def default_text(num):
+    return f'Пост для замера №{num}'
+
+
+def seed_posts(count, authors=10, groups=5, batch_size=SEED_BATCH_SIZE,
+               make_text=default_text):
+    """Наполняет базу постами с различающимися датами публикации.
+
+    У всех авторов пароль ``SEED_PASSWORD``.
+    """
+    password = make_password(SEED_PASSWORD)
+    users = User.objects.bulk_create(
+        User(username=f'bench_author_{num}', password=password)
+        for num in range(authors))
+    users = list(User.objects.filter(
+        username__in=[user.username for user in users]))
+    Group.objects.bulk_create(
+        Group(title=f'Группа {num}', slug=f'bench-group-{num}',
+              description='Группа для замеров')
+        for num in range(groups)
+    )
+    group_list = list(Group.objects.filter(slug__startswith='bench-group-'))
+    start = timezone.now()
+    with auto_now_disabled(Post, 'pub_date'):
+        for offset in range(0, count, batch_size):
+            Post.objects.bulk_create(
+                Post(
+                    text=make_text(num),
+                    author=users[num % len(users)],
+                    group=group_list[num % len(group_list)],
+                    pub_date=start - timedelta(seconds=num),
+                )
+                for num in range(offset, min(offset + batch_size, count))
+            )
+
+
+def seed_comments(post, count, authors, batch_size=SEED_BATCH_SIZE):
+    """Наполняет пост комментариями с различающимися датами."""
+    start = timezone.now()
+    with auto_now_disabled(Comment, 'created'):
+        for offset in range(0, count, batch_size):
+            Comment.objects.bulk_create(
+                Comment(
+                    text=f'Комментарий для замера №{num}', post=post,
+                    author=authors[num % len(authors)],
+                    created=start - timedelta(seconds=num),
+                )
+                for num in range(offset, min(offset + batch_size, count))
+            )
+
+
+def seed_site(users, groups, posts, comments, follows, seed=0):
+    """Наполняет базу сайтом с текстами Faker.
+
+    Записи создаются пачками в обход сигналов, поэтому счётчики, ленты
+    подписок и поисковый индекс затем пересчитываются целиком.
+    """
+    fake = Faker('ru_RU')
+    fake.seed_instance(seed)
+    rng = random.Random(seed)
+    sentences = [fake.sentence(nb_words=12) for _ in range(1000)]
+
+    seed_posts(posts, authors=users, groups=groups,
+               make_text=lambda num: rng.choice(sentences))
+    user_ids = list(User.objects.filter(
+        username__startswith='bench_author_').values_list('pk', flat=True))
+    post_ids = list(Post.objects.values_list('pk', flat=True))
+    start = timezone.now()
+    with auto_now_disabled(Comment, 'created'):
+        for offset in range(0, comments, SEED_BATCH_SIZE):
+            Comment.objects.bulk_create(
+                Comment(
+                    text=rng.choice(sentences),
+                    post_id=rng.choice(post_ids),
+                    author_id=rng.choice(user_ids),
+                    created=start - timedelta(seconds=num),
+                )
+                for num in range(offset,
+                                 min(offset + SEED_BATCH_SIZE, comments))
+            )
+    per_user = min(follows, len(user_ids) - 1)
+    Follow.objects.bulk_create(
+        Follow(user_id=user_id, author_id=author_id)
+        for user_id in user_ids
+        for author_id in rng.sample(
+            [other for other in user_ids if other != user_id], per_user)
+    )
+    counters.reconcile()
+    for user in User.objects.filter(pk__in=user_ids):
+        feed.rebuild(user)
+    get_search_backend().rebuild()
+
+
+def template_context(request, per_page=constants.POSTS_PER_PAGE):
+    """Контекст, с которым отрисовывается любой шаблон сайта.
+
+    Объекты не сохраняются в базу, поэтому отрисовка не делает запросов
+    и замеряет только сами шаблоны.
+    """
+    now = timezone.now()
+    author = User(pk=1, username='bench_author', first_name='Лев',
+                  last_name='Толстой')
+    group = Group(pk=1, title='Группа', slug='bench-group',
+                  description='Группа для замеров')
+    posts = [
+        Post(pk=num, text=f'Пост для замера №{num}', author=author,
+             group=group, pub_date=now, updated=now)
+        for num in range(1, per_page + 1)
+    ]
+    comments = [
+        Comment(pk=num, text=f'Комментарий №{num}', author=author,
+                post=posts[0], created=now)
+        for num in range(1, constants.COMMENTS_PER_PAGE + 1)
+    ]
+    return {
+        'request': request,
+        # Середина длинного списка: отрисовывается и окно пагинатора.
+        'page_obj': WindowPaginator(posts * 1000, per_page).get_page(500),
+        'comments': Paginator(comments, len(comments)).get_page(1),
+        'post': posts[0],
+        'author': author,
+        'group': group,
+        'form': PostForm(),
+        'following': False,
+        'posts_count': per_page,
+        'user_posts_count': per_page,
+        'query': 'замер',
+        'page_query': '',
+        'index': True,
+    }
+
+
+def measure(func, repeat):
+    """Выполняет ``func`` ``repeat`` раз и возвращает длительности в мс."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def percentile(samples, rank):
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1,
+                       round(rank / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summary(samples):
+    return {
+        'min': min(samples),
+        'p50': percentile(samples, 50),
+        'p95': percentile(samples, 95),
+        'p99': percentile(samples, 99),
+        'max': max(samples),
+    }
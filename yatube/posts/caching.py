@@ -0,0 +1,85 @@
+"""Версионированный кэш фрагментов шаблонов.
+
+Карточка поста кэшируется по id и дате изменения поста и имени
+автора, поэтому правка поста или смена имени сама по себе даёт новый
+ключ. Обёртки списков
+дополнительно зависят от версии списков, которую сигналы меняют при
+любом изменении постов, комментариев и групп. Версия хранится только
+в общем кеше, чтобы её смену сразу видели все воркеры.
+"""
+import hashlib
+import time
+from collections import Counter
+
+from core import routers, stampede
+from core.cache import shared_cache
+from django.utils import timezone
+
+from . import constants
+from .models import Post
+
+LIST_VERSION_KEY = 'posts:list_version'
+
+stats = Counter()
+
+
+def list_version():
+    version = shared_cache().get(LIST_VERSION_KEY)
+    if version is None:
+        version = bump_list_version()
+    return version
+
+
+def bump_list_version():
+    version = time.time()
+    shared_cache().set(LIST_VERSION_KEY, version, None)
+    return version
+
+
+def touch_posts(queryset):
+    """Обновляет дату изменения постов, чтобы сменились ключи карточек."""
+    queryset.update(updated=timezone.now())
+    bump_list_version()
+
+
+def touch_post(post_id):
+    touch_posts(Post.objects.filter(pk=post_id))
+
+
+def fragment_key(kind, name, *parts):
+    digest = hashlib.md5(
+        ':'.join(str(part) for part in parts).encode()).hexdigest()
+    return f'posts:fragment:{kind}:{name}:{digest}'
+
+
+def post_card_key(name, post):
+    return fragment_key('card', name, post.pk, post.updated.isoformat(),
+                        post.author.get_full_name())
+
+
+def post_list_key(name, page_obj, *vary_on):
+    version = list_version()
+    if (routers.current.get()
+            and version > time.time() - routers.replication_lag()):
+        # Список читался с реплики, которая могла не получить последние
+        # изменения: не кешируем его под новой версией.
+        return None
+    page_id = page_obj.number
+    if page_id is None:
+        # Страница по курсору: её однозначно задаёт курсор назад.
+        page_id = page_obj.previous_cursor
+    return fragment_key('list', name, version, page_id, *vary_on)
+
+
+def get_or_render(key, render, timeout=constants.FRAGMENT_CACHE_TIMEOUT):
+    """Фрагмент из кеша; при промахе его отрисовывает один запрос."""
+    rendered = False
+
+    def counted():
+        nonlocal rendered
+        rendered = True
+        return render()
+
+    value = stampede.get_or_set(key, counted, timeout)
+    stats['misses' if rendered else 'hits'] += 1
+    return value
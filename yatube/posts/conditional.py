@@ -0,0 +1,66 @@
+"""Условные GET-запросы для лент и страницы поста.
+
+Валидаторы строятся из версии списков (posts.caching), которую сигналы
+меняют при любом изменении постов, комментариев и групп, поэтому для
+ответа 304 не нужно ни запросов к базе, ни отрисовки шаблона. В ETag
+также входят адрес со страницей и пользователь, а в профиле - ещё и
+подписка на автора.
+"""
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from . import caching, lookups
+
+
+def _user_state(request):
+    if request.user.is_authenticated:
+        return request.user.pk
+    return 'anon'
+
+
+def _etag(*parts):
+    return hashlib.md5(
+        ':'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def list_etag(request, *args, **kwargs):
+    return _etag(caching.list_version(), request.get_full_path(),
+                 _user_state(request))
+
+
+def profile_etag(request, username):
+    following = lookups.is_following(
+        request.user, lookups.author_for(request, username))
+    return _etag(list_etag(request), following)
+
+
+def list_last_modified(request, *args, **kwargs):
+    return datetime.fromtimestamp(caching.list_version(), timezone.utc)
+
+
+def conditional_page(etag_func=list_etag):
+    """Отвечает 304, если у клиента актуальная копия страницы.
+
+    ``no-cache`` заставляет браузер и прокси спрашивать сервер перед
+    каждым показом сохранённой копии, а не угадывать её свежесть.
+    """
+    def decorator(view):
+        conditional_view = condition(
+            etag_func=etag_func,
+            last_modified_func=list_last_modified,
+        )(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if request.user.is_authenticated:
+                patch_cache_control(response, private=True, no_cache=True)
+            else:
+                patch_cache_control(response, public=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
@@ -1,3 +1,47 @@
 POST_FILTER = 10
 POSTS_PER_PAGE = 10
+COMMENTS_PER_PAGE = 20
 SYMBOLS = 15
+# Авторы с большим числом подписчиков не рассылаются по лентам,
+# их посты подмешиваются в ленту при чтении
+FEED_FANOUT_LIMIT = 1000
+# Сколько последних постов автора попадает в ленту при подписке
+FEED_BACKFILL_LIMIT = 1000
+FRAGMENT_CACHE_TIMEOUT = 60 * 60
+# Размеры миниатюр картинок постов: имя -> (ширина, высота)
+THUMBNAIL_SIZES = {
+    'card': (960, 339),
+}
+THUMBNAIL_QUALITY = 85
+THUMBNAIL_WORKERS = 4
+# Типы записей и форматы файлов загрузки и выгрузки контента
+CONTENT_RECORD_TYPES = ('group', 'post', 'comment', 'follow')
+CONTENT_FORMATS = ('jsonl', 'csv')
+# Время жизни закешированных групп, авторов и подписок, секунд
+LOOKUP_CACHE_TIMEOUT = 600
+# Полностраничный кеш для гостей: сколько страница считается свежей и
+# сколько ещё её можно отдавать, пока другой запрос её обновляет, секунд
+PAGE_CACHE_TIMEOUT = 600
+PAGE_CACHE_STALE = 60
+PAGE_CACHE_LOCK_TIMEOUT = 30
+# Очередь задач: попыток на задачу, задержка перед первым повтором
+# (дальше удваивается) и её предел, сколько воркер может держать задачу,
+# прежде чем её возьмёт другой, и пауза при пустой очереди, секунд
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_DELAY = 10
+JOB_RETRY_MAX_DELAY = 60 * 60
+JOB_VISIBILITY_TIMEOUT = 5 * 60
+JOB_POLL_INTERVAL = 1
+# Допустимое время отрисовки шаблона (p95) в warm_templates, мс
+TEMPLATE_BUDGET_MS = 50
+# Окно пагинатора: номеров вокруг текущей страницы и у краёв списка
+PAGE_WINDOW_ON_EACH_SIDE = 2
+PAGE_WINDOW_ON_ENDS = 1
+# Сколько хранится число записей списка для пагинатора, секунд
+PAGE_COUNT_CACHE_TIMEOUT = 10 * 60
+# Списки без фильтров с большим числом записей (по оценке) считаются
+# приблизительно; сколько хранится число записей ленты подписок, секунд
+APPROXIMATE_COUNT_FROM = 100_000
+# Как часто общее число постов главной пересчитывается заново, секунд
+TOTAL_POSTS_PERIOD = 60 * 60
+FEED_COUNT_CACHE_TIMEOUT = 60
@@ -0,0 +1,180 @@
+"""Денормализованные счётчики постов, комментариев и подписок.
+
+Счётчики меняются атомарными UPDATE ... SET field = field + delta,
+а расхождения исправляет команда reconcile_counters. Общее число
+постов для главной хранится в общем кеше и меняется cache.incr.
+
+cache.incr не откатывается вместе с транзакцией, а в файловом кеше это
+чтение и запись, поэтому одновременные посты могут потеряться. Такое
+расхождение живёт не дольше TOTAL_POSTS_PERIOD: ключ счётчика сменяется
+раз в период, и новый считается COUNT(*) по основной базе.
+"""
+import time
+
+from core.cache import shared_cache
+from core.transaction import atomic
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from . import constants, counting
+from .models import Comment, Follow, Group, Post, User, UserStats
+
+
+def _count(queryset, field):
+    """Подзапрос с числом строк ``queryset`` для внешней строки."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef('pk')})
+            .order_by()
+            .values(field)
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        0,
+    )
+
+
+def actual_user_counts():
+    return {
+        'posts_count': _count(Post.objects.all(), 'author'),
+        'followers_count': _count(Follow.objects.all(), 'author'),
+        'following_count': _count(Follow.objects.all(), 'user'),
+    }
+
+
+# У UserStats первичный ключ совпадает с id пользователя, поэтому
+# подзапросы для User подходят и для UserStats.
+ACTUAL_COUNTS = {
+    Group: lambda: {'posts_count': _count(Post.objects.all(), 'group')},
+    Post: lambda: {'comments_count': _count(Comment.objects.all(), 'post')},
+    UserStats: actual_user_counts,
+}
+
+
+def _change(queryset, field, delta):
+    if delta < 0:
+        # Разошедшийся счётчик не уходит в минус, его поправит сверка.
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    return queryset.update(**{field: F(field) + delta})
+
+
+def create_stats(user_id):
+    counts = User.objects.filter(pk=user_id).annotate(
+        **actual_user_counts()).values(*actual_user_counts()).first()
+    stats, _ = UserStats.objects.get_or_create(user_id=user_id,
+                                               defaults=counts)
+    return stats
+
+
+def user_stats(user):
+    try:
+        return user.stats
+    except UserStats.DoesNotExist:
+        return create_stats(user.pk)
+
+
+def change_user(user_id, field, delta):
+    updated = _change(UserStats.objects.filter(user_id=user_id), field, delta)
+    if not updated and delta > 0:
+        create_stats(user_id)
+
+
+def change_group(group_id, delta):
+    if group_id is not None:
+        _change(Group.objects.filter(pk=group_id), 'posts_count', delta)
+
+
+def total_posts_key():
+    period = int(time.time() // constants.TOTAL_POSTS_PERIOD)
+    return f'posts:total_posts:{period}'
+
+
+def count_total_posts():
+    # Основная база: число с отстающей реплики жило бы до конца периода.
+    total = Post.objects.using(DEFAULT_DB_ALIAS).count()
+    shared_cache().set(total_posts_key(), total,
+                       constants.TOTAL_POSTS_PERIOD)
+    return total
+
+
+class TotalPostsCount:
+    """COUNT(*) всех постов, который заново заполняет счётчик."""
+
+    def count(self, object_list):
+        return count_total_posts(), counting.EXACT
+
+
+def total_posts_counter():
+    """Стратегия числа постов для главной.
+
+    Обычно это счётчик из кеша. Без него большая таблица оценивается по
+    первичному ключу, а счётчик заполнит следующий пост или
+    reconcile_counters; маленькая считается COUNT(*), и счётчик
+    заполняется сразу.
+    """
+    total = shared_cache().get(total_posts_key())
+    if total is not None:
+        return counting.Counter(total)
+    return counting.Approximate(TotalPostsCount())
+
+
+def change_total(delta):
+    # Расхождение поправляет пагинатор на последней странице, а
+    # окончательно - смена ключа или сверка.
+    try:
+        shared_cache().incr(total_posts_key(), delta)
+    except ValueError:
+        # Счётчика нет в кеше: пост уже записан, и COUNT(*) его учтёт.
+        count_total_posts()
+
+
+@atomic(immediate=True)
+def post_added(post):
+    change_user(post.author_id, 'posts_count', 1)
+    change_group(post.group_id, 1)
+    change_total(1)
+
+
+@atomic(immediate=True)
+def post_removed(post):
+    change_user(post.author_id, 'posts_count', -1)
+    change_group(post.group_id, -1)
+    change_total(-1)
+
+
+@atomic(immediate=True)
+def post_moved(old_group_id, new_group_id):
+    change_group(old_group_id, -1)
+    change_group(new_group_id, 1)
+
+
+def comment_changed(comment, delta):
+    _change(Post.objects.filter(pk=comment.post_id), 'comments_count', delta)
+
+
+@atomic(immediate=True)
+def follow_changed(follow, delta):
+    change_user(follow.author_id, 'followers_count', delta)
+    change_user(follow.user_id, 'following_count', delta)
+
+
+def reconcile():
+    """Исправляет разошедшиеся счётчики и возвращает число исправлений."""
+    count_total_posts()
+    missing = User.objects.filter(stats__isnull=True).values_list(
+        'pk', flat=True)
+    UserStats.objects.bulk_create(
+        [UserStats(user_id=user_id) for user_id in missing],
+        ignore_conflicts=True,
+    )
+    fixed = {}
+    for model, actual_counts in ACTUAL_COUNTS.items():
+        fixed[model._meta.model_name] = 0
+        for field, actual in actual_counts().items():
+            with atomic(immediate=True):
+                fixed[model._meta.model_name] += (
+                    model.objects.exclude(**{field: actual})
+                    .update(**{field: actual})
+                )
+    return fixed
@@ -0,0 +1,90 @@
+"""Способы узнать число записей списка для пагинатора.
+
+``page_nav`` получает стратегию и не делает COUNT(*), если стратегия
+может ответить иначе:
+
+* ``Exact`` - честный COUNT(*);
+* ``Counter`` - значение уже известного денормализованного счётчика;
+* ``Approximate`` - оценка по первичному ключу для большой таблицы
+  без фильтров, для маленьких - запасная стратегия;
+* ``Cached`` - результат другой стратегии в кеше на ``timeout`` секунд.
+
+Стратегия возвращает пару (число, режим). Неточное число (любой режим,
+кроме ``EXACT``) пагинатор поправляет по факту, когда доходит до конца
+списка, а режим доступен шаблонам как ``paginator.count_mode``.
+"""
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Max, Min, QuerySet
+
+from . import constants
+
+EXACT = 'exact'
+COUNTER = 'counter'
+CACHED = 'cached'
+APPROXIMATE = 'approximate'
+
+
+class Exact:
+
+    def count(self, object_list):
+        return Paginator(object_list, 1).count, EXACT
+
+
+class Counter:
+    """Число из счётчика вроде ``Group.posts_count``."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def count(self, object_list):
+        return self.value, COUNTER
+
+
+def estimate(queryset):
+    """Оценка числа строк таблицы без фильтров или None.
+
+    Разница крайних первичных ключей берётся из индекса и не зависит от
+    размера таблицы; удалённые записи делают оценку завышенной.
+    """
+    if not isinstance(queryset, QuerySet) or queryset.query.where:
+        return None
+    # Два отдельных запроса: SQLite берёт из индекса только одиночный
+    # MIN или MAX.
+    rows = queryset.model._base_manager.using(queryset.db)
+    low = rows.aggregate(value=Min('pk'))['value']
+    if low is None:
+        return 0
+    return rows.aggregate(value=Max('pk'))['value'] - low + 1
+
+
+class Approximate:
+
+    def __init__(self, fallback=None, threshold=None):
+        self.fallback = fallback or Exact()
+        self.threshold = threshold or constants.APPROXIMATE_COUNT_FROM
+
+    def count(self, object_list):
+        value = estimate(object_list)
+        if value is None or value < self.threshold:
+            return self.fallback.count(object_list)
+        return value, APPROXIMATE
+
+
+class Cached:
+    """Кеширует число под ключом ``key`` на ``timeout`` секунд."""
+
+    def __init__(self, key, inner=None,
+                 timeout=constants.PAGE_COUNT_CACHE_TIMEOUT):
+        self.key = key
+        self.inner = inner or Exact()
+        self.timeout = timeout
+
+    def count(self, object_list):
+        result = cache.get(self.key)
+        if result is None:
+            result = self.inner.count(object_list)
+            cache.set(self.key, result, self.timeout)
+            return result
+        value, mode = result
+        return value, CACHED if mode == EXACT else mode
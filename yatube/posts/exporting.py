@@ -0,0 +1,137 @@
+"""Потоковая выгрузка групп, постов, комментариев и подписок.
+
+Записи выдаются в формате posts.importing, поэтому выгрузку можно
+загрузить обратно командой import_content. Таблицы читаются пачками по
+первичному ключу (keyset), и память не растёт вместе с их размером.
+"""
+import csv
+import json
+import zlib
+
+from . import constants
+from .models import Comment, Follow, Group, Post
+
+DEFAULT_CHUNK_SIZE = 2000
+# Строки склеиваются в куски такого размера перед отправкой.
+OUTPUT_CHUNK = 64 * 1024
+CSV_FIELDS = ('type', 'id', 'slug', 'title', 'description', 'author',
+              'group', 'text', 'pub_date', 'post', 'created', 'user')
+
+
+def keyset_rows(queryset, fields, chunk_size):
+    """Значения ``fields`` строк ``queryset`` пачками по возрастанию pk."""
+    last = 0
+    while True:
+        chunk = queryset.filter(pk__gt=last).order_by('pk').values_list(
+            'pk', *fields)[:chunk_size]
+        count = 0
+        for row in chunk.iterator(chunk_size=chunk_size):
+            count += 1
+            last = row[0]
+            yield row
+        if count < chunk_size:
+            return
+
+
+def filter_posts(author=None, group=None, since=None, until=None):
+    posts = Post.objects.all()
+    if author:
+        posts = posts.filter(author__username=author)
+    if group:
+        posts = posts.filter(group__slug=group)
+    if since:
+        posts = posts.filter(pub_date__date__gte=since)
+    if until:
+        posts = posts.filter(pub_date__date__lte=until)
+    return posts
+
+
+def export_records(author=None, group=None, since=None, until=None,
+                   types=constants.CONTENT_RECORD_TYPES,
+                   chunk_size=DEFAULT_CHUNK_SIZE):
+    """Записи выгрузки: сначала группы, затем посты, комментарии и
+    подписки, чтобы при загрузке ссылки находили свои объекты.
+
+    С фильтром по группе или датам выгружаются подписки только на
+    авторов попавших в выгрузку постов."""
+    posts = filter_posts(author, group, since, until)
+    if 'group' in types:
+        groups = Group.objects.filter(pk__in=posts.values('group'))
+        for _, slug, title, description in keyset_rows(
+                groups, ('slug', 'title', 'description'), chunk_size):
+            yield {'type': 'group', 'slug': slug, 'title': title,
+                   'description': description}
+    if 'post' in types:
+        for pk, username, slug, text, pub_date in keyset_rows(
+                posts, ('author__username', 'group__slug', 'text',
+                        'pub_date'), chunk_size):
+            yield {'type': 'post', 'id': pk, 'author': username,
+                   'group': slug, 'text': text,
+                   'pub_date': pub_date.isoformat()}
+    if 'comment' in types:
+        comments = Comment.objects.filter(post__in=posts.values('pk'))
+        for _, post_id, username, text, created in keyset_rows(
+                comments, ('post', 'author__username', 'text', 'created'),
+                chunk_size):
+            yield {'type': 'comment', 'post': post_id, 'author': username,
+                   'text': text, 'created': created.isoformat()}
+    if 'follow' in types:
+        follows = Follow.objects.all()
+        if author:
+            follows = follows.filter(author__username=author)
+        if group or since or until:
+            follows = follows.filter(author__in=posts.values('author'))
+        for _, user, author_name in keyset_rows(
+                follows, ('user__username', 'author__username'),
+                chunk_size):
+            yield {'type': 'follow', 'user': user, 'author': author_name}
+
+
+def render_jsonl(records):
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+class _Line:
+    """Буфер для csv.writer, который просто возвращает строку."""
+
+    def write(self, value):
+        return value
+
+
+def render_csv(records):
+    writer = csv.DictWriter(_Line(), CSV_FIELDS)
+    yield writer.writeheader()
+    for record in records:
+        yield writer.writerow(record)
+
+
+RENDERERS = {'jsonl': render_jsonl, 'csv': render_csv}
+
+
+def encode(lines):
+    """Склеивает строки в куски байтов около OUTPUT_CHUNK."""
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= OUTPUT_CHUNK:
+            yield ''.join(buffer).encode()
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer).encode()
+
+
+def gzipped(chunks):
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_stream(fmt='jsonl', compress=False, **filters):
+    """Готовые к отправке куски байтов выгрузки."""
+    chunks = encode(RENDERERS[fmt](export_records(**filters)))
+    return gzipped(chunks) if compress else chunks
@@ -0,0 +1,105 @@
+"""Материализованная лента подписок.
+
+Новый пост рассылается в ленты подписчиков при записи (fan-out on
+write). Посты авторов с очень большим числом подписчиков не
+рассылаются, а подмешиваются в ленту при чтении (fan-out on read).
+Последние посты автора попадают в ленту при подписке и пересборке
+ленты независимо от числа подписчиков, а когда автор перестаёт быть
+знаменитостью, они рассылаются всем его подписчикам.
+"""
+from django.db.models import F, Q
+
+from . import constants
+from .models import FeedItem, Follow, Post, User, UserStats
+
+
+def is_celebrity(author):
+    return UserStats.objects.filter(
+        user=author,
+        followers_count__gt=constants.FEED_FANOUT_LIMIT,
+    ).exists()
+
+
+def celebrities_followed_by(user):
+    return Follow.objects.filter(
+        user=user,
+        author__stats__followers_count__gt=constants.FEED_FANOUT_LIMIT,
+    ).values('author')
+
+
+def fan_out(post):
+    """Добавляет новый пост в ленты подписчиков автора."""
+    if is_celebrity(post.author):
+        return
+    followers = Follow.objects.filter(author=post.author).values_list(
+        'user_id', flat=True)
+    FeedItem.objects.bulk_create(
+        (FeedItem(user_id=user_id, post=post, pub_date=post.pub_date)
+         for user_id in followers.iterator()),
+        ignore_conflicts=True,
+    )
+
+
+def latest_posts(author_id):
+    return Post.objects.filter(author_id=author_id).order_by(
+        '-pub_date').values_list('pk', 'pub_date')[
+            :constants.FEED_BACKFILL_LIMIT]
+
+
+def backfill(user, author):
+    """Заполняет ленту последними постами автора после подписки."""
+    FeedItem.objects.bulk_create(
+        (FeedItem(user=user, post_id=post_id, pub_date=pub_date)
+         for post_id, pub_date in latest_posts(author.pk)),
+        ignore_conflicts=True,
+    )
+
+
+def follower_lost(author_id):
+    """Рассылает последние посты автора, переставшего быть знаменитостью.
+
+    Посты, написанные без рассылки, иначе пропали бы из лент подписчиков.
+    """
+    if not UserStats.objects.filter(
+            user_id=author_id,
+            followers_count=constants.FEED_FANOUT_LIMIT).exists():
+        return
+    posts = list(latest_posts(author_id))
+    followers = Follow.objects.filter(author_id=author_id).values_list(
+        'user_id', flat=True)
+    for user_id in followers.iterator():
+        FeedItem.objects.bulk_create(
+            (FeedItem(user_id=user_id, post_id=post_id, pub_date=pub_date)
+             for post_id, pub_date in posts),
+            ignore_conflicts=True,
+        )
+
+
+def trim(user, author):
+    """Убирает посты автора из ленты после отписки."""
+    FeedItem.objects.filter(user=user, post__author=author).delete()
+
+
+def rebuild(user):
+    FeedItem.objects.filter(user=user).delete()
+    for author in User.objects.filter(following__user=user):
+        backfill(user, author)
+
+
+def count_key(user_id):
+    """Ключ кеша с числом постов в ленте подписок пользователя."""
+    return f'posts:feed:count:{user_id}'
+
+
+def feed_for(user):
+    """Посты ленты подписок пользователя, от новых к старым."""
+    celebrities = celebrities_followed_by(user)
+    if not celebrities.exists():
+        # Чтение идёт по индексу (user, -pub_date, -post) материализованной
+        # ленты; id поста различает посты с одинаковой датой.
+        return Post.objects.filter(feed_items__user=user).order_by(
+            '-feed_items__pub_date', F('feed_items__post_id').desc())
+    return Post.objects.filter(
+        Q(pk__in=FeedItem.objects.filter(user=user).values('post'))
+        | Q(author__in=celebrities)
+    )
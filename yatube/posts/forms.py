@@ -1,4 +1,5 @@
 from django import forms
+from .constants import CONTENT_FORMATS, CONTENT_RECORD_TYPES
 from .models import Post, Comment
 
 
@@ -24,3 +25,25 @@ class CommentForm(forms.ModelForm):
         if data == '':
             raise forms.ValidationError('Данное поле должно быть заполнено')
         return data
+
+
+class ExportForm(forms.Form):
+    author = forms.CharField(required=False, label='Автор')
+    group = forms.SlugField(required=False, label='Группа')
+    since = forms.DateField(required=False, label='С даты')
+    until = forms.DateField(required=False, label='По дату')
+    format = forms.ChoiceField(choices=[(fmt, fmt) for fmt in CONTENT_FORMATS],
+                               required=False, label='Формат')
+    types = forms.MultipleChoiceField(
+        choices=[(name, name) for name in CONTENT_RECORD_TYPES],
+        required=False, label='Типы записей')
+    gzip = forms.BooleanField(required=False, label='Сжать gzip')
+
+    def clean(self):
+        data = super().clean()
+        since, until = data.get('since'), data.get('until')
+        if since and until and since > until:
+            raise forms.ValidationError('Начальная дата позже конечной')
+        data['format'] = data.get('format') or CONTENT_FORMATS[0]
+        data['types'] = data.get('types') or CONTENT_RECORD_TYPES
+        return data
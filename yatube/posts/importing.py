@@ -0,0 +1,348 @@
+"""Массовая загрузка групп, постов, комментариев и подписок.
+
+Записи читаются потоком из JSONL или CSV, проверяются правилами
+PostForm и CommentForm и пишутся пачками через bulk_create. Авторы и
+группы ищутся по словарям в памяти, а не запросом на каждую строку.
+
+Формат записей (его же выдаёт posts.exporting)::
+
+    {"type": "group", "slug": "cats", "title": "Коты", "description": ""}
+    {"type": "post", "id": 7, "author": "leo", "group": "cats",
+     "text": "...", "pub_date": "2021-01-01T10:00:00+00:00"}
+    {"type": "comment", "post": 7, "author": "kitty", "text": "...",
+     "created": "2021-01-02T10:00:00+00:00"}
+    {"type": "follow", "user": "kitty", "author": "leo"}
+
+``id`` поста нужен только для ссылок из комментариев того же файла:
+посты получают новые id, а ``post`` комментария сначала ищется среди
+загруженных постов, затем среди уже существующих.
+"""
+import csv
+import json
+import time
+import uuid
+
+from core.transaction import atomic
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import caching, constants, counters, feed, page_cache
+from .forms import CommentForm, PostForm
+from .models import Comment, Follow, Group, Post, User
+from .search import get_backend as get_search_backend
+from .utils import auto_now_disabled
+
+RECORD_TYPES = constants.CONTENT_RECORD_TYPES
+DEFAULT_BATCH_SIZE = 5000
+# SQLite ограничивает число параметров запроса 999.
+LOOKUP_CHUNK = 500
+
+
+class RecordError(Exception):
+    """Запись не прошла проверку и пропускается."""
+
+
+def read_jsonl(file):
+    for line, text in enumerate(file, start=1):
+        if text.strip():
+            try:
+                yield line, json.loads(text)
+            except ValueError as error:
+                yield line, RecordError(f'некорректный JSON: {error}')
+
+
+def read_csv(file):
+    # Первая строка - заголовок, поэтому данные начинаются со второй.
+    for line, row in enumerate(csv.DictReader(file), start=2):
+        yield line, {key: value for key, value in row.items()
+                     if value not in ('', None)}
+
+
+READERS = {'jsonl': read_jsonl, 'csv': read_csv}
+
+
+def chunked(values):
+    values = list(values)
+    for start in range(0, len(values), LOOKUP_CHUNK):
+        yield values[start:start + LOOKUP_CHUNK]
+
+
+def parse_date(value):
+    if value is None:
+        return timezone.now()
+    try:
+        date = parse_datetime(str(value))
+    except ValueError:
+        # Дата в верном формате, но несуществующая: 2020-13-45.
+        date = None
+    if date is None:
+        raise RecordError(f'некорректная дата {value!r}')
+    if timezone.is_naive(date):
+        date = timezone.make_aware(date)
+    return date
+
+
+class TextValidator:
+    """Проверяет текст полем и clean_text формы.
+
+    Форма создаётся один раз: конструктор ModelForm копирует все поля
+    и на каждой строке стоил бы дороже самой записи в базу.
+    """
+
+    def __init__(self, form_class):
+        self.form = form_class()
+        self.field = self.form.fields['text']
+
+    def __call__(self, text):
+        try:
+            self.form.cleaned_data = {'text': self.field.clean(text)}
+            return self.form.clean_text()
+        except ValidationError as error:
+            raise RecordError('text: ' + ' '.join(error.messages))
+
+
+class Importer:
+    """Копит проверенные записи и пишет их пачками по ``batch_size``.
+
+    ``progress`` вызывается после каждой пачки со словарём счётчиков.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, create_authors=False,
+                 progress=None):
+        self.batch_size = batch_size
+        self.create_authors = create_authors
+        self.progress = progress
+        self.users = dict(User.objects.values_list('username', 'pk'))
+        self.groups = dict(Group.objects.values_list('slug', 'pk'))
+        self.posts = {}
+        # Ключ загрузки поста: id загрузки и номер строки.
+        self.import_id = uuid.uuid4().hex
+        self.pending = {name: [] for name in RECORD_TYPES}
+        self.new_users = set()
+        self.new_groups = set()
+        self.touched_users = set()
+        self.stats = dict.fromkeys(RECORD_TYPES + ('errors',), 0)
+        self.errors = []
+        self.validate_post = TextValidator(PostForm)
+        self.validate_comment = TextValidator(CommentForm)
+        self.started = time.perf_counter()
+
+    def run(self, records, default_type=None):
+        for line, record in records:
+            try:
+                if isinstance(record, RecordError):
+                    raise record
+                self.add(line, record, default_type)
+            except RecordError as error:
+                self.error(line, error)
+            if sum(map(len, self.pending.values())) >= self.batch_size:
+                self.flush()
+        self.flush()
+        self.finish()
+        return self.stats
+
+    def error(self, line, error):
+        self.stats['errors'] += 1
+        self.errors.append((line, str(error)))
+
+    def add(self, line, record, default_type=None):
+        if not isinstance(record, dict):
+            raise RecordError('запись должна быть объектом')
+        record_type = record.get('type', default_type)
+        if record_type not in RECORD_TYPES:
+            raise RecordError(f'неизвестный тип записи {record_type!r}')
+        getattr(self, f'add_{record_type}')(line, record)
+
+    def require(self, record, field):
+        value = record.get(field)
+        if value in (None, ''):
+            raise RecordError(f'{field}: поле обязательно')
+        return value
+
+    def author(self, record, field='author'):
+        username = str(self.require(record, field))
+        if username not in self.users and username not in self.new_users:
+            if not self.create_authors:
+                raise RecordError(f'{field}: нет пользователя {username!r}')
+            self.new_users.add(username)
+        return username
+
+    def post_id(self, record, field):
+        try:
+            return int(self.require(record, field))
+        except (TypeError, ValueError):
+            raise RecordError(f'{field}: нужен id поста')
+
+    def add_group(self, line, record):
+        group = Group(slug=self.require(record, 'slug'),
+                      title=self.require(record, 'title'),
+                      description=record.get('description', ''))
+        try:
+            group.full_clean(exclude=['description'], validate_unique=False)
+        except ValidationError as error:
+            raise RecordError('; '.join(error.messages))
+        if group.slug not in self.groups and group.slug not in self.new_groups:
+            self.new_groups.add(group.slug)
+            self.pending['group'].append((line, group))
+
+    def add_post(self, line, record):
+        slug = record.get('group')
+        if slug and slug not in self.groups and slug not in self.new_groups:
+            raise RecordError(f'group: нет группы {slug!r}')
+        legacy_id = record.get('id')
+        if legacy_id is not None:
+            legacy_id = self.post_id(record, 'id')
+        text = self.validate_post(self.require(record, 'text'))
+        self.pending['post'].append((line, {
+            'legacy_id': legacy_id,
+            'text': text,
+            'author': self.author(record),
+            'group': slug,
+            'pub_date': parse_date(record.get('pub_date')),
+        }))
+
+    def add_comment(self, line, record):
+        post = self.post_id(record, 'post')
+        text = self.validate_comment(self.require(record, 'text'))
+        self.pending['comment'].append((line, {
+            'post': post,
+            'text': text,
+            'author': self.author(record),
+            'created': parse_date(record.get('created')),
+        }))
+
+    def add_follow(self, line, record):
+        user = self.author(record, 'user')
+        author = self.author(record)
+        if user == author:
+            raise RecordError('нельзя подписаться на самого себя')
+        self.pending['follow'].append((line, (user, author)))
+
+    def flush(self):
+        if not any(self.pending.values()):
+            return
+        with atomic(immediate=True):
+            self.write_users()
+            self.write_groups()
+            self.write_posts()
+            self.write_comments()
+            self.write_follows()
+        if self.progress:
+            self.progress(self.stats, time.perf_counter() - self.started)
+
+    def write_users(self):
+        if not self.new_users:
+            return
+        User.objects.bulk_create(
+            [User(username=username, password=make_password(None))
+             for username in self.new_users],
+            ignore_conflicts=True,
+        )
+        for usernames in chunked(self.new_users):
+            self.users.update(User.objects.filter(
+                username__in=usernames).values_list('username', 'pk'))
+        self.new_users.clear()
+
+    def write_groups(self):
+        groups = [group for _, group in self.pending['group']]
+        self.pending['group'] = []
+        if not groups:
+            return
+        Group.objects.bulk_create(groups, ignore_conflicts=True)
+        for slugs in chunked(self.new_groups):
+            self.groups.update(Group.objects.filter(
+                slug__in=slugs).values_list('slug', 'pk'))
+        self.new_groups.clear()
+        self.stats['group'] += len(groups)
+
+    def write_posts(self):
+        records = self.pending['post']
+        self.pending['post'] = []
+        if not records:
+            return
+        # SQLite не возвращает id из bulk_create, поэтому посты, на
+        # которые могут ссылаться комментарии, получают ключ загрузки, и
+        # их id потом ищутся по нему.
+        posts = []
+        legacy_ids = {}
+        for line, record in records:
+            import_key = None
+            if record['legacy_id'] is not None:
+                import_key = f'{self.import_id}:{line}'
+                legacy_ids[import_key] = record['legacy_id']
+            author_id = self.users[record['author']]
+            self.touched_users.add(author_id)
+            posts.append(Post(
+                text=record['text'], author_id=author_id,
+                group_id=self.groups.get(record['group']),
+                pub_date=record['pub_date'], import_key=import_key,
+            ))
+        with auto_now_disabled(Post, 'pub_date'):
+            Post.objects.bulk_create(posts)
+        for keys in chunked(legacy_ids):
+            for import_key, pk in Post.objects.filter(
+                    import_key__in=keys).values_list('import_key', 'pk'):
+                self.posts[legacy_ids[import_key]] = pk
+        self.stats['post'] += len(posts)
+
+    def write_comments(self):
+        records = self.pending['comment']
+        self.pending['comment'] = []
+        if not records:
+            return
+        unknown = {record['post'] for _, record in records
+                   if record['post'] not in self.posts}
+        existing = set()
+        for post_ids in chunked(unknown):
+            existing.update(Post.objects.filter(pk__in=post_ids).values_list(
+                'pk', flat=True))
+        comments = []
+        for line, record in records:
+            post_id = self.posts.get(record['post'])
+            if post_id is None and record['post'] in existing:
+                post_id = record['post']
+            if post_id is None:
+                self.error(line, f'post: нет поста {record["post"]}')
+                continue
+            comments.append(Comment(
+                post_id=post_id, text=record['text'],
+                author_id=self.users[record['author']],
+                created=record['created'],
+            ))
+        with auto_now_disabled(Comment, 'created'):
+            Comment.objects.bulk_create(comments)
+        self.stats['comment'] += len(comments)
+
+    def write_follows(self):
+        records = self.pending['follow']
+        self.pending['follow'] = []
+        if not records:
+            return
+        follows = []
+        for _, (user, author) in records:
+            user_id = self.users[user]
+            self.touched_users.add(user_id)
+            follows.append(Follow(user_id=user_id,
+                                  author_id=self.users[author]))
+        Follow.objects.bulk_create(follows, ignore_conflicts=True)
+        self.stats['follow'] += len(follows)
+
+    def finish(self):
+        """Пересчитывает то, что сигналы делают для одиночных записей."""
+        if not any(self.stats[name] for name in RECORD_TYPES):
+            return
+        counters.reconcile()
+        readers = set()
+        for user_ids in chunked(self.touched_users):
+            readers.update(Follow.objects.filter(
+                Q(user__in=user_ids) | Q(author__in=user_ids)
+            ).values_list('user', flat=True))
+        for user in User.objects.filter(pk__in=readers).iterator():
+            feed.rebuild(user)
+        if self.stats['post']:
+            get_search_backend().rebuild()
+        caching.bump_list_version()
+        page_cache.purge(page_cache.SITE)
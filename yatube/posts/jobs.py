@@ -0,0 +1,130 @@
+"""Очередь фоновых задач в базе данных.
+
+View ставит задачу (``enqueue``) в той же транзакции, что и свои
+изменения, и сразу отвечает. Задачи выполняет ``manage.py
+run_workers``; брокер не нужен, достаточно SQLite.
+
+Воркер берёт задачу условным UPDATE: из нескольких воркеров его
+выполнит только один, поэтому SELECT FOR UPDATE не нужен. Взятая задача
+скрыта от других на ``JOB_VISIBILITY_TIMEOUT`` секунд; если воркер
+упал, задачу возьмёт другой. Поэтому задачи должны выдерживать
+повторный запуск. Упавшая задача повторяется с растущей задержкой, а
+после ``max_attempts`` попыток помечается ``failed`` и остаётся в
+таблице для разбора.
+"""
+import json
+import logging
+import time
+import traceback
+from datetime import timedelta
+
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from . import constants
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Сколько задач из головы очереди пробовать взять за раз.
+CLAIM_BATCH = 10
+
+
+def task(func):
+    """Разрешает ставить функцию в очередь."""
+    func.is_job = True
+    return func
+
+
+def task_name(func):
+    return f'{func.__module__}.{func.__qualname__}'
+
+
+def resolve(name):
+    func = import_string(name)
+    if not getattr(func, 'is_job', False):
+        raise ValueError(f'{name} не помечена как задача')
+    return func
+
+
+def enqueue(func, *args, delay=0):
+    """Ставит ``func(*args)`` в очередь; аргументы должны быть JSON."""
+    return Job.objects.create(
+        task=task_name(func), payload=json.dumps(args),
+        run_at=timezone.now() + timedelta(seconds=delay))
+
+
+def available(now):
+    return Job.objects.filter(
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now),
+        failed=False, run_at__lte=now,
+    )
+
+
+def claim(visibility_timeout=constants.JOB_VISIBILITY_TIMEOUT):
+    """Берёт первую готовую задачу или возвращает None."""
+    now = timezone.now()
+    candidates = available(now).order_by('run_at', 'pk').values_list(
+        'pk', flat=True)[:CLAIM_BATCH]
+    for pk in candidates:
+        claimed = available(now).filter(pk=pk).update(
+            locked_until=now + timedelta(seconds=visibility_timeout),
+            attempts=F('attempts') + 1)
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def retry_delay(attempts):
+    return min(constants.JOB_RETRY_DELAY * 2 ** (attempts - 1),
+               constants.JOB_RETRY_MAX_DELAY)
+
+
+def fail(job, error):
+    jobs = Job.objects.filter(pk=job.pk)
+    if job.attempts >= job.max_attempts:
+        logger.error('Задача %s не выполнена за %s попыток',
+                     job, job.attempts)
+        jobs.update(failed=True, locked_until=None, last_error=error)
+    else:
+        jobs.update(locked_until=None, last_error=error,
+                    run_at=timezone.now() + timedelta(
+                        seconds=retry_delay(job.attempts)))
+
+
+def run(job):
+    """Выполняет взятую задачу; возвращает True при успехе."""
+    if job.attempts > job.max_attempts:
+        # Воркеры падали, не успев записать ошибку.
+        fail(job, 'Воркер не завершил задачу')
+        return False
+    try:
+        resolve(job.task)(*json.loads(job.payload))
+    except Exception:
+        logger.exception('Задача %s упала', job)
+        fail(job, traceback.format_exc())
+        return False
+    Job.objects.filter(pk=job.pk).delete()
+    return True
+
+
+def work(stop=None, once=False, poll_interval=constants.JOB_POLL_INTERVAL,
+         visibility_timeout=constants.JOB_VISIBILITY_TIMEOUT):
+    """Выполняет задачи, пока не выставлен ``stop``.
+
+    С ``once`` выходит, как только готовых задач не осталось.
+    Возвращает число выполненных задач.
+    """
+    done = 0
+    while stop is None or not stop.is_set():
+        job = claim(visibility_timeout)
+        if job is not None:
+            done += run(job)
+        elif once:
+            break
+        elif stop is not None:
+            stop.wait(poll_interval)
+        else:
+            time.sleep(poll_interval)
+    return done
@@ -0,0 +1,103 @@
+"""Горячие выборки с кешированием по схеме cache-aside.
+
+Значение берётся из кеша, а при промахе читается из базы и кладётся
+в кеш. Сигналы из posts/signals.py удаляют ключи при изменении групп,
+пользователей и подписок. При промахе читается основная база, а не
+реплика: значение с отстающей реплики пережило бы сброс ключа.
+"""
+import copy
+import hashlib
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.shortcuts import get_object_or_404
+
+from . import constants
+from .models import Follow, Group, User
+
+
+def _digest(value):
+    # Имена и слаги могут содержать символы, недопустимые в ключах.
+    return hashlib.md5(value.encode()).hexdigest()
+
+
+def group_key(slug):
+    return f'posts:group:{_digest(slug)}'
+
+
+def user_key(username):
+    return f'posts:user:{_digest(username)}'
+
+
+def follow_key(user_id, author_id):
+    return f'posts:follow:{user_id}:{author_id}'
+
+
+def _without_related(instance):
+    """Копия объекта без подтянутых select_related связей.
+
+    Связанные объекты вроде счётчиков UserStats меняются чаще самого
+    объекта, поэтому в кеш они не попадают.
+    """
+    cached = copy.copy(instance)
+    cached._state = copy.copy(instance._state)
+    cached._state.fields_cache = {}
+    return cached
+
+
+def get_group(slug):
+    group = cache.get(group_key(slug))
+    if group is None:
+        group = get_object_or_404(Group.objects.using(DEFAULT_DB_ALIAS),
+                                  slug=slug)
+        cache.set(group_key(slug), group, constants.LOOKUP_CACHE_TIMEOUT)
+    return group
+
+
+def get_author(username):
+    """Пользователь по имени; при промахе вместе со счётчиками."""
+    author = cache.get(user_key(username))
+    if author is None:
+        author = get_object_or_404(
+            User.objects.using(DEFAULT_DB_ALIAS).select_related('stats'),
+            username=username)
+        cache.set(user_key(username), _without_related(author),
+                  constants.LOOKUP_CACHE_TIMEOUT)
+    return author
+
+
+def author_for(request, username):
+    """get_author, запомненный на время запроса.
+
+    Им пользуются и ETag профиля, и сам view, и при промахе кеша оба
+    получают автора вместе со счётчиками одним запросом.
+    """
+    authors = request.__dict__.setdefault('_authors', {})
+    if username not in authors:
+        authors[username] = get_author(username)
+    return authors[username]
+
+
+def is_following(user, author):
+    if not user.is_authenticated:
+        return False
+    key = follow_key(user.pk, author.pk)
+    following = cache.get(key)
+    if following is None:
+        following = Follow.objects.using(DEFAULT_DB_ALIAS).filter(
+            user=user, author=author).exists()
+        cache.set(key, following, constants.LOOKUP_CACHE_TIMEOUT)
+    return following
+
+
+def forget_group(*slugs):
+    cache.delete_many([group_key(slug) for slug in slugs if slug])
+
+
+def forget_user(*usernames):
+    cache.delete_many([user_key(username) for username in usernames
+                       if username])
+
+
+def forget_follow(user_id, author_id):
+    cache.delete(follow_key(user_id, author_id))
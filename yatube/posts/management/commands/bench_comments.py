@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import render_to_string
+from django.test import Client, override_settings
+
+from posts import constants
+from posts.benchmark import (benchmark_database, measure, seed_comments,
+                             seed_posts, summary)
+from posts.models import Post, User
+from posts.utils import NEXT, KeysetPaginator
+
+
+class Command(BaseCommand):
+    help = ('Замеряет страницу поста с большим числом комментариев: '
+            'все комментарии сразу против постраничной подгрузки.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--comments', type=int, default=10_000)
+        parser.add_argument('--page', type=int, default=100,
+                            help='Номер глубокой страницы комментариев.')
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        per_page = constants.COMMENTS_PER_PAGE
+        page = options['page']
+        if page < 2 or (page - 1) * per_page >= options['comments']:
+            raise CommandError('Страница должна быть в пределах '
+                               'комментариев.')
+        with benchmark_database(), override_settings(DEBUG=False):
+            self.stdout.write(
+                f'Создаём пост с {options["comments"]} комментариями...')
+            seed_posts(1, authors=20, groups=1)
+            post = Post.objects.get()
+            seed_comments(post, options['comments'],
+                          list(User.objects.all()))
+            comments = post.comments.select_related('author')
+            keyset = KeysetPaginator(comments, per_page,
+                                     keys=('created', 'id'))
+            anchor = keyset.object_list[(page - 1) * per_page - 1]
+            cursor = keyset.encode_cursor(NEXT, anchor)
+            client = Client()
+            client.force_login(post.author)
+            detail = f'/posts/{post.pk}/'
+            fragment = f'/posts/{post.pk}/comments/?comments={cursor}'
+            cases = {
+                'все комментарии (шаблон)': lambda: render_to_string(
+                    'posts/includes/comment_list.html',
+                    {'post': post, 'comments': comments.all()}),
+                'post_detail': lambda: client.get(detail),
+                f'фрагмент, страница {page}': lambda: client.get(fragment),
+                f'json, страница {page}': lambda: client.get(
+                    fragment + '&format=json'),
+            }
+            for name, func in cases.items():
+                stats = summary(measure(func, options['repeat']))
+                self.stdout.write(
+                    f'{name:<26} ' + ' '.join(
+                        f'{key}={value:.2f}ms' for key, value in stats.items()
+                    )
+                )
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+
+from posts import constants, feed
+from posts.benchmark import benchmark_database, measure, seed_posts, summary
+from posts.models import Follow, Post, User
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает построение ленты подписок при чтении (JOIN через '
+            'Follow) и чтение материализованной ленты.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=200_000)
+        parser.add_argument('--authors', type=int, default=2000)
+        parser.add_argument('--followers', type=int, default=500,
+                            help='Подписчиков у каждого автора.')
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            self.stdout.write('Наполняем базу...')
+            seed_posts(options['posts'], authors=options['authors'])
+            authors = list(User.objects.filter(
+                username__startswith='bench_author_'))
+            readers = User.objects.bulk_create(
+                User(username=f'bench_reader_{num}')
+                for num in range(options['followers']))
+            readers = list(User.objects.filter(
+                username__in=[reader.username for reader in readers]))
+            Follow.objects.bulk_create(
+                (Follow(user=reader, author=author)
+                 for reader in readers for author in authors)
+            )
+            reader = readers[0]
+            feed.rebuild(reader)
+
+            def read_join():
+                posts = Post.objects.filter(
+                    author__following__user=reader).select_related(
+                    'author', 'group')
+                list(Paginator(posts, constants.POSTS_PER_PAGE).get_page(1))
+
+            def read_feed():
+                posts = feed.feed_for(reader).select_related(
+                    'author', 'group')
+                list(Paginator(posts, constants.POSTS_PER_PAGE).get_page(1))
+
+            def write_post():
+                Post.objects.create(text='Новый пост', author=authors[0])
+
+            cases = {
+                'чтение, JOIN через Follow': read_join,
+                'чтение, материализованная лента': read_feed,
+                'запись поста с рассылкой': write_post,
+            }
+            for name, func in cases.items():
+                stats = summary(measure(func, options['repeat']))
+                self.stdout.write(
+                    f'{name:<34} ' + ' '.join(
+                        f'{key}={value:.2f}ms' for key, value in stats.items()
+                    )
+                )
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+from core.hashers import library_available
+from posts.benchmark import (SEED_PASSWORD, benchmark_database, measure,
+                             seed_posts, summary)
+from posts.models import User
+
+
+def available(profile):
+    """Установлена ли библиотека основного хешера профиля."""
+    return library_available(
+        import_string(settings.PASSWORD_HASHER_PROFILES[profile][0])())
+
+
+class Command(BaseCommand):
+    help = ('Замеряет проверку пароля и вход через LoginView для каждого '
+            'профиля хеширования паролей: сколько входов в секунду '
+            'выдерживает одно ядро.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--profile', action='append',
+                            choices=sorted(settings.PASSWORD_HASHER_PROFILES),
+                            help='По умолчанию все установленные.')
+
+    def handle(self, *args, **options):
+        profiles = options['profile'] or sorted(
+            settings.PASSWORD_HASHER_PROFILES)
+        missing = [profile for profile in profiles if not available(profile)]
+        for profile in missing:
+            self.stderr.write(f'{profile}: библиотека хешера не установлена')
+        profiles = [profile for profile in profiles if profile not in missing]
+        if not profiles:
+            raise CommandError('Нет доступных профилей хеширования.')
+        login_url = reverse('users:login')
+        with benchmark_database(), override_settings(DEBUG=False):
+            seed_posts(0, authors=1, groups=1)
+            user = User.objects.get()
+            for profile in profiles:
+                hashers = settings.PASSWORD_HASHER_PROFILES[profile]
+                with override_settings(PASSWORD_HASHERS=hashers):
+                    user.set_password(SEED_PASSWORD)
+                    user.save(update_fields=['password'])
+                    client = Client()
+                    cases = {
+                        'проверка пароля': lambda: authenticate(
+                            username=user.username, password=SEED_PASSWORD),
+                        'вход': lambda: client.post(login_url, {
+                            'username': user.username,
+                            'password': SEED_PASSWORD,
+                        }),
+                    }
+                    for name, func in cases.items():
+                        stats = summary(measure(func, options['repeat']))
+                        self.stdout.write(
+                            f'{profile:<7} {name:<16} '
+                            f'входов/с на ядро={1000 / stats["p50"]:.0f} '
+                            + ' '.join(f'{key}={value:.2f}ms'
+                                       for key, value in stats.items())
+                        )
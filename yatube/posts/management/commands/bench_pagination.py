@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+
+from posts import constants, counting
+from posts.benchmark import benchmark_database, measure, seed_posts, summary
+from posts.models import Post
+from posts.utils import NEXT, KeysetPaginator, WindowPaginator
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает время открытия первой и глубокой страницы ленты '
+            'для пагинации по номеру (OFFSET) и по курсору (keyset).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument('--page', type=int, default=5000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        per_page = constants.POSTS_PER_PAGE
+        page = options['page']
+        if page < 2 or (page - 1) * per_page >= options['posts']:
+            raise CommandError('Страница должна быть в пределах ленты.')
+        with benchmark_database():
+            self.stdout.write(f'Создаём {options["posts"]} постов...')
+            seed_posts(options['posts'])
+            posts = Post.objects.select_related('author', 'group')
+            keyset = KeysetPaginator(posts, per_page)
+            anchor = keyset.object_list[(page - 1) * per_page - 1]
+            cursor = keyset.encode_cursor(NEXT, anchor)
+            cases = {
+                'offset, страница 1': lambda: list(
+                    Paginator(posts, per_page).get_page(1)),
+                f'offset, страница {page}': lambda: list(
+                    Paginator(posts, per_page).get_page(page)),
+                'keyset, страница 1': lambda: list(
+                    KeysetPaginator(posts, per_page).get_page(None)),
+                f'keyset, страница {page}': lambda: list(
+                    KeysetPaginator(posts, per_page).get_page(cursor)),
+            }
+            cases['COUNT(*)'] = lambda: posts.count()
+            cases['оценка числа'] = lambda: counting.estimate(posts)
+            window_page = WindowPaginator(posts, per_page).get_page(page)
+            navigation = render_to_string('posts/paginator.html',
+                                          {'page_obj': window_page})
+            cases['paginator.html'] = lambda: render_to_string(
+                'posts/paginator.html', {'page_obj': window_page})
+            for name, func in cases.items():
+                stats = summary(measure(func, options['repeat']))
+                self.stdout.write(
+                    f'{name:<24} ' + ' '.join(
+                        f'{key}={value:.2f}ms' for key, value in stats.items()
+                    )
+                )
+            self.stdout.write(
+                f'paginator.html: {len(navigation)} символов '
+                f'на {window_page.paginator.num_pages} страниц')
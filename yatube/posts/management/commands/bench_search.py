@@ -0,0 +1,52 @@
+import random
+
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+
+from posts import constants
+from posts.benchmark import benchmark_database, measure, seed_posts, summary
+from posts.search import SimpleBackend, SqliteFTSBackend
+
+WORDS = (
+    'программа', 'пост', 'кошка', 'собака', 'город', 'погода', 'книга',
+    'музыка', 'дорога', 'работа', 'праздник', 'новости', 'путешествие',
+    'спорт', 'история', 'наука', 'фотография', 'утро', 'вечер', 'друзья',
+)
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает поиск по индексу FTS5 с поиском через LIKE '
+            'на первой странице результатов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument('--query', default='путешествия')
+        parser.add_argument('--repeat', type=int, default=10)
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+
+        def make_text(num):
+            return ' '.join(rng.choice(WORDS) for _ in range(12))
+
+        with benchmark_database():
+            self.stdout.write(f'Создаём {options["posts"]} постов...')
+            seed_posts(options['posts'], make_text=make_text)
+            fts = SqliteFTSBackend()
+            fts.rebuild()
+            backends = {
+                'FTS5': (fts, options['query']),
+                'LIKE': (SimpleBackend(), options['query'][:-1]),
+            }
+            for name, (backend, query) in backends.items():
+                def first_page():
+                    results = backend.search(query)
+                    list(Paginator(results,
+                                   constants.POSTS_PER_PAGE).get_page(1))
+
+                stats = summary(measure(first_page, options['repeat']))
+                self.stdout.write(
+                    f'{name:<6} ' + ' '.join(
+                        f'{key}={value:.2f}ms' for key, value in stats.items()
+                    )
+                )
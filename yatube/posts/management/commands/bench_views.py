@@ -0,0 +1,170 @@
+import json
+import platform
+import random
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+
+from core.testing import clear_isolated_cache
+from posts.benchmark import benchmark_database, seed_site, summary
+from posts.models import Group, Post, User
+
+VIEWS = ('index', 'group_posts', 'profile', 'post_detail', 'follow_index',
+         'add_comment', 'post_create')
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+            check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = ('Замеряет пропускную способность и задержки страниц постов '
+            'на наполненной временной базе и выводит результат в JSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=20_000)
+        parser.add_argument('--comments', type=int, default=50_000)
+        parser.add_argument('--follows', type=int, default=20,
+                            help='Подписок у каждого пользователя.')
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Замеряемых запросов к каждой странице.')
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--concurrency', type=int, default=1,
+                            help='Потоков, одновременно шлющих запросы.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--views', nargs='+', choices=VIEWS,
+                            default=VIEWS)
+        parser.add_argument('--output', help='Файл для результатов JSON.')
+        parser.add_argument('--compare', metavar='JSON',
+                            help='Прошлые результаты для сравнения.')
+
+    def handle(self, *args, **options):
+        if options['users'] < 2 or options['posts'] < 1:
+            raise CommandError('Нужны хотя бы два пользователя и один пост.')
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency должен быть положительным.')
+        # Без DEBUG не пишется connection.queries и не подключается
+        # debug_toolbar, как на рабочем сервере.
+        with benchmark_database(), override_settings(DEBUG=False):
+            self.stderr.write('Наполняем базу...')
+            seed_site(options['users'], options['groups'], options['posts'],
+                      options['comments'], options['follows'],
+                      seed=options['seed'])
+            results = {}
+            for name in options['views']:
+                self.stderr.write(f'Замеряем {name}...')
+                results[name] = self.run_view(name, options)
+        report = {
+            'commit': current_commit(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'options': {key: options[key] for key in (
+                'users', 'groups', 'posts', 'comments', 'follows',
+                'requests', 'warmup', 'concurrency', 'seed')},
+            'results': results,
+        }
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output + '\n')
+        else:
+            self.stdout.write(output)
+        if options['compare']:
+            with open(options['compare']) as file:
+                self.compare(json.load(file), report)
+
+    def run_view(self, name, options):
+        rng = random.Random(options['seed'])
+        reader = User.objects.filter(
+            username__startswith='bench_author_').first()
+        post_ids = list(Post.objects.values_list('pk', flat=True))
+        slugs = list(Group.objects.values_list('slug', flat=True))
+        usernames = list(User.objects.values_list('username', flat=True))
+        requests = {
+            'index': lambda: ('get', '/', None),
+            'group_posts': lambda: (
+                'get', f'/group/{rng.choice(slugs)}/', None),
+            'profile': lambda: (
+                'get', f'/profile/{rng.choice(usernames)}/', None),
+            'post_detail': lambda: (
+                'get', f'/posts/{rng.choice(post_ids)}/', None),
+            'follow_index': lambda: ('get', '/follow/', None),
+            'add_comment': lambda: (
+                'post', f'/posts/{rng.choice(post_ids)}/comment/',
+                {'text': 'Комментарий для замера'}),
+            'post_create': lambda: (
+                'post', '/create/', {'text': 'Пост для замера'}),
+        }
+        # Client прогоняет запрос через WSGI-обработчик со всеми
+        # middleware, но без сети.
+        def send(client, count):
+            samples = []
+            for _ in range(count):
+                method, url, data = requests[name]()
+                request_started = time.perf_counter()
+                response = getattr(client, method)(url, data)
+                samples.append(
+                    (time.perf_counter() - request_started) * 1000)
+                if response.status_code >= 400:
+                    raise CommandError(
+                        f'{url} ответил {response.status_code}.')
+            return samples
+
+        def worker(count):
+            # Каждый поток - отдельный поток WSGI-сервера со своим
+            # соединением с базой.
+            client = Client()
+            client.force_login(reader)
+            try:
+                return send(client, count)
+            finally:
+                connection.close()
+
+        client = Client()
+        client.force_login(reader)
+        # Каждый view начинает с пустого кеша - кеша временной базы.
+        clear_isolated_cache()
+        send(client, options['warmup'])
+        concurrency = options['concurrency']
+        shares = [options['requests'] // concurrency + (num < options[
+            'requests'] % concurrency) for num in range(concurrency)]
+        started = time.perf_counter()
+        if concurrency == 1:
+            samples = send(client, options['requests'])
+        else:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                samples = [sample for part in pool.map(worker, shares)
+                           for sample in part]
+        elapsed = time.perf_counter() - started
+        result = {'requests': len(samples),
+                  'throughput_rps': round(len(samples) / elapsed, 2)}
+        result.update(
+            (f'{key}_ms', round(value, 3))
+            for key, value in summary(samples).items())
+        return result
+
+    def compare(self, baseline, report):
+        """Печатает изменение p50 и p95 относительно прошлого замера."""
+        self.stderr.write(f'Сравнение с {baseline.get("commit")}:')
+        for name, result in report['results'].items():
+            before = baseline['results'].get(name)
+            if before is None:
+                continue
+            changes = ' '.join(
+                f'{key}={before[key]:.2f}->{result[key]:.2f}ms '
+                f'({(result[key] / before[key] - 1) * 100:+.0f}%)'
+                for key in ('p50_ms', 'p95_ms')
+            )
+            self.stderr.write(f'{name:<13} {changes}')
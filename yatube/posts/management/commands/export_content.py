@@ -0,0 +1,52 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import constants
+from posts.exporting import DEFAULT_CHUNK_SIZE, export_stream
+from posts.forms import ExportForm
+
+
+class Command(BaseCommand):
+    help = ('Выгружает группы, посты, комментарии и подписки в JSONL или '
+            'CSV в формате команды import_content.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='-',
+                            help='Файл для выгрузки, "-" для stdout.')
+        parser.add_argument('--format', choices=constants.CONTENT_FORMATS,
+                            default=constants.CONTENT_FORMATS[0])
+        parser.add_argument('--types', nargs='+',
+                            choices=constants.CONTENT_RECORD_TYPES)
+        parser.add_argument('--author', help='Имя пользователя автора.')
+        parser.add_argument('--group', help='Slug группы.')
+        parser.add_argument('--since', help='Посты с даты ГГГГ-ММ-ДД.')
+        parser.add_argument('--until', help='Посты по дату ГГГГ-ММ-ДД.')
+        parser.add_argument('--gzip', action='store_true')
+        parser.add_argument('--chunk-size', type=int,
+                            default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        form = ExportForm({
+            key: options[key] for key in (
+                'author', 'group', 'since', 'until', 'format', 'types',
+                'gzip')
+            if options[key]
+        })
+        if not form.is_valid():
+            raise CommandError(form.errors.as_text())
+        filters = form.cleaned_data
+        chunks = export_stream(
+            fmt=filters['format'], compress=filters['gzip'],
+            author=filters['author'], group=filters['group'],
+            since=filters['since'], until=filters['until'],
+            types=filters['types'], chunk_size=options['chunk_size'],
+        )
+        if options['output'] == '-':
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.flush()
+            return
+        with open(options['output'], 'wb') as file:
+            for chunk in chunks:
+                file.write(chunk)
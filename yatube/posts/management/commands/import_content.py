@@ -0,0 +1,52 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.importing import (DEFAULT_BATCH_SIZE, READERS, RECORD_TYPES,
+                             Importer)
+
+
+class Command(BaseCommand):
+    help = ('Загружает группы, посты, комментарии и подписки из JSONL или '
+            'CSV пачками через bulk_create.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл с записями, "-" для stdin.')
+        parser.add_argument('--format', choices=READERS,
+                            help='По умолчанию определяется по расширению.')
+        parser.add_argument('--type', choices=RECORD_TYPES,
+                            help='Тип записей без поля type, например для '
+                                 'CSV с одними постами.')
+        parser.add_argument('--batch-size', type=int,
+                            default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--create-authors', action='store_true',
+                            help='Создавать неизвестных пользователей без '
+                                 'пароля.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('csv' if path.endswith('.csv')
+                                    else 'jsonl')
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть положительным.')
+        importer = Importer(batch_size=options['batch_size'],
+                            create_authors=options['create_authors'],
+                            progress=self.progress)
+        if path == '-':
+            stats = importer.run(READERS[fmt](sys.stdin), options['type'])
+        else:
+            with open(path, newline='', encoding='utf-8') as file:
+                stats = importer.run(READERS[fmt](file), options['type'])
+        for line, message in importer.errors:
+            self.stderr.write(f'строка {line}: {message}')
+        self.stdout.write(self.format_stats(stats))
+
+    def progress(self, stats, elapsed):
+        rows = sum(stats[name] for name in RECORD_TYPES)
+        self.stdout.write(f'{self.format_stats(stats)} '
+                          f'({rows / elapsed:.0f} строк/с)')
+
+    def format_stats(self, stats):
+        return (f'групп: {stats["group"]}, постов: {stats["post"]}, '
+                f'комментариев: {stats["comment"]}, '
+                f'подписок: {stats["follow"]}, ошибок: {stats["errors"]}')
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from posts import counters
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает денормализованные счётчики постов, комментариев '
+            'и подписок и исправляет расхождения.')
+
+    def handle(self, *args, **options):
+        for model_name, fixed in counters.reconcile().items():
+            self.stdout.write(f'{model_name}: исправлено строк {fixed}')
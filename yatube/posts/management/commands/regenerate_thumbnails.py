@@ -0,0 +1,43 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from posts import constants, thumbnails
+from posts.models import Post
+
+
+def generate_in_thread(post_id):
+    try:
+        return thumbnails.generate_safely(post_id)
+    finally:
+        # Каждый поток держит собственное соединение.
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = 'Заново строит миниатюры картинок постов в несколько потоков.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int,
+                            default=constants.THUMBNAIL_WORKERS)
+        parser.add_argument('--missing', action='store_true',
+                            help='Только посты без готовых миниатюр.')
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='')
+        if options['missing']:
+            posts = posts.filter(thumbnails='')
+        post_ids = list(posts.values_list('pk', flat=True))
+        if options['workers'] > 1:
+            with ThreadPoolExecutor(options['workers']) as pool:
+                results = list(pool.map(generate_in_thread, post_ids))
+        else:
+            results = [thumbnails.generate_safely(post_id)
+                       for post_id in post_ids]
+        self.stdout.write(f'Обработано постов: {len(post_ids)}')
+        failed = results.count(False)
+        if failed:
+            self.stderr.write(
+                f'Не удалось построить миниатюры постов: {failed}, '
+                'подробности в логе.')
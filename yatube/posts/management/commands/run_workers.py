@@ -0,0 +1,81 @@
+import multiprocessing
+import signal
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from posts import constants, jobs
+
+
+def run_worker(stop, once, poll_interval, visibility_timeout):
+    # Ctrl+C и остановку сервиса получает вся группа процессов; воркер
+    # дорабатывает текущую задачу и выходит по событию stop.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    try:
+        jobs.work(stop, once, poll_interval, visibility_timeout)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = ('Выполняет фоновые задачи из очереди в базе данных '
+            'в нескольких процессах.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=2)
+        parser.add_argument('--once', action='store_true',
+                            help='Выйти, когда готовых задач не останется.')
+        parser.add_argument('--poll-interval', type=float,
+                            default=constants.JOB_POLL_INTERVAL)
+        parser.add_argument('--visibility-timeout', type=int,
+                            default=constants.JOB_VISIBILITY_TIMEOUT)
+
+    def handle(self, *args, **options):
+        if options['processes'] < 1:
+            raise CommandError('--processes должен быть положительным.')
+        worker_args = (options['once'], options['poll_interval'],
+                       options['visibility_timeout'])
+        if options['processes'] == 1:
+            stop = threading.Event()
+            signal.signal(signal.SIGTERM, lambda *args: stop.set())
+            try:
+                done = jobs.work(stop, *worker_args)
+            except KeyboardInterrupt:
+                return
+            self.stdout.write(f'Выполнено задач: {done}')
+            return
+        self.run_pool(options['processes'], worker_args)
+
+    def run_pool(self, processes, worker_args):
+        # Дочерние процессы наследуют модули уже настроенного Django, но
+        # не должны делить с родителем открытые соединения с базой.
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        stop = context.Event()
+        signal.signal(signal.SIGTERM, lambda *args: stop.set())
+
+        def start():
+            process = context.Process(target=run_worker,
+                                      args=(stop, *worker_args))
+            process.start()
+            return process
+
+        pool = [start() for _ in range(processes)]
+        once = worker_args[0]
+        try:
+            while any(process.is_alive() for process in pool):
+                for num, process in enumerate(pool):
+                    process.join(timeout=1)
+                    if (not process.is_alive() and process.exitcode
+                            and not once and not stop.is_set()):
+                        self.stderr.write(
+                            f'Воркер {process.pid} упал с кодом '
+                            f'{process.exitcode}, запускаем новый.')
+                        pool[num] = start()
+        except KeyboardInterrupt:
+            stop.set()
+            for process in pool:
+                process.join()
+        self.stdout.write('Воркеры остановлены.')
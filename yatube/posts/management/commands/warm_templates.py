@@ -0,0 +1,52 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.template import engines
+from django.test import RequestFactory, override_settings
+
+from core.templates import template_names, uses_cached_loader, warm
+from posts import constants
+from posts.benchmark import (benchmark_database, measure, summary,
+                             template_context)
+
+DUMMY_CACHE = {'default': {
+    'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+class Command(BaseCommand):
+    help = ('Разбирает и кеширует все шаблоны, замеряет их отрисовку '
+            'и падает, если какой-то шаблон медленнее бюджета.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--budget-ms', type=float,
+                            default=constants.TEMPLATE_BUDGET_MS,
+                            help='Допустимый p95 отрисовки шаблона.')
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        engine = engines['django']
+        loader = 'cached.Loader' if uses_cached_loader(engine) else 'без кеша'
+        names = template_names(engine)
+        parsed = warm(names, engine)
+        self.stdout.write(f'Шаблонов: {len(names)}, загрузчик: {loader}, '
+                          f'разбор: {sum(parsed.values()):.1f}ms')
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        slow = []
+        # Кеш фрагментов отключён, чтобы мерить отрисовку, а не чтение кеша.
+        with benchmark_database(), override_settings(CACHES=DUMMY_CACHE):
+            context = template_context(request)
+            for name in names:
+                template = engine.get_template(name)
+                stats = summary(measure(
+                    lambda: template.render(context, request),
+                    options['repeat']))
+                self.stdout.write(
+                    f'{name:<40} разбор={parsed[name]:.2f}ms ' + ' '.join(
+                        f'{key}={value:.2f}ms' for key, value in stats.items()
+                    )
+                )
+                if stats['p95'] > options['budget_ms']:
+                    slow.append(f'{name} ({stats["p95"]:.2f}ms)')
+        if slow:
+            raise CommandError(
+                f'Медленнее {options["budget_ms"]}ms: ' + ', '.join(slow))
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-16 23:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_post_updated'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='thumbnails',
+            field=models.TextField(blank=True, default='', editable=False, help_text='JSON с адресами и размерами готовых миниатюр', verbose_name='Миниатюры'),
+        ),
+    ]
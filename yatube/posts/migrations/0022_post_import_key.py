@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-17 00:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0021_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='import_key',
+            field=models.CharField(blank=True, editable=False, help_text='По нему import_content находит id загруженного поста', max_length=64, null=True, unique=True, verbose_name='Ключ загрузки'),
+        ),
+    ]
@@ -1,5 +1,8 @@
+import json
+
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from . import constants
 
 User = get_user_model()
@@ -9,6 +12,8 @@ class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     description = models.TextField()
+    posts_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Число постов')
 
     def __str__(self) -> str:
         return self.title
@@ -18,6 +23,8 @@ class Post(models.Model):
     text = models.TextField(blank=False, help_text='Введите текст поста')
     pub_date = models.DateTimeField(auto_now_add=True,
                                     verbose_name="Дата публикации")
+    updated = models.DateTimeField(auto_now=True,
+                                   verbose_name="Дата изменения")
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -38,14 +45,42 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    comments_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Число комментариев')
+    thumbnails = models.TextField(
+        blank=True, default='', editable=False,
+        verbose_name='Миниатюры',
+        help_text='JSON с адресами и размерами готовых миниатюр',
+    )
+    import_key = models.CharField(
+        max_length=64, blank=True, null=True, unique=True, editable=False,
+        verbose_name='Ключ загрузки',
+        help_text='По нему import_content находит id загруженного поста',
+    )
 
     def __str__(self) -> str:
         return self.text[:constants.SYMBOLS]
 
+    def thumbnail(self, name):
+        if not self.thumbnails:
+            return None
+        return json.loads(self.thumbnails).get(name)
+
+    @property
+    def card_thumbnail(self):
+        return self.thumbnail('card')
+
     class Meta:
-        ordering = ["-pub_date"]
+        ordering = ["-pub_date", "-id"]
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
+        indexes = [
+            models.Index(fields=['pub_date'], name='post_pub_date_idx'),
+            models.Index(fields=['author', 'pub_date'],
+                         name='post_author_pub_date_idx'),
+            models.Index(fields=['group', 'pub_date'],
+                         name='post_group_pub_date_idx'),
+        ]
 
 
 class Comment(models.Model):
@@ -66,7 +101,11 @@ class Comment(models.Model):
                                    verbose_name="Дата публикации")
 
     class Meta:
-        ordering = ["-created"]
+        ordering = ["-created", "-id"]
+        indexes = [
+            models.Index(fields=['post', 'created'],
+                         name='comment_post_created_idx'),
+        ]
 
     def __str__(self) -> str:
         return self.text[:constants.SYMBOLS]
@@ -84,5 +123,83 @@ class Follow(models.Model):
         related_name='following',
     )
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'author'],
+                                    name='unique_follow'),
+        ]
+
     def __str__(self) -> str:
         return self.user
+
+
+class FeedItem(models.Model):
+    """Пост в материализованной ленте подписчика."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_items',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='feed_items',
+    )
+    pub_date = models.DateTimeField(verbose_name="Дата публикации")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'post'],
+                                    name='unique_feed_item'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-pub_date', '-post'],
+                         name='feed_user_pub_date_post_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.user_id}: {self.post_id}'
+
+
+class UserStats(models.Model):
+    """Счётчики пользователя, обновляемые при изменении данных."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+    posts_count = models.PositiveIntegerField(default=0)
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return str(self.user_id)
+
+
+class Job(models.Model):
+    """Отложенная задача для run_workers."""
+    task = models.CharField(max_length=200, verbose_name='Задача')
+    payload = models.TextField(default='[]',
+                               help_text='JSON-список аргументов задачи')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(
+        default=constants.JOB_MAX_ATTEMPTS)
+    run_at = models.DateTimeField(default=timezone.now,
+                                  verbose_name='Запустить не раньше')
+    locked_until = models.DateTimeField(
+        null=True, blank=True,
+        help_text='Задачу выполняет воркер; после этого времени её '
+                  'может взять другой')
+    failed = models.BooleanField(default=False)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['failed', 'run_at'],
+                         name='job_failed_run_at_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.task} #{self.pk}'
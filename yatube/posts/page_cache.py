@@ -0,0 +1,137 @@
+"""Кеш целых страниц для гостей.
+
+Страница кешируется по адресу с параметрами запроса. При отрисовке view
+помечает её тегами того, что на ней показано (``index``, ``group:<id>``,
+``author:<id>``, ``post:<id>``), и в кеш вместе со страницей попадают
+версии этих тегов. Сигналы меняют версии только затронутых тегов,
+поэтому правка поста сбрасывает его страницу, профиль автора, группу
+и ленты, но не чужие профили и группы.
+
+Устаревшую страницу обновляет один запрос, а остальные, пока он
+работает, получают старую копию (stale-while-revalidate).
+"""
+import hashlib
+import time
+from functools import wraps
+
+from core import routers, stampede
+from core.cache import shared_cache
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from . import constants
+
+# Тег всех страниц: меняется, когда правят группы или имена авторов,
+# видимые на многих страницах сразу.
+SITE = 'site'
+HIT, STALE, MISS = 'hit', 'stale', 'miss'
+
+
+def tag_key(tag):
+    return f'posts:page_tag:{tag}'
+
+
+def page_key(request):
+    digest = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'posts:page:{digest}'
+
+
+def purge(*tags):
+    """Помечает устаревшими все страницы с этими тегами."""
+    version = time.time()
+    shared_cache().set_many({tag_key(tag): version for tag in tags}, None)
+
+
+def purge_post(post, old_group_id=None):
+    """Сбрасывает страницы, на которых виден пост."""
+    tags = {'index', f'post:{post.pk}', f'author:{post.author_id}'}
+    tags.update(f'group:{group_id}'
+                for group_id in (post.group_id, old_group_id) if group_id)
+    purge(*tags)
+
+
+def tag(request, *tags):
+    """Отмечает, от чего зависит отрисовываемая страница."""
+    request.__dict__.setdefault('_page_tags', set()).update(tags)
+
+
+def tag_versions(tags):
+    # Версии меток читаются мимо локального уровня: сброс в одном
+    # воркере должен сразу дойти до остальных.
+    versions = shared_cache()
+    keys = {tag_key(tag): tag for tag in tags}
+    found = versions.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # Версия могла вытесниться из кеша: нулевая версия не совпадёт
+            # с сохранёнными страницами, и они отрисуются заново.
+            versions.add(key, 0, None)
+            found[key] = versions.get(key, 0)
+    return {tag: found[key] for key, tag in keys.items()}
+
+
+def is_fresh(entry):
+    return (entry['expires'] > time.time()
+            and tag_versions(entry['tags']) == entry['tags'])
+
+
+def cacheable(request, response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        # Страница с {% csrf_token %} привязана к cookie посетителя.
+        and not request.META.get('CSRF_COOKIE_USED')
+    )
+
+
+def from_entry(entry, state):
+    response = HttpResponse(entry['content'],
+                            content_type=entry['content_type'])
+    response['X-Page-Cache'] = state
+    return response
+
+
+def anonymous_page_cache(view):
+    def store(request, response, started):
+        tags = tag_versions(
+            request.__dict__.get('_page_tags', set()) | {SITE})
+        # Данные поменялись, пока страница рисовалась, или могли ещё не
+        # дойти до реплики, с которой она читалась.
+        fresh_after = started - (
+            routers.replication_lag() if routers.current.get() else 0)
+        if any(version > fresh_after for version in tags.values()):
+            return
+        cache.set(page_key(request), {
+            'content': response.content,
+            'content_type': response['Content-Type'],
+            'tags': tags,
+            'expires': time.time() + constants.PAGE_CACHE_TIMEOUT,
+        }, constants.PAGE_CACHE_TIMEOUT + constants.PAGE_CACHE_STALE)
+
+    def render(request, *args, **kwargs):
+        started = time.time()
+        response = view(request, *args, **kwargs)
+        if cacheable(request, response):
+            store(request, response, started)
+        response['X-Page-Cache'] = MISS
+        return response
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if (request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated):
+            return view(request, *args, **kwargs)
+        key = page_key(request)
+        entry = cache.get(key)
+        if entry is None:
+            return render(request, *args, **kwargs)
+        if is_fresh(entry):
+            return from_entry(entry, HIT)
+        with stampede.single_flight(
+                key, constants.PAGE_CACHE_LOCK_TIMEOUT) as leader:
+            if leader:
+                return render(request, *args, **kwargs)
+        # Страницу уже обновляет другой запрос.
+        return from_entry(entry, STALE)
+    return wrapper
@@ -0,0 +1,178 @@
+"""Полнотекстовый поиск по постам.
+
+Движок выбирается настройкой ``POSTS_SEARCH_BACKEND``. Для SQLite
+используется виртуальная таблица FTS5, для остальных баз подходит
+``SimpleBackend`` с поиском через LIKE; сюда же можно добавить движок
+на ``tsvector`` для PostgreSQL.
+"""
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.utils.html import escape
+from django.utils.module_loading import import_string
+from django.utils.safestring import mark_safe
+
+from .models import Post
+
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+SNIPPET_TOKENS = 32
+
+WORD = re.compile(r'\w+')
+# Окончания, которые отбрасываются у слов запроса, чтобы «посты»
+# находили «пост», «постами» и «постов».
+ENDINGS = sorted((
+    'иями', 'ями', 'ами', 'ого', 'его', 'ому', 'ему', 'ыми', 'ими',
+    'ешь', 'ете', 'ать', 'ять', 'ить', 'еть', 'ают', 'яют', 'ует',
+    'ая', 'яя', 'ое', 'ее', 'ые', 'ие', 'ой', 'ей', 'ий', 'ый', 'ую',
+    'юю', 'ов', 'ев', 'ах', 'ях', 'ам', 'ям', 'ом', 'ем', 'ия',
+    'ет', 'ют', 'ут', 'ит', 'ат', 'ят',
+    'а', 'я', 'о', 'е', 'ы', 'и', 'у', 'ю', 'ь',
+), key=len, reverse=True)
+MIN_STEM = 3
+
+
+def stem(word):
+    for ending in ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= MIN_STEM:
+            return word[:-len(ending)]
+    return word
+
+
+def highlight(text):
+    """Экранирует текст и превращает служебные метки в <mark>."""
+    return mark_safe(
+        escape(text)
+        .replace(HIGHLIGHT_START, '<mark>')
+        .replace(HIGHLIGHT_END, '</mark>')
+    )
+
+
+class SearchResults:
+    """Ленивый результат поиска, который понимает Paginator."""
+
+    def __init__(self, backend, query):
+        self.backend = backend
+        self.query = query
+
+    def count(self):
+        return self.backend.count(self.query)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        return self.backend.fetch(self.query, key.start or 0,
+                                  key.stop - (key.start or 0))
+
+
+class SearchBackend:
+    """Интерфейс движка поиска."""
+
+    def index(self, post):
+        raise NotImplementedError
+
+    def remove(self, post_id):
+        raise NotImplementedError
+
+    def rebuild(self):
+        raise NotImplementedError
+
+    def search(self, query):
+        """Возвращает последовательность постов, подходящую для page_nav.
+
+        У найденных постов может быть атрибут ``snippet`` с подсвеченным
+        фрагментом текста.
+        """
+        raise NotImplementedError
+
+
+class SimpleBackend(SearchBackend):
+    """Поиск без индекса: LIKE по тексту постов."""
+
+    def index(self, post):
+        pass
+
+    def remove(self, post_id):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def search(self, query):
+        return Post.objects.select_related('author', 'group').filter(
+            text__icontains=query)
+
+
+class SqliteFTSBackend(SearchBackend):
+    """Поиск по виртуальной таблице FTS5 с ранжированием bm25."""
+    table = 'posts_post_fts'
+
+    def match_expression(self, query):
+        """Каждое слово запроса ищется по префиксу своей основы."""
+        words = WORD.findall(query.lower())
+        return ' '.join(f'"{stem(word)}"*' for word in words)
+
+    def index(self, post):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s',
+                           [post.pk])
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, text) VALUES (%s, %s)',
+                [post.pk, post.text])
+
+    def remove(self, post_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s',
+                           [post_id])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, text) '
+                f'SELECT id, text FROM {Post._meta.db_table}')
+            cursor.execute(
+                f"INSERT INTO {self.table} ({self.table}) VALUES ('optimize')")
+
+    def search(self, query):
+        return SearchResults(self, self.match_expression(query))
+
+    def count(self, match):
+        if not match:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {self.table} '
+                f'WHERE {self.table} MATCH %s', [match])
+            return cursor.fetchone()[0]
+
+    def fetch(self, match, offset, limit):
+        if not match:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, snippet({self.table}, 0, %s, %s, %s, %s) '
+                f'FROM {self.table} WHERE {self.table} MATCH %s '
+                f'ORDER BY rank, rowid DESC LIMIT %s OFFSET %s',
+                [HIGHLIGHT_START, HIGHLIGHT_END, '…', SNIPPET_TOKENS,
+                 match, limit, offset])
+            rows = cursor.fetchall()
+        posts = Post.objects.select_related('author', 'group').in_bulk(
+            [post_id for post_id, _ in rows])
+        results = []
+        for post_id, snippet in rows:
+            if post_id in posts:
+                post = posts[post_id]
+                post.snippet = highlight(snippet)
+                results.append(post)
+        return results
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    return import_string(settings.POSTS_SEARCH_BACKEND)()
@@ -0,0 +1,128 @@
+from django.db.models.signals import (post_delete, post_init, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+
+from . import caching, counters, feed, lookups, page_cache, search
+from .models import Comment, Follow, Group, Post, User, UserStats
+
+DEFERRED = object()
+
+
+@receiver(post_save, sender=User)
+def user_created(sender, instance, created, **kwargs):
+    if created:
+        UserStats.objects.get_or_create(user=instance)
+    else:
+        lookups.forget_user(instance._loaded_username, instance.username)
+        update_fields = kwargs.get('update_fields')
+        # Вход пользователя обновляет только last_login.
+        if not update_fields or set(update_fields) - {'last_login'}:
+            page_cache.purge(page_cache.SITE)
+            caching.bump_list_version()
+    instance._loaded_username = instance.username
+
+
+@receiver(post_init, sender=User)
+def user_loaded(sender, instance, **kwargs):
+    # Старое имя нужно, чтобы сбросить кеш после переименования.
+    instance._loaded_username = instance.__dict__.get('username')
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    lookups.forget_user(instance.username)
+
+
+@receiver(post_init, sender=Post)
+def post_loaded(sender, instance, **kwargs):
+    # Запоминаем группу, чтобы при переносе поста поправить счётчики.
+    # У поста из .only() без группы прежняя группа неизвестна.
+    if 'group_id' in instance.get_deferred_fields():
+        instance._loaded_group_id = DEFERRED
+    else:
+        instance._loaded_group_id = instance.group_id
+
+
+@receiver(post_save, sender=Post)
+def post_created(sender, instance, created, **kwargs):
+    old_group_id = instance._loaded_group_id
+    if old_group_id is DEFERRED:
+        old_group_id = None
+    elif created:
+        counters.post_added(instance)
+        feed.fan_out(instance)
+    elif old_group_id != instance.group_id:
+        counters.post_moved(old_group_id, instance.group_id)
+    page_cache.purge_post(instance, old_group_id)
+    instance._loaded_group_id = instance.group_id
+    caching.bump_list_version()
+    search.get_backend().index(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.post_removed(instance)
+    page_cache.purge_post(instance)
+    caching.bump_list_version()
+    search.get_backend().remove(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, **kwargs):
+    if created:
+        counters.comment_changed(instance, 1)
+    caching.touch_post(instance.post_id)
+    page_cache.purge(f'post:{instance.post_id}')
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.comment_changed(instance, -1)
+    caching.touch_post(instance.post_id)
+    page_cache.purge(f'post:{instance.post_id}')
+
+
+@receiver(post_init, sender=Group)
+def group_loaded(sender, instance, **kwargs):
+    instance._loaded_slug = instance.__dict__.get('slug')
+    instance._loaded_title = instance.__dict__.get('title')
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, **kwargs):
+    # На карточках постов видны только название и адрес группы.
+    if not created and (instance._loaded_slug != instance.slug
+                        or instance._loaded_title != instance.title):
+        caching.touch_posts(instance.posts.all())
+    lookups.forget_group(instance._loaded_slug, instance.slug)
+    page_cache.purge(page_cache.SITE)
+    instance._loaded_slug = instance.slug
+    instance._loaded_title = instance.title
+
+
+@receiver(post_delete, sender=Group)
+def group_removed(sender, instance, **kwargs):
+    lookups.forget_group(instance.slug)
+    page_cache.purge(page_cache.SITE)
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    # После удаления у постов уже не будет ссылки на группу.
+    caching.touch_posts(instance.posts.all())
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if created:
+        counters.follow_changed(instance, 1)
+        feed.backfill(instance.user, instance.author)
+    lookups.forget_follow(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    counters.follow_changed(instance, -1)
+    feed.trim(instance.user, instance.author)
+    feed.follower_lost(instance.author_id)
+    lookups.forget_follow(instance.user_id, instance.author_id)
@@ -0,0 +1,51 @@
+from django import template
+
+from posts import caching
+
+register = template.Library()
+
+
+class FragmentCacheNode(template.Node):
+    def __init__(self, nodelist, make_key, name, vary_on):
+        self.nodelist = nodelist
+        self.make_key = make_key
+        self.name = name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        key = self.make_key(
+            self.name.resolve(context),
+            *(var.resolve(context) for var in self.vary_on)
+        )
+        if key is None:
+            return self.nodelist.render(context)
+        return caching.get_or_render(
+            key, lambda: self.nodelist.render(context))
+
+
+def fragment_cache_tag(parser, token, make_key):
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' tag requires a fragment name and an object.")
+    nodelist = parser.parse((f'end{bits[0]}',))
+    parser.delete_first_token()
+    return FragmentCacheNode(
+        nodelist,
+        make_key,
+        parser.compile_filter(bits[1]),
+        [parser.compile_filter(bit) for bit in bits[2:]],
+    )
+
+
+@register.tag
+def post_card_cache(parser, token):
+    """{% post_card_cache "имя" post %} ... {% endpost_card_cache %}"""
+    return fragment_cache_tag(parser, token, caching.post_card_key)
+
+
+@register.tag
+def post_list_cache(parser, token):
+    """{% post_list_cache "имя" page_obj [vary_on ...] %}
+    ... {% endpost_list_cache %}"""
+    return fragment_cache_tag(parser, token, caching.post_list_key)
@@ -0,0 +1,95 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from .. import caching
+from ..models import Comment, Group, Post
+from . import constants
+
+User = get_user_model()
+
+
+class FragmentCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Author')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        for num in range(13):
+            Post.objects.create(text=f'Пост номер {num}.', author=cls.user,
+                                group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        caching.stats.clear()
+        # Гостям страница целиком отдаётся из page_cache, а фрагменты
+        # работают для вошедших пользователей.
+        self.client.force_login(self.user)
+
+    def get_index(self, page=1):
+        return self.client.get(reverse('posts:index'), {'page': page})
+
+    def test_pages_are_cached_separately(self):
+        """Каждая страница главной кэшируется под своим ключом."""
+        first = self.get_index(1)
+        second = self.get_index(2)
+        self.assertContains(first, 'Пост номер 12.')
+        self.assertNotContains(first, 'Пост номер 0.')
+        self.assertContains(second, 'Пост номер 0.')
+        self.assertNotContains(second, 'Пост номер 12.')
+        self.assertEqual(self.get_index(2).content, second.content)
+        self.assertEqual(self.get_index(1).content, first.content)
+
+    def test_cached_page_counts_hits_and_misses(self):
+        """Повторный показ страницы берётся из кэша целиком."""
+        self.get_index(1)
+        misses = caching.stats['misses']
+        self.assertEqual(misses, constants.TEN_POSTS + 1)
+        self.get_index(1)
+        self.assertEqual(caching.stats['misses'], misses)
+        self.assertEqual(caching.stats['hits'], 1)
+
+    def test_edit_rerenders_only_changed_card(self):
+        """После правки поста заново рисуется только его карточка."""
+        self.get_index(1)
+        post = Post.objects.get(text='Пост номер 12.')
+        post.text = 'Исправленный пост.'
+        post.save()
+        caching.stats.clear()
+        response = self.get_index(1)
+        self.assertContains(response, 'Исправленный пост.')
+        self.assertEqual(caching.stats['misses'], 2)
+        self.assertEqual(caching.stats['hits'], constants.TEN_POSTS - 1)
+
+    def test_comment_and_group_changes_invalidate_cards(self):
+        """Комментарии и правка группы меняют ключи карточек."""
+        post = Post.objects.get(text='Пост номер 12.')
+        key = caching.post_card_key('index', post)
+        Comment.objects.create(text='Коммент', post=post, author=self.user)
+        post.refresh_from_db()
+        commented_key = caching.post_card_key('index', post)
+        self.assertNotEqual(key, commented_key)
+        self.group.title = 'Новое название'
+        self.group.save()
+        post.refresh_from_db()
+        self.assertNotEqual(commented_key,
+                           caching.post_card_key('index', post))
+
+    def test_group_description_keeps_cards(self):
+        """Правка описания группы не трогает карточки её постов."""
+        post = Post.objects.get(text='Пост номер 12.')
+        key = caching.post_card_key('index', post)
+        self.group.description = 'Новое описание'
+        self.group.save()
+        post.refresh_from_db()
+        self.assertEqual(key, caching.post_card_key('index', post))
+
+    def test_author_rename_rerenders_cards(self):
+        """После смены имени автора карточки рисуются заново."""
+        self.get_index(1)
+        self.user.first_name = 'Лев'
+        self.user.last_name = 'Толстой'
+        self.user.save()
+        response = self.get_index(1)
+        self.assertContains(response, 'Лев Толстой')
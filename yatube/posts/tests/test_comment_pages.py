@@ -0,0 +1,70 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import constants
+from ..models import Comment, Post
+from ..utils import auto_now_disabled
+
+User = get_user_model()
+
+EXTRA = 5
+
+
+class CommentPagesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.post = Post.objects.create(text='Пост', author=cls.user)
+        # Одинаковое время: порядок внутри страницы решает id.
+        created = timezone.now()
+        with auto_now_disabled(Comment, 'created'):
+            Comment.objects.bulk_create(
+                Comment(post=cls.post, author=cls.user, text=f'Коммент {num}',
+                        created=created)
+                for num in range(constants.COMMENTS_PER_PAGE + EXTRA)
+            )
+        cls.ids = list(Comment.objects.order_by('-id').values_list(
+            'pk', flat=True))
+
+    def test_post_detail_shows_first_page(self):
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}))
+        comments = response.context['comments']
+        self.assertEqual([comment.pk for comment in comments],
+                         self.ids[:constants.COMMENTS_PER_PAGE])
+        self.assertContains(response, comments.next_cursor)
+
+    def test_fragment_continues_from_cursor(self):
+        """Фрагмент отдаёт следующие комментарии без повторов."""
+        first = self.client.get(
+            reverse('posts:post_comments', kwargs={'post_id': self.post.pk}))
+        cursor = first.context['comments'].next_cursor
+        response = self.client.get(
+            reverse('posts:post_comments', kwargs={'post_id': self.post.pk}),
+            {'comments': cursor})
+        self.assertEqual(
+            [comment.pk for comment in response.context['comments']],
+            self.ids[constants.COMMENTS_PER_PAGE:])
+        self.assertNotContains(response, 'Показать ещё')
+
+    def test_json_format(self):
+        response = self.client.get(
+            reverse('posts:post_comments', kwargs={'post_id': self.post.pk}),
+            {'format': 'json'})
+        data = response.json()
+        self.assertEqual([comment['id'] for comment in data['comments']],
+                         self.ids[:constants.COMMENTS_PER_PAGE])
+        self.assertEqual(data['comments'][0]['author'], 'reader')
+        page = self.client.get(
+            reverse('posts:post_comments', kwargs={'post_id': self.post.pk}),
+            {'format': 'json', 'comments': data['next']}).json()
+        self.assertEqual(len(page['comments']), EXTRA)
+        self.assertIsNone(page['next'])
+
+    def test_unknown_post(self):
+        response = self.client.get(
+            reverse('posts:post_comments', kwargs={'post_id': 0}))
+        self.assertEqual(response.status_code, 404)
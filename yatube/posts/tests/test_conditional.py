@@ -0,0 +1,80 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        cls.post = Post.objects.create(text='Пост', author=cls.author,
+                                       group=cls.group)
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:index') + '?page=1',
+            reverse('posts:group_list', kwargs={'slug': 'group'}),
+            reverse('posts:profile', kwargs={'username': 'author'}),
+            reverse('posts:post_detail', kwargs={'post_id': cls.post.pk}),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.reader)
+
+    def revalidate(self, url, response):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_unchanged_page_is_not_rendered(self):
+        """Неизменившаяся страница отдаётся как 304 без запросов к базе
+        и отрисовки шаблона (кроме сессии и пользователя)."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertIn('Last-Modified', response)
+                self.assertIn('no-cache', response['Cache-Control'])
+                with self.assertNumQueries(2):
+                    response = self.revalidate(url, response)
+                self.assertEqual(response.status_code, 304)
+                self.assertFalse(response.templates)
+
+    def test_if_modified_since(self):
+        url = self.urls[0]
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=self.client.get(url)['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_changes_invalidate_validators(self):
+        """Новый пост и новый комментарий меняют ETag страниц."""
+        changes = (
+            lambda: Post.objects.create(text='Новый', author=self.author),
+            lambda: Comment.objects.create(text='Коммент', post=self.post,
+                                           author=self.reader),
+        )
+        for change in changes:
+            responses = {url: self.client.get(url) for url in self.urls}
+            change()
+            for url, response in responses.items():
+                with self.subTest(url=url):
+                    self.assertEqual(
+                        self.revalidate(url, response).status_code, 200)
+
+    def test_etag_depends_on_user_and_page(self):
+        url = self.urls[0]
+        etag = self.client.get(url)['ETag']
+        self.assertNotEqual(self.client.get(url + '?page=2')['ETag'], etag)
+        self.client.logout()
+        self.assertNotEqual(self.client.get(url)['ETag'], etag)
+
+    def test_profile_etag_depends_on_follow(self):
+        url = self.urls[3]
+        response = self.client.get(url)
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(self.revalidate(url, response).status_code, 200)
@@ -0,0 +1,118 @@
+import time
+from io import StringIO
+from unittest import mock
+
+from core.cache import shared_cache
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.core.cache import cache
+
+from .. import constants, counters
+from ..models import Comment, Follow, Group, Post, UserStats
+
+User = get_user_model()
+
+
+class CountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        cls.other_group = Group.objects.create(title='Другая', slug='other')
+
+    def setUp(self):
+        cache.clear()
+
+    def stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def test_post_counters(self):
+        """Создание, перенос и удаление поста меняют счётчики."""
+        post = Post.objects.create(text='Пост', author=self.author,
+                                   group=self.group)
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 1)
+        post.group = self.other_group
+        post.save()
+        self.group.refresh_from_db()
+        self.other_group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 0)
+        self.assertEqual(self.other_group.posts_count, 1)
+        post.delete()
+        self.other_group.refresh_from_db()
+        self.assertEqual(self.stats(self.author).posts_count, 0)
+        self.assertEqual(self.other_group.posts_count, 0)
+
+    def test_deferred_group_keeps_counters(self):
+        """Сохранение поста из .only() без группы не трогает счётчики."""
+        post = Post.objects.create(text='Пост', author=self.author,
+                                   group=self.group)
+        post = Post.objects.only('text').get(pk=post.pk)
+        post.text = 'Новый текст'
+        post.save()
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 1)
+
+    def test_total_posts_drift_lasts_one_period(self):
+        """Разошедшееся число постов пересчитывается в новом периоде."""
+        Post.objects.create(text='Пост', author=self.author)
+        shared_cache().set(counters.total_posts_key(), 100)
+        self.assertEqual(counters.total_posts_counter().value, 100)
+        later = time.time() + constants.TOTAL_POSTS_PERIOD
+        with mock.patch('posts.counters.time.time', return_value=later):
+            strategy = counters.total_posts_counter()
+            self.assertEqual(strategy.count(Post.objects.all())[0], 1)
+
+    def test_comment_and_follow_counters(self):
+        """Комментарии и подписки меняют счётчики."""
+        post = Post.objects.create(text='Пост', author=self.author)
+        comment = Comment.objects.create(text='Коммент', post=post,
+                                         author=self.reader)
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        comment.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(self.stats(self.author).followers_count, 1)
+        self.assertEqual(self.stats(self.reader).following_count, 1)
+        follow.delete()
+        self.assertEqual(self.stats(self.author).followers_count, 0)
+        self.assertEqual(self.stats(self.reader).following_count, 0)
+
+    def test_reconcile_counters_repairs_drift(self):
+        """Команда reconcile_counters исправляет расхождения."""
+        post = Post.objects.create(text='Пост', author=self.author,
+                                   group=self.group)
+        UserStats.objects.filter(user=self.author).update(posts_count=7)
+        UserStats.objects.filter(user=self.reader).delete()
+        Group.objects.update(posts_count=3)
+        Post.objects.update(comments_count=5)
+        call_command('reconcile_counters', stdout=StringIO())
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+        self.assertEqual(self.stats(self.reader).posts_count, 0)
+        self.group.refresh_from_db()
+        post.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 1)
+        self.assertEqual(post.comments_count, 0)
+
+    def test_pages_read_posts_count_from_counters(self):
+        """post_detail и profile берут число постов из счётчика."""
+        post = Post.objects.create(text='Пост', author=self.author)
+        UserStats.objects.filter(user=self.author).update(posts_count=42)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('posts:post_detail', kwargs={'post_id': post.pk}))
+        self.assertEqual(response.context['user_posts_count'], 42)
+        for query in queries.captured_queries:
+            self.assertNotIn('COUNT(', query['sql'])
+        response = self.client.get(
+            reverse('posts:profile', kwargs={'username': 'author'}))
+        self.assertEqual(response.context['posts_count'], 42)
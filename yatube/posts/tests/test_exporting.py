@@ -0,0 +1,90 @@
+import gzip
+import json
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..exporting import export_records
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ExportContentTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='leo')
+        cls.reader = User.objects.create_user(username='kitty')
+        cls.staff = User.objects.create_user(username='admin', is_staff=True)
+        cls.group = Group.objects.create(title='Коты', slug='cats')
+        cls.post = Post.objects.create(text='Пост в группе', author=cls.author,
+                                       group=cls.group)
+        Post.objects.create(text='Пост читателя', author=cls.reader)
+        Comment.objects.create(text='Коммент', post=cls.post,
+                               author=cls.reader)
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def test_filters(self):
+        """Выгружаются только посты автора и их группы и комментарии."""
+        records = list(export_records(author='leo', chunk_size=1))
+        self.assertEqual([record['type'] for record in records],
+                         ['group', 'post', 'comment', 'follow'])
+        self.assertEqual(records[1]['id'], self.post.pk)
+        self.assertEqual(records[2]['post'], self.post.pk)
+
+    def test_group_filter_applies_to_follows(self):
+        """С фильтром по группе подписки на авторов вне группы не
+        выгружаются."""
+        Follow.objects.create(user=self.author, author=self.reader)
+        records = list(export_records(group='cats'))
+        follows = [(record['user'], record['author'])
+                   for record in records if record['type'] == 'follow']
+        self.assertEqual(follows, [('kitty', 'leo')])
+
+    def test_export_then_import(self):
+        """Выгрузка загружается обратно командой import_content."""
+        with tempfile.NamedTemporaryFile(suffix='.csv') as file:
+            call_command('export_content', '--format=csv', '--chunk-size=1',
+                         f'--output={file.name}')
+            Post.objects.all().delete()
+            Group.objects.all().delete()
+            Follow.objects.all().delete()
+            call_command('import_content', file.name, stdout=StringIO())
+        post = Post.objects.get(author=self.author)
+        self.assertEqual(post.group.slug, 'cats')
+        self.assertEqual(post.pub_date, self.post.pub_date)
+        self.assertEqual(post.comments.get().text, 'Коммент')
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertTrue(Follow.objects.filter(user=self.reader,
+                                              author=self.author).exists())
+
+    def test_endpoint_is_staff_only(self):
+        """Скачивать выгрузку могут только сотрудники."""
+        self.client.force_login(self.author)
+        response = self.client.get(reverse('posts:export'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_endpoint_streams_gzip(self):
+        """Эндпоинт отдаёт выгрузку потоком и сжимает её на лету."""
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('posts:export'),
+                                   {'group': 'cats', 'types': 'post',
+                                    'gzip': 'on'})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        lines = gzip.decompress(
+            b''.join(response.streaming_content)).decode().splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in lines],
+                         [self.post.pk])
+
+    def test_endpoint_rejects_bad_dates(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('posts:export'),
+                                   {'since': '2021-02-01',
+                                    'until': '2021-01-01'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,89 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from .. import feed
+from ..models import FeedItem, Follow, Post
+
+User = get_user_model()
+
+
+class FeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.old_post = Post.objects.create(text='Старый пост',
+                                           author=cls.author)
+
+    def test_follow_backfills_feed(self):
+        """Подписка добавляет в ленту уже написанные посты автора."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertIn(self.old_post, feed.feed_for(self.reader))
+
+    def test_new_post_fans_out_to_followers(self):
+        """Новый пост попадает в материализованные ленты подписчиков."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        self.assertTrue(
+            FeedItem.objects.filter(user=self.reader, post=post).exists())
+        self.assertEqual(feed.feed_for(self.reader)[0], post)
+
+    def test_unfollow_trims_feed(self):
+        """После отписки посты автора пропадают из ленты."""
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        follow.delete()
+        self.assertFalse(FeedItem.objects.filter(user=self.reader).exists())
+        self.assertNotIn(self.old_post, feed.feed_for(self.reader))
+
+    @mock.patch('posts.constants.FEED_FANOUT_LIMIT', 0)
+    def test_celebrity_posts_are_read_on_demand(self):
+        """Посты популярных авторов не рассылаются, но видны в ленте."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        self.assertFalse(FeedItem.objects.filter(post=post).exists())
+        self.assertIn(post, feed.feed_for(self.reader))
+        self.assertIn(self.old_post, feed.feed_for(self.reader))
+
+    def test_former_celebrity_posts_reach_feeds(self):
+        """Посты, написанные без рассылки, попадают в ленты, когда автор
+        перестаёт быть знаменитостью."""
+        other = User.objects.create_user(username='other')
+        Follow.objects.create(user=self.reader, author=self.author)
+        follow = Follow.objects.create(user=other, author=self.author)
+        with mock.patch('posts.constants.FEED_FANOUT_LIMIT', 1):
+            post = Post.objects.create(text='Новый пост', author=self.author)
+            self.assertFalse(FeedItem.objects.filter(post=post).exists())
+            follow.delete()
+        self.assertTrue(FeedItem.objects.filter(
+            user=self.reader, post=post).exists())
+
+    @mock.patch('posts.constants.FEED_FANOUT_LIMIT', 0)
+    def test_rebuild_includes_celebrity_posts(self):
+        """Пересборка кладёт в ленту и посты знаменитостей."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        feed.rebuild(self.reader)
+        self.assertTrue(FeedItem.objects.filter(
+            user=self.reader, post=post).exists())
+
+    def test_same_date_posts_have_stable_order(self):
+        """Посты с одинаковой датой упорядочены по id."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        posts = [Post.objects.create(text=f'Пост {num}', author=self.author)
+                 for num in range(3)]
+        FeedItem.objects.filter(post__in=posts).update(
+            pub_date=self.old_post.pub_date)
+        self.assertEqual(
+            list(feed.feed_for(self.reader)),
+            sorted(posts + [self.old_post], key=lambda post: -post.pk))
+
+    def test_rebuild_feeds_command(self):
+        """Команда rebuild_feeds восстанавливает потерянные записи ленты."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        FeedItem.objects.all().delete()
+        call_command('rebuild_feeds', stdout=mock.MagicMock())
+        self.assertIn(self.old_post, feed.feed_for(self.reader))
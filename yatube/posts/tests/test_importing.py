@@ -0,0 +1,109 @@
+import json
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..models import Comment, FeedItem, Group, Post
+from ..search import get_backend
+
+User = get_user_model()
+
+RECORDS = [
+    {'type': 'group', 'slug': 'cats', 'title': 'Коты'},
+    {'type': 'post', 'id': 10, 'author': 'leo', 'group': 'cats',
+     'text': 'Первый пост', 'pub_date': '2020-01-01T10:00:00+00:00'},
+    {'type': 'post', 'id': 11, 'author': 'leo', 'text': ''},
+    {'type': 'post', 'id': 12, 'author': 'ghost', 'text': 'Чужой пост'},
+    {'type': 'comment', 'post': 10, 'author': 'kitty', 'text': 'Коммент',
+     'created': '2020-01-02T10:00:00+00:00'},
+    {'type': 'comment', 'post': 999, 'author': 'kitty', 'text': 'Мимо'},
+    {'type': 'follow', 'user': 'kitty', 'author': 'leo'},
+]
+
+
+class ImportContentTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='leo')
+        cls.reader = User.objects.create_user(username='kitty')
+
+    def import_content(self, lines, *args, suffix='.jsonl'):
+        with tempfile.NamedTemporaryFile('w', suffix=suffix) as file:
+            file.write(lines)
+            file.flush()
+            stdout, stderr = StringIO(), StringIO()
+            call_command('import_content', file.name, '--batch-size=2',
+                         *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_import_jsonl(self):
+        """Записи всех типов загружаются, ошибки выводятся по строкам."""
+        _, errors = self.import_content(
+            '\n'.join(json.dumps(record) for record in RECORDS))
+        post = Post.objects.get()
+        self.assertEqual(post.group, Group.objects.get(slug='cats'))
+        self.assertEqual(post.pub_date,
+                         datetime(2020, 1, 1, 10, tzinfo=timezone.utc))
+        comment = Comment.objects.get()
+        self.assertEqual(comment.post, post)
+        self.assertEqual(comment.created,
+                         datetime(2020, 1, 2, 10, tzinfo=timezone.utc))
+        self.assertIn('строка 3: text', errors)
+        self.assertIn("строка 4: author: нет пользователя 'ghost'", errors)
+        self.assertIn('строка 6: post: нет поста 999', errors)
+
+    def test_impossible_date_is_a_record_error(self):
+        """Несуществующая дата - ошибка строки, а не всей загрузки."""
+        records = [
+            {'type': 'post', 'author': 'leo', 'text': 'Плохая дата',
+             'pub_date': '2020-13-45T10:00:00'},
+            {'type': 'post', 'author': 'leo', 'text': 'Хороший пост'},
+        ]
+        _, errors = self.import_content(
+            '\n'.join(json.dumps(record) for record in records))
+        self.assertIn("строка 1: некорректная дата", errors)
+        self.assertEqual(Post.objects.get().text, 'Хороший пост')
+
+    def test_repeated_import_links_comments_to_own_posts(self):
+        """Повторная загрузка файла создаёт новые посты, и комментарии
+        ссылаются на посты своей загрузки."""
+        records = [
+            {'type': 'post', 'id': 10, 'author': 'leo', 'text': 'Пост'},
+            {'type': 'comment', 'post': 10, 'author': 'kitty',
+             'text': 'Коммент'},
+        ]
+        for _ in range(2):
+            self.import_content(
+                '\n'.join(json.dumps(record) for record in records))
+        self.assertEqual(Post.objects.count(), 2)
+        for post in Post.objects.all():
+            self.assertEqual(post.comments.count(), 1)
+
+    def test_derived_data_is_rebuilt(self):
+        """После загрузки пересчитаны счётчики, ленты и поиск."""
+        self.import_content(
+            '\n'.join(json.dumps(record) for record in RECORDS))
+        post = Post.objects.get()
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(post.group.posts_count, 1)
+        self.author.stats.refresh_from_db()
+        self.assertEqual(self.author.stats.posts_count, 1)
+        self.assertEqual(self.author.stats.followers_count, 1)
+        self.assertTrue(FeedItem.objects.filter(user=self.reader,
+                                                post=post).exists())
+        self.assertEqual([found.pk for found in
+                          get_backend().search('первый')[:10]], [post.pk])
+
+    def test_import_csv_creates_authors(self):
+        """CSV с одним типом записей и созданием новых авторов."""
+        self.import_content('author,text\nnewbie,Пост из CSV\n',
+                            '--type=post', '--create-authors',
+                            suffix='.csv')
+        post = Post.objects.get()
+        self.assertEqual(post.author.username, 'newbie')
+        self.assertFalse(post.author.has_usable_password())
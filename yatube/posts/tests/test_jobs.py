@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from .. import constants, jobs
+from ..models import Group, Job
+
+calls = []
+
+
+@jobs.task
+def create_group(slug):
+    Group.objects.create(title=slug, slug=slug, description='')
+
+
+@jobs.task
+def broken():
+    raise RuntimeError('сломалось')
+
+
+def not_a_task():
+    calls.append('вызвана')
+
+
+class JobQueueTests(TestCase):
+
+    def test_job_runs_and_is_removed(self):
+        """Воркер выполняет задачу с аргументами и удаляет её."""
+        jobs.enqueue(create_group, 'cats')
+        self.assertEqual(jobs.work(once=True), 1)
+        self.assertTrue(Group.objects.filter(slug='cats').exists())
+        self.assertFalse(Job.objects.exists())
+
+    def test_delayed_job_waits(self):
+        jobs.enqueue(create_group, 'cats', delay=60)
+        self.assertEqual(jobs.work(once=True), 0)
+        self.assertTrue(Job.objects.exists())
+
+    def test_failed_job_retries_with_backoff(self):
+        """Упавшая задача откладывается всё дольше, затем помечается."""
+        job = jobs.enqueue(broken)
+        job.max_attempts = 2
+        job.save()
+        started = timezone.now()
+        jobs.work(once=True)
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 1)
+        self.assertFalse(job.failed)
+        self.assertIsNone(job.locked_until)
+        self.assertIn('сломалось', job.last_error)
+        self.assertGreaterEqual(
+            job.run_at,
+            started + timedelta(seconds=constants.JOB_RETRY_DELAY))
+        self.assertEqual(jobs.retry_delay(3), constants.JOB_RETRY_DELAY * 4)
+        Job.objects.update(run_at=timezone.now())
+        jobs.work(once=True)
+        job.refresh_from_db()
+        self.assertTrue(job.failed)
+        self.assertEqual(jobs.work(once=True), 0)
+
+    def test_claimed_job_is_hidden_until_timeout(self):
+        """Взятую задачу другой воркер получит только после таймаута."""
+        job = jobs.enqueue(create_group, 'cats')
+        self.assertEqual(jobs.claim().pk, job.pk)
+        self.assertIsNone(jobs.claim())
+        Job.objects.update(
+            locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(jobs.claim().pk, job.pk)
+
+    def test_only_marked_functions_run(self):
+        job = jobs.enqueue(not_a_task)
+        job.max_attempts = 1
+        job.save()
+        jobs.work(once=True)
+        job.refresh_from_db()
+        self.assertTrue(job.failed)
+        self.assertEqual(calls, [])
@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from .. import lookups
+from ..models import Follow, Group
+
+User = get_user_model()
+
+
+class LookupsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_group_is_cached(self):
+        """Повторная выборка группы не обращается к базе."""
+        Group.objects.create(title='Группа', slug='group')
+        lookups.get_group('group')
+        with self.assertNumQueries(0):
+            self.assertEqual(lookups.get_group('group').slug, 'group')
+
+    def test_group_change_resets_cache(self):
+        group = Group.objects.create(title='Группа', slug='group')
+        lookups.get_group('group')
+        group.title = 'Новое название'
+        group.save()
+        self.assertEqual(lookups.get_group('group').title, 'Новое название')
+        group.slug = 'renamed'
+        group.save()
+        response = self.client.get(
+            reverse('posts:group_list', kwargs={'slug': 'group'}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_author_is_cached_without_stats(self):
+        """В кеш попадает пользователь, но не его счётчики."""
+        lookups.get_author('author')
+        with self.assertNumQueries(0):
+            author = lookups.get_author('author')
+        self.assertNotIn('stats', author._state.fields_cache)
+
+    def test_user_rename_resets_cache(self):
+        lookups.get_author('reader')
+        self.reader.username = 'renamed'
+        self.reader.save()
+        self.assertEqual(lookups.get_author('renamed'), self.reader)
+        response = self.client.get(
+            reverse('posts:profile', kwargs={'username': 'reader'}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_following_follows_signals(self):
+        """Проверка подписки кешируется и сбрасывается при её изменении."""
+        self.assertFalse(lookups.is_following(self.reader, self.author))
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        with self.assertNumQueries(1):
+            self.assertTrue(lookups.is_following(self.reader, self.author))
+        with self.assertNumQueries(0):
+            self.assertTrue(lookups.is_following(self.reader, self.author))
+        follow.delete()
+        self.assertFalse(lookups.is_following(self.reader, self.author))
@@ -0,0 +1,112 @@
+from core import stampede
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from .. import page_cache
+from ..models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class AnonymousPageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        cls.other_group = Group.objects.create(title='Другая', slug='other')
+        cls.post = Post.objects.create(text='Пост', author=cls.author,
+                                       group=cls.group)
+        cls.other_post = Post.objects.create(text='Чужой', author=cls.other,
+                                             group=cls.other_group)
+        cls.pages = {
+            'index': reverse('posts:index'),
+            'group': reverse('posts:group_list', kwargs={'slug': 'group'}),
+            'other_group': reverse('posts:group_list',
+                                   kwargs={'slug': 'other'}),
+            'profile': reverse('posts:profile',
+                               kwargs={'username': 'author'}),
+            'other_profile': reverse('posts:profile',
+                                     kwargs={'username': 'other'}),
+            'post': reverse('posts:post_detail',
+                            kwargs={'post_id': cls.post.pk}),
+            'other_post': reverse('posts:post_detail',
+                                  kwargs={'post_id': cls.other_post.pk}),
+        }
+
+    def setUp(self):
+        cache.clear()
+
+    def states(self):
+        return {name: self.client.get(url)['X-Page-Cache']
+                for name, url in self.pages.items()}
+
+    def test_repeated_request_is_served_from_cache(self):
+        """Повторный запрос гостя не обращается к базе."""
+        for url in self.pages.values():
+            with self.subTest(url=url):
+                first = self.client.get(url)
+                with self.assertNumQueries(0):
+                    second = self.client.get(url)
+                self.assertEqual(second['X-Page-Cache'], page_cache.HIT)
+                self.assertEqual(second.content, first.content)
+
+    def test_query_string_is_part_of_key(self):
+        self.client.get(self.pages['index'])
+        response = self.client.get(self.pages['index'] + '?page=2')
+        self.assertEqual(response['X-Page-Cache'], page_cache.MISS)
+
+    def test_users_bypass_cache(self):
+        self.client.get(self.pages['index'])
+        self.client.force_login(self.author)
+        response = self.client.get(self.pages['index'])
+        self.assertNotIn('X-Page-Cache', response)
+
+    def test_new_post_purges_only_affected_pages(self):
+        """Новый пост сбрасывает ленту, свою группу и профиль автора."""
+        self.states()
+        Post.objects.create(text='Новый', author=self.author,
+                            group=self.group)
+        self.assertEqual(self.states(), {
+            'index': page_cache.MISS,
+            'group': page_cache.MISS,
+            'other_group': page_cache.HIT,
+            'profile': page_cache.MISS,
+            'other_profile': page_cache.HIT,
+            # На странице поста показано число постов автора.
+            'post': page_cache.MISS,
+            'other_post': page_cache.HIT,
+        })
+
+    def test_comment_purges_only_its_post(self):
+        self.states()
+        Comment.objects.create(text='Коммент', post=self.post,
+                               author=self.other)
+        states = self.states()
+        self.assertEqual(states.pop('post'), page_cache.MISS)
+        self.assertEqual(set(states.values()), {page_cache.HIT})
+
+    def test_group_rename_purges_everything(self):
+        self.states()
+        self.group.title = 'Новое название'
+        self.group.save()
+        self.assertEqual(set(self.states().values()), {page_cache.MISS})
+
+    def test_stale_page_served_while_refreshing(self):
+        """Пока один запрос обновляет страницу, другие получают копию."""
+        url = self.pages['index']
+        old = self.client.get(url).content
+        Post.objects.create(text='Новый пост', author=self.author)
+        lock = stampede.lock_key(
+            page_cache.page_key(RequestFactory().get(url)))
+        cache.add(lock, 1)
+        response = self.client.get(url)
+        self.assertEqual(response['X-Page-Cache'], page_cache.STALE)
+        self.assertEqual(response.content, old)
+        cache.delete(lock)
+        response = self.client.get(url)
+        self.assertEqual(response['X-Page-Cache'], page_cache.MISS)
+        self.assertContains(response, 'Новый пост')
@@ -0,0 +1,97 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+# Полный проход по таблице без индекса.
+FULL_SCAN = re.compile(r'^SCAN (TABLE )?\w+$')
+TEMP_SORT = 'USE TEMP B-TREE'
+
+
+class QueryPlanTests(TestCase):
+    """Запросы страниц posts/views.py идут по индексам без сортировки
+    во временном B-дереве."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        for num in range(15):
+            post = Post.objects.create(text=f'Пост {num}', author=cls.author,
+                                       group=cls.group)
+            Comment.objects.create(text='Коммент', post=post,
+                                   author=cls.reader)
+        cls.post = post
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def plan(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assert_plans(self, url, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            if data is None:
+                self.client.get(url)
+            else:
+                self.client.post(url, data)
+        selects = [query['sql'] for query in queries.captured_queries
+                   if query['sql'].startswith('SELECT')]
+        self.assertTrue(selects)
+        for sql in selects:
+            # Запрос без условий (список групп в форме) читает всю таблицу
+            # намеренно, индекс ему не поможет.
+            whole_table = ' WHERE ' not in sql
+            for detail in self.plan(sql):
+                with self.subTest(url=url, sql=sql, detail=detail):
+                    if not whole_table:
+                        self.assertIsNone(FULL_SCAN.match(detail))
+                    self.assertNotIn(TEMP_SORT, detail)
+
+    def test_view_queries_use_indexes(self):
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:index') + '?page=2',
+            reverse('posts:group_list', kwargs={'slug': 'group'}),
+            reverse('posts:profile', kwargs={'username': 'author'}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+            reverse('posts:follow_index'),
+        )
+        for url in urls:
+            self.assert_plans(url)
+
+    def test_author_queries_use_indexes(self):
+        self.client.force_login(self.author)
+        self.assert_plans(reverse('posts:post_edit',
+                                  kwargs={'post_id': self.post.pk}))
+        self.assert_plans(reverse('posts:post_create'))
+        self.assert_plans(reverse('posts:post_create'),
+                          {'text': 'Новый пост', 'group': self.group.pk})
+        self.assertTrue(Post.objects.filter(text='Новый пост').exists())
+
+    def test_write_queries_use_indexes(self):
+        self.assert_plans(
+            reverse('posts:add_comment', kwargs={'post_id': self.post.pk}),
+            {'text': 'Новый коммент'})
+        self.assert_plans(reverse('posts:profile_unfollow',
+                                  kwargs={'username': 'author'}))
+        self.assert_plans(reverse('posts:profile_follow',
+                                  kwargs={'username': 'author'}))
+        self.assertTrue(Comment.objects.filter(text='Новый коммент').exists())
+        self.assertTrue(Follow.objects.filter(user=self.reader,
+                                              author=self.author).exists())
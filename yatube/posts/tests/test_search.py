@@ -0,0 +1,81 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Post
+from ..search import SqliteFTSBackend, get_backend, stem
+
+User = get_user_model()
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Author')
+
+    def setUp(self):
+        cache.clear()
+
+    def found(self, query):
+        return [post.pk for post in get_backend().search(query)[:100]]
+
+    def test_stem(self):
+        """Окончания отбрасываются, короткие слова не трогаются."""
+        self.assertEqual(stem('посты'), 'пост')
+        self.assertEqual(stem('постами'), 'пост')
+        self.assertEqual(stem('кот'), 'кот')
+
+    def test_word_forms_are_found(self):
+        """Запрос находит другие формы слова."""
+        post = Post.objects.create(text='Пишу о постах и котах',
+                                   author=self.user)
+        Post.objects.create(text='Совсем другое', author=self.user)
+        self.assertEqual(self.found('посты'), [post.pk])
+
+    def test_index_follows_edits(self):
+        """Изменённый и удалённый пост сразу отражаются в поиске."""
+        post = Post.objects.create(text='Старый текст', author=self.user)
+        post.text = 'Новый текст'
+        post.save()
+        self.assertEqual(self.found('старый'), [])
+        self.assertEqual(self.found('новый'), [post.pk])
+        post.delete()
+        self.assertEqual(self.found('новый'), [])
+
+    def test_snippet_is_escaped_and_highlighted(self):
+        """Фрагмент экранирует HTML и выделяет совпадения."""
+        Post.objects.create(text='<b>Кошка</b> спит', author=self.user)
+        post = get_backend().search('кошки')[:1][0]
+        self.assertEqual(post.snippet,
+                         '&lt;b&gt;<mark>Кошка</mark>&lt;/b&gt; спит')
+
+    def test_search_page_paginates_with_query(self):
+        """Страница поиска делится на страницы и сохраняет запрос в ссылках."""
+        for num in range(15):
+            Post.objects.create(text=f'Погода {num}', author=self.user)
+        response = self.client.get(reverse('posts:search'), {'q': 'погоды'})
+        self.assertEqual(response.context['page_obj'].paginator.count, 15)
+        self.assertEqual(len(response.context['page_obj']), 10)
+        self.assertContains(response, '?q=%D0%BF%D0%BE%D0%B3%D0%BE%D0%B4%D1'
+                                      '%8B&amp;page=2')
+
+    def test_search_page_reports_no_results(self):
+        """Запрос без совпадений показывает «Ничего не найдено»."""
+        response = self.client.get(reverse('posts:search'),
+                                   {'q': 'несуществующееслово'})
+        self.assertContains(response, 'Ничего не найдено.')
+
+    def test_rebuild_command(self):
+        """Команда rebuild_search_index восстанавливает индекс."""
+        post = Post.objects.create(text='Восстановление', author=self.user)
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SqliteFTSBackend.table}')
+        self.assertEqual(self.found('восстановление'), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self.found('восстановление'), [post.pk])
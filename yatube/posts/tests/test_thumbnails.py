@@ -0,0 +1,114 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from .. import thumbnails
+from ..models import Job, Post
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+User = get_user_model()
+
+
+def make_image(name='picture.png', size=(200, 100)):
+    buffer = BytesIO()
+    Image.new('RGB', size, 'red').save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(),
+                              content_type='image/png')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Author')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_generate_stores_all_sizes(self):
+        """Миниатюры строятся нужного размера, их адреса хранятся в посте."""
+        post = Post.objects.create(text='Пост', author=self.user,
+                                   image=make_image())
+        thumbnails.generate(post.pk)
+        post.refresh_from_db()
+        card = post.card_thumbnail
+        self.assertEqual((card['width'], card['height']), (960, 339))
+        path = os.path.join(TEMP_MEDIA_ROOT,
+                            thumbnails.thumbnail_path(post, 'card'))
+        with Image.open(path) as image:
+            self.assertEqual(image.size, (960, 339))
+
+    def test_create_schedules_thumbnails(self):
+        """Новый пост с картинкой ставит в очередь задачу миниатюр."""
+        self.client.post(reverse('posts:post_create'),
+                         {'text': 'Пост', 'image': make_image()})
+        post = Post.objects.get()
+        job = Job.objects.get()
+        self.assertEqual(job.task, 'posts.thumbnails.generate')
+        self.assertIsNone(post.card_thumbnail)
+        call_command('run_workers', '--processes=1', '--once',
+                     stdout=StringIO())
+        post.refresh_from_db()
+        self.assertIsNotNone(post.card_thumbnail)
+
+    def test_regenerate_thumbnails_skips_broken_image(self):
+        """Битая картинка не останавливает regenerate_thumbnails."""
+        post = Post.objects.create(text='Пост', author=self.user,
+                                   image=make_image())
+        # Новый пост обрабатывается первым.
+        Post.objects.create(
+            text='Битый пост', author=self.user,
+            image=SimpleUploadedFile('broken.png', b'not an image',
+                                     content_type='image/png'))
+        stderr = StringIO()
+        with self.assertLogs('posts.thumbnails', 'ERROR'):
+            call_command('regenerate_thumbnails', '--workers=1',
+                         '--missing', stdout=StringIO(), stderr=stderr)
+        post.refresh_from_db()
+        self.assertIsNotNone(post.card_thumbnail)
+        self.assertIn('Не удалось построить миниатюры постов: 1',
+                      stderr.getvalue())
+        self.assertFalse(Job.objects.exists())
+
+    def test_templates_use_stored_thumbnail(self):
+        """Страницы берут готовую миниатюру без обращения к sorl."""
+        post = Post.objects.create(text='Пост', author=self.user,
+                                   image=make_image())
+        thumbnails.generate(post.pk)
+        post.refresh_from_db()
+        url = post.card_thumbnail['url']
+        pages = (
+            reverse('posts:index'),
+            reverse('posts:profile', kwargs={'username': 'Author'}),
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}),
+        )
+        for page in pages:
+            with self.subTest(page=page):
+                self.assertContains(self.client.get(page), url)
+
+    def test_regenerate_thumbnails_command(self):
+        """Команда regenerate_thumbnails строит недостающие миниатюры."""
+        post = Post.objects.create(text='Пост', author=self.user,
+                                   image=make_image())
+        call_command('regenerate_thumbnails', '--workers=1', '--missing',
+                     stdout=StringIO())
+        post.refresh_from_db()
+        self.assertIsNotNone(post.card_thumbnail)
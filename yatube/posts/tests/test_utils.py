@@ -0,0 +1,205 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.core.cache import cache
+
+from ..models import Group, Post
+from .. import counting
+from ..utils import KeysetPage, KeysetPaginator, WindowPaginator
+from . import constants
+
+User = get_user_model()
+
+
+class KeysetPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Author')
+        for num in range(13):
+            Post.objects.create(text=f'{num}Пост пагинация', author=cls.user)
+        cls.ordered = list(Post.objects.order_by('-pub_date', '-id'))
+
+    def setUp(self):
+        cache.clear()
+        self.paginator = KeysetPaginator(Post.objects.all(),
+                                         constants.TEN_POSTS)
+
+    def test_pages_follow_each_other(self):
+        """Курсоры ведут на соседние страницы и обратно."""
+        first = self.paginator.get_page(None)
+        self.assertEqual(list(first), self.ordered[:constants.TEN_POSTS])
+        self.assertFalse(first.has_previous())
+        second = self.paginator.get_page(first.next_page_number())
+        self.assertEqual(list(second), self.ordered[constants.TEN_POSTS:])
+        self.assertFalse(second.has_next())
+        back = self.paginator.get_page(second.previous_page_number())
+        self.assertEqual(list(back), list(first))
+
+    def test_broken_cursor_returns_first_page(self):
+        """Испорченный курсор открывает первую страницу."""
+        for cursor in ('1', 'n!!!', 'nYWJj', ''):
+            with self.subTest(cursor=cursor):
+                page = self.paginator.get_page(cursor)
+                self.assertEqual(list(page),
+                                 self.ordered[:constants.TEN_POSTS])
+
+    @override_settings(POSTS_PAGINATION='keyset')
+    def test_index_uses_keyset_without_offset_and_count(self):
+        """В режиме keyset лента не делает OFFSET и COUNT(*)."""
+        response = self.client.get(reverse('posts:index'))
+        page_obj = response.context['page_obj']
+        self.assertIsInstance(page_obj, KeysetPage)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('posts:index'),
+                {'page': page_obj.next_page_number()}
+            )
+        self.assertEqual(len(response.context['page_obj']),
+                         constants.THREE_POSTS)
+        for query in queries.captured_queries:
+            self.assertNotIn('OFFSET', query['sql'])
+            self.assertNotIn('COUNT(', query['sql'])
+
+
+class WindowPaginatorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_window_is_elided_for_many_pages(self):
+        """Окно показывает края и соседей текущей страницы."""
+        paginator = WindowPaginator(range(1000), constants.TEN_POSTS)
+        gap = WindowPaginator.ELLIPSIS
+        cases = {
+            1: [1, 2, 3, gap, 100],
+            4: [1, 2, 3, 4, 5, 6, gap, 100],
+            50: [1, gap, 48, 49, 50, 51, 52, gap, 100],
+            97: [1, gap, 95, 96, 97, 98, 99, 100],
+            100: [1, gap, 98, 99, 100],
+        }
+        for number, window in cases.items():
+            with self.subTest(number=number):
+                self.assertEqual(paginator.page_window(number), window)
+
+    def test_short_list_shows_all_pages(self):
+        """Если страниц мало, пропусков нет."""
+        paginator = WindowPaginator(range(70), constants.TEN_POSTS)
+        self.assertEqual(paginator.get_page(4).page_window,
+                         list(range(1, 8)))
+
+    def test_index_count_follows_posts_without_count_query(self):
+        """Главная берёт число постов из счётчика, а не из COUNT(*)."""
+        user = User.objects.create_user(username='Author')
+        Post.objects.create(text='Пост', author=user)
+        self.client.get(reverse('posts:index'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('posts:index') + '?page=1')
+        self.assertEqual(response.context['page_obj'].paginator.count, 1)
+        self.assertFalse(any('COUNT(' in query['sql']
+                             for query in queries.captured_queries))
+        Post.objects.create(text='Ещё пост', author=user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('posts:index') + '?page=1')
+        self.assertEqual(response.context['page_obj'].paginator.count, 2)
+        self.assertFalse(any('COUNT(' in query['sql']
+                             for query in queries.captured_queries))
+
+    @mock.patch('posts.constants.APPROXIMATE_COUNT_FROM', 1000)
+    def test_index_estimates_large_table_without_counter(self):
+        """Без счётчика большая таблица на главной оценивается, а число
+        страниц помечается как приблизительное."""
+        user = User.objects.create_user(username='Author')
+        for num in range(constants.TEN_POSTS + 1):
+            Post.objects.create(text=f'Пост {num}', author=user)
+        Post.objects.create(pk=100_000, text='Далёкий пост', author=user)
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('posts:index'))
+        paginator = response.context['page_obj'].paginator
+        self.assertTrue(paginator.count_is_approximate)
+        self.assertFalse(any('COUNT(' in query['sql']
+                             for query in queries.captured_queries))
+        self.assertContains(response, '≈')
+
+    def test_paginator_html_size_does_not_grow_with_pages(self):
+        """Навигация по длинному списку не выводит все номера страниц."""
+        page = WindowPaginator(range(100_000), 1).get_page(50_000)
+        html = render_to_string('posts/paginator.html', {'page_obj': page})
+        self.assertLess(html.count('page-item'), 15)
+        self.assertIn('page=100000', html)
+
+
+class CountStrategyTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Author')
+        for num in range(13):
+            Post.objects.create(text=f'{num}Пост пагинация', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def paginator(self, counter):
+        return WindowPaginator(Post.objects.all(), constants.TEN_POSTS,
+                               counter=counter)
+
+    def test_large_table_is_counted_approximately(self):
+        """Большая таблица без фильтров считается по первичному ключу."""
+        Post.objects.create(pk=100_000, text='Далёкий пост',
+                            author=self.user)
+        paginator = self.paginator(counting.Approximate(threshold=1000))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertGreater(paginator.count, 1000)
+        self.assertTrue(paginator.count_is_approximate)
+        self.assertFalse(any('COUNT(' in query['sql']
+                             for query in queries.captured_queries))
+
+    def test_small_table_falls_back_to_exact_count(self):
+        """Ниже порога число считается точно."""
+        paginator = self.paginator(counting.Approximate(threshold=1000))
+        self.assertEqual(paginator.count, 13)
+        self.assertEqual(paginator.count_mode, counting.EXACT)
+
+    def test_underestimated_count_is_corrected(self):
+        """Заниженный счётчик не прячет последние посты."""
+        page = self.paginator(counting.Counter(5)).get_page(2)
+        self.assertEqual(len(page), constants.THREE_POSTS)
+        self.assertFalse(page.has_next())
+        self.assertEqual(page.paginator.count, 13)
+
+    def test_overestimated_count_opens_real_last_page(self):
+        """Завышенный счётчик не даёт пустых страниц."""
+        page = self.paginator(counting.Counter(100)).get_page(5)
+        self.assertEqual(page.number, 2)
+        self.assertEqual(len(page), constants.THREE_POSTS)
+        self.assertEqual(page.paginator.num_pages, 2)
+
+    def test_huge_page_number_opens_last_page(self):
+        """Огромный номер страницы открывает последнюю за пару запросов."""
+        group = Group.objects.create(title='Группа', slug='group')
+        Post.objects.filter(author=self.user).update(group=group)
+        group.refresh_from_db()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('posts:group_list', kwargs={'slug': 'group'}),
+                {'page': 3000})
+        self.assertEqual(response.status_code, 200)
+        page = response.context['page_obj']
+        self.assertEqual(page.number, 2)
+        self.assertEqual(len(page), constants.THREE_POSTS)
+        self.assertLess(len(queries.captured_queries), 10)
+
+    def test_cached_count_reports_its_mode(self):
+        """Число из кеша помечается как неточное."""
+        counter = counting.Cached('test:count')
+        self.assertEqual(self.paginator(counter).count_mode, counting.EXACT)
+        Post.objects.create(text='Новый пост', author=self.user)
+        paginator = self.paginator(counter)
+        self.assertEqual(paginator.count_mode, counting.CACHED)
+        self.assertEqual(len(paginator.get_page(2)), 4)
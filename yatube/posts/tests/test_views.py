@@ -231,9 +231,11 @@ class PostPagesTests(TestCase):
         self.assertIn('comments', response.context)
 
     def test_cache_index(self):
-        """Проверка кэша на главной странице."""
+        """Кэш главной страницы сбрасывается при появлении поста."""
         response = self.authorized_author.get(reverse('posts:index'))
         countent_1 = response.content
+        response_cached = self.authorized_author.get(reverse('posts:index'))
+        self.assertEqual(countent_1, response_cached.content)
         Post.objects.create(
             text='Тестовый текст для кэша',
             author=self.user_author
@@ -241,15 +243,8 @@ class PostPagesTests(TestCase):
         response_creat_post = self.authorized_author.get(
             reverse('posts:index')
         )
-        self.assertEqual(countent_1, response_creat_post.content)
-        cache.clear()
-        new_response = self.authorized_author.get(
-            reverse('posts:index')
-        )
-        new_countent_posts = new_response.content
-        self.assertNotEqual(
-            countent_1, new_countent_posts
-        )
+        self.assertNotEqual(countent_1, response_creat_post.content)
+        self.assertContains(response_creat_post, 'Тестовый текст для кэша')
 
     def test_unexisting_page_castom(self):
         """Запрос к несуществующей странице вернет кастомный шаблон 404."""
@@ -0,0 +1,78 @@
+"""Фоновая подготовка миниатюр картинок постов.
+
+Миниатюры всех размеров из ``constants.THUMBNAIL_SIZES`` строит
+фоновая задача (posts.jobs) после сохранения поста, а их адреса и
+размеры хранятся в ``Post.thumbnails``, так что шаблонам не нужно
+ничего вычислять.
+"""
+import json
+import logging
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from . import caching, constants, jobs, page_cache
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+
+def thumbnail_path(post, name):
+    stem = os.path.splitext(os.path.basename(post.image.name))[0]
+    return f'thumbnails/posts/{post.pk}/{name}_{stem}.jpg'
+
+
+def render(image, size):
+    """Обрезает картинку по центру до ``size``, при необходимости
+    увеличивая её."""
+    thumbnail = ImageOps.fit(image.convert('RGB'), size, Image.LANCZOS)
+    buffer = BytesIO()
+    thumbnail.save(buffer, 'JPEG', quality=constants.THUMBNAIL_QUALITY)
+    return buffer.getvalue()
+
+
+@jobs.task
+def generate(post_id):
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not post.image:
+        return
+    with post.image.open('rb') as image_file:
+        image = Image.open(image_file)
+        image.load()
+    thumbnails = {}
+    for name, size in constants.THUMBNAIL_SIZES.items():
+        path = thumbnail_path(post, name)
+        default_storage.delete(path)
+        path = default_storage.save(path, ContentFile(render(image, size)))
+        thumbnails[name] = {
+            'url': default_storage.url(path),
+            'width': size[0],
+            'height': size[1],
+        }
+    # Картинку могли заменить, пока строились миниатюры.
+    Post.objects.filter(pk=post_id, image=post.image.name).update(
+        thumbnails=json.dumps(thumbnails), updated=timezone.now())
+    caching.bump_list_version()
+    page_cache.purge_post(post)
+
+
+def generate_safely(post_id):
+    """Строит миниатюры; ошибку пишет в лог и возвращает False."""
+    try:
+        generate(post_id)
+    except Exception:
+        logger.exception('Не удалось построить миниатюры поста %s', post_id)
+        return False
+    return True
+
+
+def schedule(post):
+    """Сбрасывает старые миниатюры и ставит пост в очередь на обработку."""
+    post.thumbnails = ''
+    Post.objects.filter(pk=post.pk).update(thumbnails='')
+    if post.image:
+        jobs.enqueue(generate, post.pk)
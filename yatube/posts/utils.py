@@ -1,8 +1,283 @@
-from . import constants
-from django.core.paginator import Paginator
+from contextlib import contextmanager
 
+from . import constants, counting
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import (EmptyPage, Page, PageNotAnInteger,
+                                   Paginator)
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
 
-def page_nav(posts, request):
-    paginator = Paginator(posts, constants.POSTS_PER_PAGE)
+NEXT = 'n'
+PREVIOUS = 'p'
+CURSOR_SEPARATOR = '|'
+
+
+class WindowPaginator(Paginator):
+    """Пагинатор по номеру с окном страниц и числом записей без COUNT(*).
+
+    Вместо всех номеров из ``page_range`` шаблон выводит окно: первые и
+    последние ``on_ends`` страниц и ``on_each_side`` соседей текущей, а
+    пропуски отмечает ``ELLIPSIS``; окно лежит в ``page_window``
+    страницы. Размер HTML не зависит от числа страниц.
+
+    Число записей даёт стратегия ``counter`` из posts/counting.py. Если
+    оно неточное, страница читается с запасом в одну запись, и число
+    поправляется, когда выясняется, где на самом деле кончается список.
+    """
+    ELLIPSIS = '…'
+
+    def __init__(self, object_list, per_page, counter=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.counter = counter or counting.Exact()
+
+    @cached_property
+    def count(self):
+        count, self._count_mode = self.counter.count(self.object_list)
+        return count
+
+    @property
+    def count_mode(self):
+        self.count
+        return self._count_mode
+
+    @property
+    def count_is_approximate(self):
+        return self.count_mode == counting.APPROXIMATE
+
+    def correct_count(self, count):
+        self.count = count
+        self.__dict__.pop('num_pages', None)
+
+    def page_window(self, number,
+                    on_each_side=constants.PAGE_WINDOW_ON_EACH_SIDE,
+                    on_ends=constants.PAGE_WINDOW_ON_ENDS):
+        """Номера страниц вокруг ``number`` с ``ELLIPSIS`` на пропусках."""
+        number = self.validate_number(number)
+        num_pages = self.num_pages
+        if num_pages <= (on_each_side + on_ends) * 2 + 1:
+            return list(self.page_range)
+        window = []
+        if number > on_each_side + on_ends + 1:
+            window.extend(range(1, on_ends + 1))
+            window.append(self.ELLIPSIS)
+            window.extend(range(number - on_each_side, number + 1))
+        else:
+            window.extend(range(1, number + 1))
+        if number < num_pages - on_each_side - on_ends:
+            window.extend(range(number + 1, number + on_each_side + 1))
+            window.append(self.ELLIPSIS)
+            window.extend(range(num_pages - on_ends + 1, num_pages + 1))
+        else:
+            window.extend(range(number + 1, num_pages + 1))
+        return window
+
+    def get_page(self, number):
+        if self.count_mode == counting.EXACT:
+            return super().get_page(number)
+        try:
+            return self.page(number)
+        except PageNotAnInteger:
+            return self.page(1)
+        except EmptyPage:
+            return self.page(self.num_pages)
+
+    def page(self, number):
+        if self.count_mode == counting.EXACT:
+            page = super().page(number)
+        else:
+            page = self.checked_page(number)
+        page.page_window = self.page_window(page.number)
+        return page
+
+    def checked_page(self, number):
+        try:
+            number = self.validate_number(number)
+        except EmptyPage:
+            # Число занижено, а страница за ним может существовать.
+            number = int(number)
+            if number < 1:
+                raise
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            # Страница за концом списка: число записей было завышено или
+            # номер страницы взят с потолка. Один честный COUNT(*) сразу
+            # даёт настоящую последнюю страницу.
+            self.correct_count(counting.Exact().count(self.object_list)[0])
+            number = self.num_pages
+            bottom = (number - 1) * self.per_page
+            rows = list(self.object_list[bottom:bottom + self.per_page])
+        elif len(rows) <= self.per_page or number >= self.num_pages:
+            # Дошли до конца списка или до конца по оценке: число записей
+            # не меньше прочитанного, а если записей меньше страницы -
+            # теперь известно точно.
+            self.correct_count(bottom + len(rows))
+        return self._get_page(rows[:self.per_page], number, self)
+
+
+class KeysetPage(Page):
+    """Страница, построенная по курсору, а не по номеру.
+
+    Вместо номеров соседних страниц отдаёт курсоры, поэтому ссылки
+    вида ``?page={{ page_obj.next_page_number }}`` продолжают работать.
+    """
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, next_cursor=None,
+                 previous_cursor=None):
+        super().__init__(object_list, None, paginator)
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return '<KeysetPage %s>' % (self.previous_cursor or 'first')
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def next_page_number(self):
+        return self.next_cursor
+
+    def previous_page_number(self):
+        return self.previous_cursor
+
+
+class KeysetPaginator(Paginator):
+    """Пагинация по ключу (seek): без OFFSET и без COUNT(*).
+
+    Записи упорядочиваются по убыванию полей ``keys``, последнее из
+    которых должно быть уникальным. Курсор кодирует значения ключей
+    крайней записи страницы и направление перехода.
+    """
+
+    def __init__(self, object_list, per_page, keys=('pub_date', 'id')):
+        self.keys = keys
+        object_list = object_list.order_by(*(f'-{key}' for key in keys))
+        super().__init__(object_list, per_page)
+
+    def encode_cursor(self, direction, obj):
+        raw = CURSOR_SEPARATOR.join(
+            self._serialize(getattr(obj, key)) for key in self.keys)
+        return direction + urlsafe_base64_encode(raw.encode())
+
+    def decode_cursor(self, cursor):
+        """Возвращает пару (направление, значения ключей) или None."""
+        if not cursor or cursor[0] not in (NEXT, PREVIOUS):
+            return None
+        try:
+            raw = urlsafe_base64_decode(cursor[1:]).decode()
+        except (ValueError, UnicodeDecodeError):
+            return None
+        parts = raw.split(CURSOR_SEPARATOR)
+        if len(parts) != len(self.keys):
+            return None
+        model_meta = self.object_list.model._meta
+        try:
+            values = [model_meta.get_field(key).to_python(part)
+                      for key, part in zip(self.keys, parts)]
+        except ValidationError:
+            return None
+        if None in values:
+            return None
+        return cursor[0], values
+
+    def get_page(self, cursor):
+        decoded = self.decode_cursor(cursor)
+        if decoded is None:
+            return self._first_page()
+        direction, values = decoded
+        if direction == NEXT:
+            return self._page_after(values)
+        return self._page_before(values)
+
+    def _first_page(self):
+        rows = list(self.object_list[:self.per_page + 1])
+        return self._build_page(rows, has_previous=False)
+
+    def _page_after(self, values):
+        rows = list(
+            self.object_list.filter(self._seek(values, 'lt'))
+            [:self.per_page + 1]
+        )
+        return self._build_page(rows, has_previous=True)
+
+    def _page_before(self, values):
+        rows = list(
+            self.object_list.reverse().filter(self._seek(values, 'gt'))
+            [:self.per_page + 1]
+        )
+        if len(rows) <= self.per_page:
+            # Дошли до начала ленты: отдаём полноценную первую страницу.
+            return self._first_page()
+        rows = rows[:self.per_page][::-1]
+        return self._build_page(rows, has_previous=True, has_next=True)
+
+    def _build_page(self, rows, has_previous, has_next=None):
+        if has_next is None:
+            has_next = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = self.encode_cursor(NEXT, rows[-1])
+        if rows and has_previous:
+            previous_cursor = self.encode_cursor(PREVIOUS, rows[0])
+        return KeysetPage(rows, self, next_cursor, previous_cursor)
+
+    def _seek(self, values, lookup):
+        """Условие «строго после» для составного ключа.
+
+        Для ключей (a, b) и ``lookup='lt'`` строит
+        ``a < a0 OR (a = a0 AND b < b0)``.
+        """
+        condition = Q()
+        equal = {}
+        for key, value in zip(self.keys, values):
+            condition |= Q(**equal, **{f'{key}__{lookup}': value})
+            equal[key] = value
+        return condition
+
+    @staticmethod
+    def _serialize(value):
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return str(value)
+
+
+def page_nav(posts, request, keyset=None, counter=None):
+    """Страница списка постов; ``counter`` - стратегия из counting."""
+    if keyset is None:
+        keyset = settings.POSTS_PAGINATION == 'keyset'
+    if keyset:
+        paginator = KeysetPaginator(posts, constants.POSTS_PER_PAGE)
+    else:
+        paginator = WindowPaginator(posts, constants.POSTS_PER_PAGE,
+                                    counter=counter)
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
+
+
+def comments_nav(comments, request):
+    """Страница комментариев от новых к старым по курсору ``comments``."""
+    paginator = KeysetPaginator(comments.select_related('author'),
+                                constants.COMMENTS_PER_PAGE,
+                                keys=('created', 'id'))
+    return paginator.get_page(request.GET.get('comments'))
+
+
+@contextmanager
+def auto_now_disabled(model, *field_names):
+    """Позволяет сохранить собственные значения в полях auto_now(_add)."""
+    fields = [model._meta.get_field(name) for name in field_names]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
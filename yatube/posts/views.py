@@ -1,13 +1,34 @@
+from urllib.parse import urlencode
+
 from django.shortcuts import render, get_object_or_404, redirect
-from .models import Post, Group, User, Follow
-from .forms import PostForm, CommentForm
+from .models import Post, Follow
+from .forms import PostForm, CommentForm, ExportForm
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from .utils import page_nav
-
-
+from django.http import (HttpResponseBadRequest, JsonResponse,
+                         StreamingHttpResponse)
+from .utils import comments_nav, page_nav
+from core.routers import pin_primary, read_replica
+from core.transaction import atomic
+from . import (constants, counters, counting, exporting, feed, lookups,
+               page_cache, thumbnails)
+from .conditional import conditional_page, profile_etag
+from .search import get_backend as get_search_backend
+
+EXPORT_CONTENT_TYPES = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+@read_replica
+@conditional_page()
+@page_cache.anonymous_page_cache
 def index(request):
     posts = Post.objects.select_related('group', 'author').all()
-    page_obj = page_nav(posts, request)
+    page_cache.tag(request, 'index')
+    page_obj = page_nav(posts, request,
+                        counter=counters.total_posts_counter())
     context = {
         'posts': posts,
         'page_obj': page_obj,
@@ -15,10 +36,15 @@ def index(request):
     return render(request, 'posts/index.html', context)
 
 
+@read_replica
+@conditional_page()
+@page_cache.anonymous_page_cache
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    page_obj = page_nav(posts, request)
+    group = lookups.get_group(slug)
+    page_cache.tag(request, f'group:{group.pk}')
+    posts = group.posts.select_related('author')
+    page_obj = page_nav(posts, request,
+                        counter=counting.Counter(group.posts_count))
     context = {
         'group': group,
         'posts': posts,
@@ -27,27 +53,36 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+@read_replica
+@conditional_page(profile_etag)
+@page_cache.anonymous_page_cache
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    author_posts = author.posts.all()
-    following = False
-    if request.user.is_authenticated:
-        following = Follow.objects.filter(
-            user=request.user, author=author).exists()
-    page_obj = page_nav(author_posts, request)
+    author = lookups.author_for(request, username)
+    page_cache.tag(request, f'author:{author.pk}')
+    author_posts = author.posts.select_related('group')
+    following = lookups.is_following(request.user, author)
+    posts_count = counters.user_stats(author).posts_count
+    page_obj = page_nav(author_posts, request,
+                        counter=counting.Counter(posts_count))
     context = {
         'author': author,
+        'posts_count': posts_count,
         'page_obj': page_obj,
         'following': following
     }
     return render(request, 'posts/profile.html', context)
 
 
+@read_replica
+@conditional_page()
+@page_cache.anonymous_page_cache
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    user_posts_count = post.author.posts.count()
+    post = get_object_or_404(
+        Post.objects.select_related('author__stats', 'group'), pk=post_id)
+    page_cache.tag(request, f'post:{post.pk}', f'author:{post.author_id}')
+    user_posts_count = counters.user_stats(post.author).posts_count
     form = CommentForm(request.POST or None)
-    comments = post.comments.all()
+    comments = comments_nav(post.comments.all(), request)
 
     context = {
         'post': post,
@@ -58,7 +93,32 @@ def post_detail(request, post_id):
     return render(request, 'posts/post_detail.html', context)
 
 
+@read_replica
+@conditional_page()
+@page_cache.anonymous_page_cache
+def post_comments(request, post_id):
+    """Следующая страница комментариев: HTML-фрагмент или JSON."""
+    post = get_object_or_404(Post.objects.only('pk'), pk=post_id)
+    page_cache.tag(request, f'post:{post.pk}')
+    comments = comments_nav(post.comments.all(), request)
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'comments': [
+                {'id': comment.pk, 'author': comment.author.username,
+                 'text': comment.text, 'created': comment.created}
+                for comment in comments
+            ],
+            'next': comments.next_cursor,
+        })
+    context = {
+        'post': post,
+        'comments': comments,
+    }
+    return render(request, 'posts/includes/comment_list.html', context)
+
+
 @login_required
+@pin_primary
 def add_comment(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
     form = CommentForm(request.POST or None)
@@ -66,11 +126,13 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        with atomic(immediate=True):
+            comment.save()
     return redirect('posts:post_detail', post_id=post_id)
 
 
 @login_required
+@pin_primary
 def post_create(request):
     form = PostForm(request.POST or None,
                     files=request.FILES or None,
@@ -78,7 +140,10 @@ def post_create(request):
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
-        post.save()
+        with atomic(immediate=True):
+            post.save()
+            if 'image' in form.changed_data:
+                thumbnails.schedule(post)
         return redirect('posts:profile', request.user.username)
     context = {
         'form': form,
@@ -87,6 +152,7 @@ def post_create(request):
 
 
 @login_required
+@pin_primary
 def post_edit(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
     if request.user != post.author:
@@ -97,7 +163,10 @@ def post_edit(request, post_id):
         instance=post
     )
     if form.is_valid():
-        form.save()
+        with atomic(immediate=True):
+            post = form.save()
+            if 'image' in form.changed_data:
+                thumbnails.schedule(post)
         return redirect('posts:post_detail', post_id=post_id)
     context = {
         'form': form,
@@ -106,10 +175,13 @@ def post_edit(request, post_id):
     return render(request, 'posts/create_post.html', context)
 
 
+@read_replica
 @login_required
 def follow_index(request):
-    post_list = Post.objects.filter(author__following__user=request.user)
-    page_obj = page_nav(post_list, request)
+    post_list = feed.feed_for(request.user).select_related('author', 'group')
+    page_obj = page_nav(post_list, request, counter=counting.Cached(
+        feed.count_key(request.user.pk),
+        timeout=constants.FEED_COUNT_CACHE_TIMEOUT))
     context = {
         'page_obj': page_obj,
     }
@@ -117,14 +189,16 @@ def follow_index(request):
 
 
 @login_required
+@pin_primary
 def profile_follow(request, username):
-    author = get_object_or_404(User, username=username)
+    author = lookups.get_author(username)
     if author != request.user:
         Follow.objects.get_or_create(user=request.user, author=author)
     return redirect('posts:profile', author)
 
 
 @login_required
+@pin_primary
 def profile_unfollow(request, username):
     Follower = get_object_or_404(
         Follow,
@@ -133,3 +207,41 @@ def profile_unfollow(request, username):
     )
     Follower.delete()
     return redirect('posts:profile', username)
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    page_obj = None
+    if query:
+        results = get_search_backend().search(query)
+        page_obj = page_nav(results, request, keyset=False)
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        'page_query': urlencode({'q': query}) + '&',
+    }
+    return render(request, 'posts/search.html', context)
+
+
+@staff_member_required
+def export(request):
+    form = ExportForm(request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest(form.errors.as_text())
+    options = form.cleaned_data
+    filename = f'yatube.{options["format"]}'
+    content_type = EXPORT_CONTENT_TYPES[options['format']]
+    if options['gzip']:
+        filename += '.gz'
+        content_type = 'application/gzip'
+    response = StreamingHttpResponse(
+        exporting.export_stream(
+            fmt=options['format'], compress=options['gzip'],
+            author=options['author'], group=options['group'],
+            since=options['since'], until=options['until'],
+            types=options['types'],
+        ),
+        content_type=content_type,
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -12,7 +12,8 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 SECRET_KEY = 'n&wp9b#-w&spkq$dk3)46ib^tci(q7jkhk+tanb6e4tn^($2$u'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# На рабочем сервере задаётся DJANGO_DEBUG=0
+DEBUG = os.environ.get('DJANGO_DEBUG', '1') == '1'
 
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
@@ -41,6 +42,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -53,6 +55,9 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'yatube.urls'
 
+# Без DEBUG Django сам загружает шаблоны через cached.Loader, и
+# yatube/wsgi.py разбирает их все при старте; при разработке они
+# перечитываются на каждый запрос, чтобы правки были видны сразу
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -76,13 +81,39 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
+# core.backends.sqlite3 включает WAL и ожидание блокировок и ставит
+# записи в очередь; соединение живёт CONN_MAX_AGE секунд между запросами
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'core.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': int(os.environ.get('DATABASE_CONN_MAX_AGE', 60)),
+        'OPTIONS': {'PRAGMAS': {}, 'SERIALIZE_WRITES': True},
     }
 }
 
+# Реплики для чтения (core.routers). Локально это копии db.sqlite3,
+# которые обновляет manage.py sync_replicas:
+# DATABASE_REPLICA_FILES=replica_1.sqlite3,replica_2.sqlite3
+DATABASE_REPLICAS = []
+for num, name in enumerate(filter(None, os.environ.get(
+        'DATABASE_REPLICA_FILES', '').split(',')), start=1):
+    alias = f'replica_{num}'
+    DATABASES[alias] = {
+        'ENGINE': 'core.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, name),
+        'CONN_MAX_AGE': DATABASES['default']['CONN_MAX_AGE'],
+        # В тестах реплика - та же тестовая база.
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+# Сколько секунд после записи посетитель читает только основную базу;
+# столько же реплики могут отставать
+REPLICA_PIN_SECONDS = 10
+# Как часто заново проверять, отвечает ли реплика, секунд
+REPLICA_HEALTH_INTERVAL = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -102,6 +133,31 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Профили хеширования паролей (core/hashers.py): первый хешер хеширует
+# новые пароли, остальные проверяют старые, а при входе пароль
+# перехешируется первым. 'argon2' нужен argon2-cffi, 'bcrypt' - bcrypt,
+# без библиотеки основного хешера сайт не запустится; 'fast' - только
+# для тестов и замеров (core.hashers.fast_password_hashing)
+PASSWORD_VERIFIERS = [
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'core.hashers.TunedArgon2PasswordHasher',
+    'core.hashers.BCryptSHA256PasswordHasher',
+]
+PASSWORD_HASHER_PROFILES = {
+    'argon2': ['core.hashers.TunedArgon2PasswordHasher'],
+    'bcrypt': ['core.hashers.BCryptSHA256PasswordHasher'],
+    'pbkdf2': ['django.contrib.auth.hashers.PBKDF2PasswordHasher'],
+    'fast': ['django.contrib.auth.hashers.MD5PasswordHasher'],
+}
+for profile, hashers in PASSWORD_HASHER_PROFILES.items():
+    hashers.extend(name for name in PASSWORD_VERIFIERS if name not in hashers)
+PASSWORD_HASHING = os.environ.get('PASSWORD_HASHING', 'pbkdf2')
+PASSWORD_HASHERS = PASSWORD_HASHER_PROFILES[PASSWORD_HASHING]
+
+# Тесты хешируют пароли быстрым профилем и кешируют в свой каталог
+TEST_RUNNER = 'core.testing.TestRunner'
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/2.2/topics/i18n/
@@ -124,8 +180,9 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
-#  подключаем движок filebased.EmailBackend
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Письма отправляются в фоне, а доставляет их filebased.EmailBackend
+EMAIL_BACKEND = 'core.mail.BackgroundEmailBackend'
+EMAIL_DELIVERY_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 # указываем директорию, в которую будут складываться файлы писем
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
@@ -140,11 +197,46 @@ ALLOWED_HOSTS = [
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Кеш в памяти воркера поверх общего для всех воркеров кеша. Общий
+# уровень по умолчанию - файлы в yatube/cache (у тестов свой временный
+# каталог, см. core/testing.py); для Redis достаточно указать, например,
+# SHARED_CACHE_BACKEND=django_redis.cache.RedisCache и
+# SHARED_CACHE_LOCATION=redis://127.0.0.1:6379/1
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+        'BACKEND': 'core.cache.TwoTierCache',
+        'LOCATION': 'shared',
+        'OPTIONS': {
+            'LOCAL_TIMEOUT': 5,
+            'LOCAL_MAX_ENTRIES': 1000,
+        },
+    },
+    'shared': {
+        'BACKEND': os.environ.get(
+            'SHARED_CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get(
+            'SHARED_CACHE_LOCATION',
+            os.path.join(BASE_DIR, 'cache')),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
 }
+# Режим пагинации лент постов: 'offset' (номера страниц)
+# или 'keyset' (курсор по pub_date и id, без OFFSET и COUNT)
+POSTS_PAGINATION = 'offset'
+# Движок поиска по постам; для баз кроме SQLite -
+# 'posts.search.SimpleBackend'
+POSTS_SEARCH_BACKEND = 'posts.search.SqliteFTSBackend'
+# Метрики по view для Prometheus на /metrics/. Доступ - сотрудникам
+# или с заголовком "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED') == '1'
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+# Доля запросов, для которых запоминается SQL, и порог, после которого
+# такой запрос пишется в лог yatube.slow_requests
+METRICS_SLOW_SAMPLE_RATE = 0.1
+METRICS_SLOW_REQUEST_MS = 500
 INTERNAL_IPS = [
     '127.0.0.1',
 ]
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+# Шаблоны разбираются до первого запроса, а не во время него.
+from core.templates import uses_cached_loader, warm  # noqa: E402
+
+if uses_cached_loader():
+    warm()